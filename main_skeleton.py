@@ -1,9 +1,20 @@
-import uuid
+import argparse
 import json
+import math
+import queue
+import threading
+import time
+import uuid
+from collections import Counter
 from datetime import datetime
 
-from src.aiva.merge_engine import RouteEngine
+from src.aiva.merge_engine import MergeEngine, RouteEngine, RouteRequest
+from src.aiva.score_cache import ScoreCache
+from src.rail.event_sinks import NullSink
 from src.rail.executor import RailExecutor
+from src.rail.failover import FailoverPlanner
+from src.rail.hop_executor import FaultInjectionTransport, PooledHopTransport
+from src.rail.retry import CircuitBreakerRegistry, RetryPolicy
 from src.cloked.auditor import AuditChain
 from src.cloked.capsule import EvidenceCapsule
 
@@ -28,28 +39,48 @@ def print_event_log(event_log):
         print(json.dumps(ev_dict, indent=2))
 
 
-def generate_evidence_capsule(transaction_id, event_log, audit_chain):
-    """Build and persist a Cloked Evidence Capsule from a transaction run."""
-    print("\n📦 GENERATING EVIDENCE CAPSULE...\n")
-
+def build_evidence_capsule(transaction_id, event_log, audit_chain):
+    """Build (but do not print or save) an Evidence Capsule for a transaction run."""
     # Convert all events to plain dicts for the capsule
     event_dicts = [normalise_event(ev) for ev in event_log]
 
-    capsule = EvidenceCapsule(
+    # Chain entry 0 is genesis, so transaction events are entries 1..n.
+    inclusion_proofs = [
+        audit_chain.inclusion_proof(i) for i in range(1, len(event_dicts) + 1)
+    ]
+
+    return EvidenceCapsule(
         capsule_id=str(uuid.uuid4()),
         transaction_id=transaction_id,
         generated_at=datetime.utcnow().isoformat() + "Z",
-        schema_version="1.0",
+        schema_version="1.1",
         events=event_dicts,
         audit_hash=audit_chain.get_final_hash(),
+        merkle_root=audit_chain.merkle_root(),
+        inclusion_proofs=inclusion_proofs,
     )
 
+
+def generate_evidence_capsule(transaction_id, event_log, audit_chain, archive=None):
+    """
+    Build and persist a Cloked Evidence Capsule from a transaction run.
+
+    With an `EvidenceArchive` the capsule is appended to the archive
+    instead of being written to its own JSON file.
+    """
+    print("\n📦 GENERATING EVIDENCE CAPSULE...\n")
+
+    capsule = build_evidence_capsule(transaction_id, event_log, audit_chain)
+
     capsule_json = capsule.to_json()
     print(capsule_json)
 
     # Optional: write to disk
-    filename = f"evidence_capsule_{transaction_id}.json"
-    capsule.save_to_disk(filename)
+    if archive is not None:
+        archive.export(capsule)
+    else:
+        filename = f"evidence_capsule_{transaction_id}.json"
+        capsule.save_to_disk(filename)
 
     return capsule
 
@@ -64,17 +95,247 @@ def run_transaction_scenario():
         transaction_id: unique ID for this run.
     """
     route_engine = RouteEngine()
-    route = route_engine.get_best_route(origin="NodeA", destination="NodeB")
+    route = route_engine.get_best_route(origin="AU_BANK_A", destination="EU_BANK_X")
 
     print("\n🧠 AIVA Selected Route:", route)
 
-    rail_exec = RailExecutor()
+    rail_exec = RailExecutor(failover=FailoverPlanner(kernel=route_engine.kernel))
     final_state, event_log = rail_exec.execute_transaction(route)
 
     transaction_id = str(uuid.uuid4())
     return final_state, event_log, transaction_id
 
 
+# ---------- Batch mode ----------
+
+BATCH_STAGES = ("aiva", "rail", "cloked")
+
+
+def load_transaction_requests(path):
+    """
+    Stream transaction requests from a JSON-lines file.
+
+    Each line is an object with RouteRequest fields (origin, destination,
+    amount, beneficiary_id, beneficiary_name, payload_type, temp_celsius,
+    volatility_indices) and an optional transaction_id. Blank lines are
+    skipped.
+
+    Yields:
+        (transaction_id, RouteRequest) pairs.
+    """
+    fields = RouteRequest.__dataclass_fields__
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            data = json.loads(line)
+            transaction_id = data.pop("transaction_id", None) or str(uuid.uuid4())
+            yield transaction_id, RouteRequest(**{k: v for k, v in data.items() if k in fields})
+
+
+def _percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(q / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+_STAGE_DONE = object()
+
+
+def _start_stage(fn, inbox, outbox, threads, errors):
+    """
+    Start `threads` workers moving items inbox → fn → outbox.
+
+    A worker that takes the end marker puts it back for its siblings and
+    exits; the last one to exit passes it on to `outbox`. After the first
+    exception (kept in `errors`) items are drained without being
+    processed, so upstream stages never block on a full queue.
+    """
+    remaining = [threads]
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            item = inbox.get()
+            if item is _STAGE_DONE:
+                inbox.put(item)
+                break
+            if errors:
+                continue
+            try:
+                result = fn(item)
+            except BaseException as exc:  # re-raised by run_batch
+                errors.append(exc)
+                continue
+            if outbox is not None:
+                outbox.put(result)
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last and outbox is not None:
+            outbox.put(_STAGE_DONE)
+
+    started = [threading.Thread(target=worker, daemon=True) for _ in range(threads)]
+    for thread in started:
+        thread.start()
+    return started
+
+
+def run_batch(requests, workers=8, engine=None, retry_policy=None, breakers=None,
+              ledger=None, archive=None, store=None, transport=None,
+              chaos_failure_rate=None, chaos_seed=None, score_workers=2, seal_workers=1):
+    """
+    Push a stream of transactions through Aiva → Rail → Cloked.
+
+    The three stages form a pipeline: each has its own worker threads and
+    hands transactions to the next through a bounded queue, so while the
+    Rail workers wait on hops, the next transactions are being scored and
+    earlier ones sealed. One MergeEngine, FailoverPlanner and RailExecutor
+    are shared by the workers. The bounded queues also stream a huge
+    input file rather than loading it all at once.
+
+    Args:
+        requests: iterable of (transaction_id, RouteRequest).
+        workers: Rail worker threads.
+        engine: MergeEngine to reuse (built once, with a ScoreCache, if
+            omitted).
+        retry_policy: RetryPolicy for Rail hops.
+        breakers: CircuitBreakerRegistry (default: a fresh one per batch,
+            so one batch's open circuits never leak into the next).
+        ledger: optional LiquidityLedger; each transaction then reserves
+            its amount along the route and settles it for real.
+        archive: optional EvidenceArchive receiving every capsule.
+        store: optional CapsuleStore receiving every capsule.
+        transport: HopTransport for Rail (default: pooled connections,
+            no injected faults).
+        chaos_failure_rate: opt-in fault injection; every hop attempt
+            fails with this probability.
+        chaos_seed: seed for the injected faults (reproducible runs).
+        score_workers: Aiva worker threads.
+        seal_workers: Cloked worker threads.
+
+    Returns:
+        dict with transaction count, elapsed seconds, tx/s, final state
+        counts, p50/p95/p99/mean latency (ms) per stage and, when the
+        engine has a ScoreCache, its hit/miss counters.
+    """
+    engine = engine or MergeEngine(cache=ScoreCache())
+    failover = FailoverPlanner(kernel=engine.kernel)
+    owned_transport = transport is None
+    if transport is None:
+        transport = PooledHopTransport()
+    if chaos_failure_rate is not None:
+        transport = FaultInjectionTransport(transport, failure_rate=chaos_failure_rate, seed=chaos_seed)
+    rail = RailExecutor(
+        transport=transport,
+        failover=failover,
+        retry_policy=retry_policy,
+        breakers=breakers if breakers is not None else CircuitBreakerRegistry(),
+        sink=NullSink(),
+        ledger=ledger,
+    )
+
+    def score(item):
+        transaction_id, request = item
+        started = time.perf_counter()
+        route = engine.get_best_route(request.origin, request.destination, request)
+        return transaction_id, request, route, {"aiva": time.perf_counter() - started}
+
+    def execute(item):
+        transaction_id, request, route, timings = item
+        started = time.perf_counter()
+        final_state, event_log = rail.execute_transaction(route, amount=request.amount)
+        event_dicts = [normalise_event(ev) for ev in event_log]
+        timings["rail"] = time.perf_counter() - started
+        return transaction_id, final_state, event_dicts, timings
+
+    states = Counter()
+    stage_times = {stage: [] for stage in BATCH_STAGES}
+    results_lock = threading.Lock()
+
+    def seal(item):
+        transaction_id, final_state, event_dicts, timings = item
+        started = time.perf_counter()
+        audit_chain = AuditChain()
+        audit_chain.log_events(event_dicts)
+        capsule = build_evidence_capsule(transaction_id, event_dicts, audit_chain)
+        if archive is not None:
+            archive.export(capsule)
+        if store is not None:
+            store.put(capsule)
+        timings["cloked"] = time.perf_counter() - started
+
+        with results_lock:
+            states[getattr(final_state, "name", final_state)] += 1
+            for stage, seconds in timings.items():
+                stage_times[stage].append(seconds)
+
+    depth = max(workers, score_workers, seal_workers) * 4
+    to_score, to_execute, to_seal = (queue.Queue(maxsize=depth) for _ in BATCH_STAGES)
+    errors = []
+
+    started = time.perf_counter()
+    threads = (
+        _start_stage(score, to_score, to_execute, score_workers, errors)
+        + _start_stage(execute, to_execute, to_seal, workers, errors)
+        + _start_stage(seal, to_seal, None, seal_workers, errors)
+    )
+    try:
+        for item in requests:
+            if errors:
+                break
+            to_score.put(item)
+    finally:
+        to_score.put(_STAGE_DONE)
+        for thread in threads:
+            thread.join()
+        if owned_transport:
+            transport.close()
+    elapsed = time.perf_counter() - started
+    if errors:
+        raise errors[0]
+
+    total = sum(states.values())
+    stages = {}
+    for stage, values in stage_times.items():
+        values.sort()
+        stages[stage] = {
+            "p50_ms": _percentile(values, 50) * 1000.0,
+            "p95_ms": _percentile(values, 95) * 1000.0,
+            "p99_ms": _percentile(values, 99) * 1000.0,
+            "mean_ms": (sum(values) / len(values) * 1000.0) if values else 0.0,
+        }
+
+    report = {
+        "transactions": total,
+        "elapsed_seconds": elapsed,
+        "tx_per_second": total / elapsed if elapsed > 0 else 0.0,
+        "states": dict(states),
+        "stages": stages,
+    }
+    cache = getattr(engine, "cache", None)
+    if cache is not None:
+        report["score_cache"] = cache.stats().to_dict()
+    return report
+
+
+def print_batch_report(report):
+    print("\n=== 📊 BATCH REPORT ===")
+    print(f"Transactions: {report['transactions']} in {report['elapsed_seconds']:.2f}s "
+          f"({report['tx_per_second']:.1f} tx/s)")
+    print("Final states:", report["states"])
+    for stage, stats in report["stages"].items():
+        print(f"  {stage:<7} p50 {stats['p50_ms']:8.2f} ms | p95 {stats['p95_ms']:8.2f} ms | "
+              f"p99 {stats['p99_ms']:8.2f} ms | mean {stats['mean_ms']:8.2f} ms")
+    if "score_cache" in report:
+        cache = report["score_cache"]
+        print(f"Score cache: {cache['hit_rate']:.1%} hit rate "
+              f"({cache['hits']} hits, {cache['misses']} misses, {cache['size']} entries)")
+
+
 def main():
     print("\n🚀 Starting Lupine Systems Walking Skeleton\n")
 
@@ -91,9 +352,7 @@ def main():
     # 2) Build Cloked audit chain from events
     print("\n🔐 Building Cloked Audit Chain...\n")
     audit_chain = AuditChain()
-    for ev in event_log:
-        ev_dict = normalise_event(ev)
-        audit_chain.log_event(ev_dict)
+    audit_chain.log_events(normalise_event(ev) for ev in event_log)
 
     print("=== CLOKED: Integrity Check (Before Tamper) ===")
     print("Integrity OK?", audit_chain.verify_integrity())
@@ -118,4 +377,24 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Lupine Systems walking skeleton")
+    parser.add_argument("--batch", metavar="JSONL", help="run every transaction request in this file")
+    parser.add_argument("--workers", type=int, default=8, help="batch Rail worker threads")
+    parser.add_argument("--base-delay", type=float, default=0.05, help="batch retry backoff base (s)")
+    parser.add_argument("--chaos", type=float, metavar="RATE",
+                        help="batch: inject hop failures at this rate (off by default)")
+    parser.add_argument("--seed", type=int, help="batch: seed for --chaos")
+    args = parser.parse_args()
+
+    if args.batch:
+        print_batch_report(
+            run_batch(
+                load_transaction_requests(args.batch),
+                workers=args.workers,
+                retry_policy=RetryPolicy(base_delay=args.base_delay),
+                chaos_failure_rate=args.chaos,
+                chaos_seed=args.seed,
+            )
+        )
+    else:
+        main()
@@ -0,0 +1,37 @@
+# src/aiva/batch_utils.py
+
+from __future__ import annotations
+
+import numpy as np
+
+
+def round_and_clamp(values: np.ndarray, ndigits: int = 3) -> np.ndarray:
+    """
+    Vectorised equivalent of ``max(0.0, min(1.0, round(v, ndigits)))``.
+
+    Every scalar scorer in Aiva finishes with that expression, so batch
+    scorers must reproduce it bit for bit:
+
+    - ``np.round`` scales, rounds half-to-even and unscales, which can
+      disagree with Python's correctly-rounded ``round`` when the scaled
+      value sits on (or within float error of) a .5 tie. Those rare
+      elements are re-rounded with Python's ``round``.
+    - ``min``/``max`` are replicated with ``np.where`` using the same
+      comparisons Python performs, so NaN and -0.0 behave identically.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    scale = 10.0 ** ndigits
+    scaled = values * scale
+    rounded = np.rint(scaled) / scale
+
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_tie.any():
+        flat_values = values.ravel()
+        flat_rounded = rounded.ravel()
+        for i in np.flatnonzero(near_tie):
+            flat_rounded[i] = round(float(flat_values[i]), ndigits)
+        rounded = flat_rounded.reshape(values.shape)
+
+    # min(1.0, r) keeps r only if r < 1.0; max(0.0, r) keeps r only if r > 0.0
+    upper = np.where(rounded < 1.0, rounded, 1.0)
+    return np.where(upper > 0.0, upper, 0.0)
@@ -3,11 +3,23 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List
+from typing import Optional
 
+import numpy as np
 
-BLACKLIST: List[str] = ["North Korea", "Iran"]
-HIGH_RISK_THRESHOLD: float = 0.8  # reserved for future use
+from .sanctions import (
+    SanctionsIndex,
+    SanctionsScreener,
+    builtin_country_statuses,
+)
+from .score_cache import COMPLIANCE, ScoreCache
+
+HIGH_RISK_THRESHOLD: float = 0.8  # fuzzy name similarity that requires manual review
+
+
+def default_sanctions_index() -> SanctionsIndex:
+    """Index with just the built-in country lists (no entity lists)."""
+    return SanctionsIndex(countries=builtin_country_statuses())
 
 
 @dataclass(frozen=True)
@@ -18,9 +30,11 @@ class ComplianceContext:
     For now we use:
     - destination_country: where funds/benefit ultimately land
     - beneficiary_id: opaque identifier (account, entity, customer)
+    - beneficiary_name: free-text name, fuzzy-matched against listed entities
     """
     destination_country: str
     beneficiary_id: str
+    beneficiary_name: str = ""
 
 
 class ComplianceGraph:
@@ -29,16 +43,38 @@ class ComplianceGraph:
 
     Rules (walking-skeleton version):
 
-    - If destination_country is in BLACKLIST →
+    - If destination_country is in `sanctions.BLACKLIST` →
         score = 0.0  (hard reject: sanctions violation)
 
-    - If destination_country == "High Risk" →
+    - If destination_country is in `sanctions.HIGH_RISK_COUNTRIES` ("High Risk") →
         score = 0.5  (requires manual review, not auto-approvable)
 
     - Otherwise →
         score = 1.0  (no elevated jurisdictional risk detected)
+
+    Screening runs against a `SanctionsScreener` (see `src.aiva.sanctions`),
+    which also rejects listed beneficiary ids and exact name hits, and
+    sends fuzzy name hits with similarity ≥ HIGH_RISK_THRESHOLD to review
+    (0.5). Without one, only the built-in `sanctions.BLACKLIST` /
+    `sanctions.HIGH_RISK_COUNTRIES` country lists apply.
+
+    Pass a `ScoreCache` to memoise scores per context; it is invalidated
+    automatically whenever the screener swaps in a reloaded index.
     """
 
+    def __init__(
+        self,
+        screener: Optional[SanctionsScreener] = None,
+        cache: Optional[ScoreCache] = None,
+    ) -> None:
+        self.screener = screener or SanctionsScreener(index=default_sanctions_index())
+        self.cache = cache
+        self._cache_owner = object()  # keeps this graph's scores apart in a shared cache
+        if cache is not None:
+            self.screener.add_reload_listener(
+                lambda index: cache.invalidate(COMPLIANCE, owner=self._cache_owner)
+            )
+
     def get_compliance_score(self, ctx: ComplianceContext) -> float:
         """
         Compute a simple compliance score for the given corridor.
@@ -46,7 +82,7 @@ class ComplianceGraph:
         Parameters
         ----------
         ctx : ComplianceContext
-            Destination country + beneficiary id.
+            Destination country, beneficiary id and (optional) name.
 
         Returns
         -------
@@ -54,20 +90,73 @@ class ComplianceGraph:
             Compliance score in [0.0, 1.0].
             - 0.0 → hard reject (sanctions / prohibited)
             - 0.5 → high risk (manual review required)
-            - 1.0 → clear from this simple jurisdiction check
+            - 1.0 → clear from sanctions screening
         """
-        country = ctx.destination_country
-
-        # Hard sanctions / prohibited list
-        if country in BLACKLIST:
-            return 0.0
+        if self.cache is not None:
+            return self.cache.get_or_compute(COMPLIANCE, ctx, self._score, self._cache_owner)
+        return self._score(ctx)
+
+    def _score(self, ctx: ComplianceContext) -> float:
+        return self.screener.screen(
+            destination_country=ctx.destination_country,
+            beneficiary_id=ctx.beneficiary_id,
+            beneficiary_name=ctx.beneficiary_name,
+            review_threshold=HIGH_RISK_THRESHOLD,
+        ).score
+
+    def calculate_score(
+        self, destination_country: str, beneficiary_id: str, beneficiary_name: str = ""
+    ) -> float:
+        """Keyword convenience wrapper around `get_compliance_score`."""
+        return self.get_compliance_score(
+            ComplianceContext(
+                destination_country=destination_country,
+                beneficiary_id=beneficiary_id,
+                beneficiary_name=beneficiary_name,
+            )
+        )
+
+    def get_compliance_score_batch(
+        self,
+        destination_countries: np.ndarray,
+        beneficiary_ids: Optional[np.ndarray] = None,
+        beneficiary_names: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Vectorised `get_compliance_score` over columnar screening inputs.
 
-        # Mock "high risk" classification for now
-        if country == "High Risk":
-            return 0.5
+        Every distinct country / id / name is screened once; rows then take
+        the minimum of their country, id and name scores.
 
-        # Otherwise, treat as safe in this minimal model
-        return 1.0
+        Returns
+        -------
+        np.ndarray
+            float64 scores (0.0 / 0.5 / 1.0), identical to the scalar
+            version element-wise.
+        """
+        index = self.screener.index  # one index for the whole batch
+        countries = np.asarray(destination_countries)
+        unique, inverse = np.unique(countries, return_inverse=True)
+        scores = np.array([index.country_score(str(c)) for c in unique])[inverse.reshape(countries.shape)]
+
+        if beneficiary_ids is not None:
+            ids = np.broadcast_to(np.asarray(beneficiary_ids), countries.shape)
+            unique, inverse = np.unique(ids, return_inverse=True)
+            listed = np.array([bool(i) and str(i) in index.entity_ids for i in unique])[inverse.reshape(ids.shape)]
+            scores = np.where(listed, 0.0, scores)
+
+        if beneficiary_names is not None:
+            names = np.broadcast_to(np.asarray(beneficiary_names), countries.shape)
+            unique, inverse = np.unique(names, return_inverse=True)
+            name_scores = np.array(
+                [
+                    index.screen(beneficiary_name=str(n), review_threshold=HIGH_RISK_THRESHOLD).score
+                    for n in unique
+                ]
+            )[inverse.reshape(names.shape)]
+            scores = np.minimum(scores, name_scores)
+
+        return scores.astype(np.float64)
 
 
 if __name__ == "__main__":
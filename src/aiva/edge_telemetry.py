@@ -0,0 +1,186 @@
+# src/aiva/edge_telemetry.py
+
+from __future__ import annotations
+
+import math
+import threading
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from .route_index import EdgeCostFn
+
+
+DEFAULT_ALPHA: float = 0.2  # EWMA weight of the newest observation
+DEFAULT_MIN_RELATIVE_CHANGE: float = 0.05  # re-weight once the edge cost moves 5%
+
+CIRCUIT_OPEN_REASON: str = "Circuit open"  # HOP_FAILURE without an actual attempt
+
+EdgeListener = Callable[[str, str, Dict[str, float]], None]
+
+
+class _EdgeEstimate:
+    __slots__ = ("values", "published_cost", "samples")
+
+    def __init__(self, values: Dict[str, float], published_cost: float) -> None:
+        self.values = values
+        self.published_cost = published_cost
+        self.samples = 0
+
+
+class EdgeTelemetry:
+    """
+    Live EWMA edge weights fed by observed hop outcomes.
+
+    Each observation folds into an exponentially weighted moving average
+    per (edge, attribute):
+
+        estimate = alpha * observed + (1 - alpha) * estimate
+
+    seeded from the edge's current graph attributes. Latency averages the
+    observed seconds; reliability averages outcomes (1.0 success, 0.0
+    failure), so it tracks the recent success rate.
+
+    Estimates are pushed to the routing `target` (a `RouteEngine` or
+    `FXRouter`) through its `update_edge`, which re-weights that single
+    edge and invalidates only the origins whose routes can change. To
+    avoid churning the index on noise, an edge is only pushed once its
+    cost (under the target index's cost function) has moved by at least
+    `min_relative_change` since the last push; `flush` pushes everything.
+
+    Observations for edges that are not in the graph are ignored.
+
+    Parameters
+    ----------
+    target : RouteEngine or FXRouter
+        Anything with `edge_attrs(u, v)`, `.index` and `update_edge(u, v, **attrs)`.
+    alpha : float
+        EWMA smoothing factor in (0, 1]; higher reacts faster.
+    min_relative_change : float
+        Relative cost change that triggers a push (0.0 pushes every change).
+    cost_fn : Optional[EdgeCostFn]
+        Edge cost used for that check (default: the target index's).
+    """
+
+    def __init__(
+        self,
+        target: Any,
+        alpha: float = DEFAULT_ALPHA,
+        min_relative_change: float = DEFAULT_MIN_RELATIVE_CHANGE,
+        cost_fn: Optional[EdgeCostFn] = None,
+    ) -> None:
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError("alpha must be in (0, 1]")
+        self.target = target
+        self.alpha = alpha
+        self.min_relative_change = min_relative_change
+        self.cost_fn: EdgeCostFn = cost_fn or target.index.cost_fn
+        self._estimates: Dict[Tuple[str, str], _EdgeEstimate] = {}
+        self._listeners: List[EdgeListener] = []
+        self._lock = threading.Lock()  # serialises estimate updates and pushes
+
+    def add_listener(self, listener: EdgeListener) -> None:
+        """Call `listener(u, v, attrs)` after every push (e.g. to invalidate failover plans)."""
+        self._listeners.append(listener)
+
+    # ---------- Observations ----------
+
+    def observe(self, u: str, v: str, attr: str, value: float) -> int:
+        """
+        Fold one observed `attr` value for the edge u → v into its EWMA.
+
+        Returns the number of routing-index origins invalidated (0 when
+        the edge is unknown or its cost has not moved enough yet).
+        """
+        with self._lock:
+            estimate = self._estimate(u, v)
+            if estimate is None:
+                return 0
+            previous = estimate.values.get(attr)
+            estimate.values[attr] = (
+                float(value) if previous is None
+                else self.alpha * float(value) + (1.0 - self.alpha) * previous
+            )
+            estimate.samples += 1
+
+            if not self._moved(estimate):
+                return 0
+            return self._push(u, v, estimate)
+
+    def observe_latency(self, u: str, v: str, seconds: float) -> int:
+        return self.observe(u, v, "latency", seconds)
+
+    def observe_outcome(self, u: str, v: str, success: bool) -> int:
+        return self.observe(u, v, "reliability", 1.0 if success else 0.0)
+
+    def ingest(self, event: Any) -> int:
+        """
+        Feed one Rail event (a `CompactRailEvent` or its dict form).
+
+        HOP_SUCCESS records a success plus, when the transport reported
+        one, its `settlement_latency` (seconds, the hop graph's latency
+        unit); the in-process `latency_ms` wall time is not a settlement
+        latency and is never folded in. HOP_FAILURE records a failed
+        attempt. Events without a `from_node` (the first hop of a route)
+        and circuit-open failures, where no attempt was made, are ignored.
+        Returns origins invalidated.
+        """
+        if isinstance(event, Mapping):
+            event_type, details = event.get("event_type"), event.get("details") or {}
+        else:
+            event_type, details = event.event_type, event.details
+        event_type = getattr(event_type, "value", event_type)
+
+        u, v = details.get("from_node"), details.get("node_id")
+        if u is None or v is None:
+            return 0
+        if event_type == "HOP_SUCCESS":
+            invalidated = self.observe_outcome(u, v, True)
+            if details.get("settlement_latency") is not None:
+                invalidated += self.observe_latency(u, v, details["settlement_latency"])
+            return invalidated
+        if event_type == "HOP_FAILURE" and details.get("reason") != CIRCUIT_OPEN_REASON:
+            return self.observe_outcome(u, v, False)
+        return 0
+
+    # ---------- Publishing ----------
+
+    def flush(self) -> int:
+        """Push every estimate that differs from the graph. Returns origins invalidated."""
+        with self._lock:
+            return sum(
+                self._push(u, v, estimate)
+                for (u, v), estimate in self._estimates.items()
+                if self.cost_fn(estimate.values) != estimate.published_cost
+            )
+
+    def estimate(self, u: str, v: str) -> Optional[Dict[str, float]]:
+        """Current EWMA attributes of u → v (None if never observed)."""
+        estimate = self._estimates.get((u, v))
+        return dict(estimate.values) if estimate is not None else None
+
+    # ---------- Internals ----------
+
+    def _estimate(self, u: str, v: str) -> Optional[_EdgeEstimate]:
+        estimate = self._estimates.get((u, v))
+        if estimate is None:
+            attrs = self.target.edge_attrs(u, v)
+            if attrs is None:
+                return None
+            values = {key: float(val) for key, val in attrs.items() if isinstance(val, (int, float))}
+            estimate = self._estimates[(u, v)] = _EdgeEstimate(values, self.cost_fn(attrs))
+        return estimate
+
+    def _moved(self, estimate: _EdgeEstimate) -> bool:
+        old, new = estimate.published_cost, self.cost_fn(estimate.values)
+        if old == new:
+            return False
+        if not (math.isfinite(old) and math.isfinite(new)) or old == 0.0:
+            return True
+        return abs(new - old) / abs(old) >= self.min_relative_change
+
+    def _push(self, u: str, v: str, estimate: _EdgeEstimate) -> int:
+        attrs = dict(estimate.values)
+        invalidated = self.target.update_edge(u, v, **attrs)
+        estimate.published_cost = self.cost_fn(attrs)
+        for listener in list(self._listeners):
+            listener(u, v, attrs)
+        return invalidated
@@ -0,0 +1,222 @@
+# src/aiva/fx_router.py
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional
+
+from .graph_kernel import GraphKernel, corridor_graph_kernel
+from .route_index import EdgeCostFn, RouteIndex
+
+
+STABILITY_WEIGHT: float = 0.1
+LIQUIDITY_WEIGHT: float = 0.1
+
+
+def make_fx_edge_cost(
+    stability_weight: float = STABILITY_WEIGHT,
+    liquidity_weight: float = LIQUIDITY_WEIGHT,
+) -> EdgeCostFn:
+    """
+    Build the cost function for an FX corridor, used as the path weight.
+
+    Converting through a corridor keeps (1 - spread) of the notional, so
+    the value kept along a multi-leg path is the product of those
+    factors. Taking -log turns that product into a sum, which is exactly
+    what a shortest-path search minimises:
+
+        cost = -log(1 - spread)
+               + stability_weight * -log(stability)
+               + liquidity_weight * -log(liquidity)
+
+    Stability and liquidity depth are in (0, 1]; 1.0 adds no penalty and
+    values at or below 0.0 (or a spread of 100%+) make the corridor
+    unusable (infinite cost). All terms are non-negative.
+    """
+
+    def fx_edge_cost(attrs: Mapping[str, Any]) -> float:
+        spread = float(attrs.get("spread", 0.0))
+        stability = min(1.0, float(attrs.get("stability", 1.0)))
+        liquidity = min(1.0, float(attrs.get("liquidity", 1.0)))
+
+        if spread >= 1.0 or stability <= 0.0 or liquidity <= 0.0:
+            return math.inf
+        return (
+            -math.log1p(-max(spread, 0.0))
+            - stability_weight * math.log(stability)
+            - liquidity_weight * math.log(liquidity)
+        )
+
+    return fx_edge_cost
+
+
+fx_edge_cost: EdgeCostFn = make_fx_edge_cost()
+
+
+@dataclass(frozen=True)
+class FXQuote:
+    """
+    Best conversion path for one currency pair.
+
+    Attributes
+    ----------
+    path : List[str]
+        Currencies from source to target, inclusive (["AUD", "USD", "EUR"]).
+    cost : float
+        Summed corridor cost (see `make_fx_edge_cost`).
+    rate_factor : float
+        Fraction of the notional kept after every leg's spread,
+        prod(1 - spread).
+    effective_spread : float
+        All-in spread of the path, 1 - rate_factor.
+    """
+    source: str
+    target: str
+    path: List[str]
+    cost: float
+    rate_factor: float
+    effective_spread: float
+
+    @property
+    def legs(self) -> int:
+        return len(self.path) - 1
+
+
+class FXRouter:
+    """
+    Best-rate multi-leg conversion search over the FX corridor graph.
+
+    Corridors are weighted by `make_fx_edge_cost` (vectorised with
+    `GraphKernel.fx_costs`) and indexed with a `RouteIndex`: the best
+    paths from a currency are computed on its first quote and kept, so
+    later quotes are a predecessor walk rather than a graph search, and
+    `update_corridor` only drops the source currencies whose best paths
+    can change when one corridor's spread, stability or liquidity moves.
+
+    Like `RouteEngine`, the router runs on a `GraphKernel` (default: the
+    process-wide `corridor_graph_kernel()`); the first corridor change
+    swaps in a `private_copy` that later changes re-weight in place, so
+    the shared kernel is never modified. `graph` is a networkx view
+    materialised on first access.
+
+    Parameters
+    ----------
+    graph : Optional[nx.DiGraph]
+        Corridor graph (default: the shared corridor kernel).
+    stability_weight, liquidity_weight : float
+        Penalty weights passed to `make_fx_edge_cost`.
+    kernel : Optional[GraphKernel]
+        Precompiled corridor kernel to use instead of `graph`.
+    """
+
+    def __init__(
+        self,
+        graph: Optional[Any] = None,
+        stability_weight: float = STABILITY_WEIGHT,
+        liquidity_weight: float = LIQUIDITY_WEIGHT,
+        kernel: Optional[GraphKernel] = None,
+    ) -> None:
+        self._graph = graph
+        if kernel is None:
+            kernel = GraphKernel.from_networkx(graph) if graph is not None else corridor_graph_kernel()
+        self.kernel = kernel
+        self._owns_kernel = False  # True once self.kernel is this router's private copy
+        self.index = RouteIndex.from_kernel(
+            kernel,
+            kernel.fx_costs(stability_weight, liquidity_weight),
+            make_fx_edge_cost(stability_weight, liquidity_weight),
+        )
+
+    @property
+    def graph(self) -> Any:
+        """Mutable networkx corridor graph (copied from the kernel on first use)."""
+        if self._graph is None:
+            self._graph = self.kernel.to_networkx()
+        return self._graph
+
+    def edge_attrs(self, source: str, target: str) -> Optional[Dict[str, float]]:
+        """Current attributes of the corridor source → target (None if absent)."""
+        kernel = self.kernel
+        if source not in kernel or target not in kernel:
+            return None
+        e = kernel.edge_id(kernel.node_index[source], kernel.node_index[target])
+        return kernel.edge_data(e) if e >= 0 else None
+
+    # ---------- Queries ----------
+
+    def best_path(self, source: str, target: str) -> List[str]:
+        """Cheapest conversion path (inclusive); empty if there is none."""
+        return self.index.path(source, target)
+
+    def quote(self, source: str, target: str) -> Optional[FXQuote]:
+        """Quote the best path source → target, or None if unreachable."""
+        path = self.best_path(source, target)
+        if not path:
+            return None
+
+        kernel = self.kernel
+        spreads = kernel.edge_values("spread")
+        rate_factor = 1.0
+        for u, v in zip(path, path[1:]):
+            rate_factor *= 1.0 - spreads[kernel.edge_id(kernel.node_index[u], kernel.node_index[v])]
+        return FXQuote(
+            source=source,
+            target=target,
+            path=path,
+            cost=self.index.distance(source, target),
+            rate_factor=rate_factor,
+            effective_spread=1.0 - rate_factor,
+        )
+
+    # ---------- Corridor updates ----------
+
+    def update_corridor(self, source: str, target: str, **attrs: Any) -> int:
+        """
+        Update (or add) the corridor source → target, e.g. a new spread.
+
+        Returns the number of source currencies whose best paths were dropped.
+        """
+        self._reweight_kernel(source, target, attrs)
+        if self._graph is None:
+            merged = self.edge_attrs(source, target) or dict(attrs)
+        else:
+            if self._graph.has_edge(source, target):
+                self._graph[source][target].update(attrs)
+            else:
+                self._graph.add_edge(source, target, **attrs)
+            merged = self._graph[source][target]
+        return self.index.update_edge(source, target, merged)
+
+    update_edge = update_corridor  # same interface as RouteEngine.update_edge
+
+    def _reweight_kernel(self, source: str, target: str, attrs: Mapping[str, Any]) -> None:
+        kernel = self.kernel
+        e = (
+            kernel.edge_id(kernel.node_index[source], kernel.node_index[target])
+            if source in kernel and target in kernel else -1
+        )
+        if e < 0:
+            # New corridor: recompiled (read-only); the next re-weight copies it once.
+            self.kernel, self._owns_kernel = kernel.with_edge(source, target, attrs), False
+            return
+        if not self._owns_kernel:
+            self.kernel = kernel.private_copy()
+            self._owns_kernel = True
+        self.kernel.set_edge(e, attrs)
+
+    def remove_corridor(self, source: str, target: str) -> int:
+        """Remove the corridor source → target. Returns trees invalidated."""
+        kernel = self.kernel.without_edge(source, target)
+        if kernel is not self.kernel:
+            self.kernel, self._owns_kernel = kernel, False
+        if self._graph is not None and self._graph.has_edge(source, target):
+            self._graph.remove_edge(source, target)
+        return self.index.remove_edge(source, target)
+
+
+if __name__ == "__main__":
+    router = FXRouter()
+    print("AUD → EUR:", router.quote("AUD", "EUR"))
+    router.update_corridor("SGD", "EUR", spread=0.02)
+    print("AUD → EUR after SGD-EUR widens:", router.quote("AUD", "EUR"))
@@ -0,0 +1,372 @@
+# src/aiva/graph_kernel.py
+
+from __future__ import annotations
+
+import copy
+import heapq
+import math
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Set, Tuple
+
+import networkx as nx
+import numpy as np
+
+from .corridor_graph import build_corridor_graph
+from .hop_graph import build_hop_graph
+
+
+# Edge attributes stored as float64 columns, with the value assumed when
+# an edge does not carry one (the same defaults the scorers use). NaN
+# means "not set": such values are left out of `to_networkx` / `edge_data`.
+EDGE_ATTRIBUTES: Dict[str, float] = {
+    "latency": 0.0,
+    "reliability": 1.0,
+    "spread": 0.0,
+    "stability": 1.0,
+    "liquidity": 1.0,
+    "temp_celsius": math.nan,  # leg temperature; unset legs run at container temperature
+}
+
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    array.setflags(write=False)
+    return array
+
+
+class GraphKernel:
+    """
+    Compact, immutable directed graph for AIVA routing.
+
+    Nodes are integer ids 0..n-1 (`nodes[i]` is the original name).
+    Adjacency is CSR: the successors of node i are
+    `indices[indptr[i]:indptr[i + 1]]`, sorted, and edge e's attributes
+    are `edge_attr(name)[e]`, one float64 array per attribute in
+    `EDGE_ATTRIBUTES`. Node attributes (country, currency, ...) are
+    tuples indexed by node id.
+
+    Every array is read-only, so one kernel can be shared by any number
+    of engines and threads; build it once with `from_networkx` (or the
+    cached `hop_graph_kernel` / `corridor_graph_kernel`) and call
+    `to_networkx` for a private, mutable copy. `with_edge` /
+    `without_edge` return an updated kernel and leave this one untouched.
+
+    The one exception is `private_copy`: a kernel that shares this one's
+    structure but owns writable edge columns, so its owner can re-weight
+    single edges in place with `set_edge` instead of copying every column
+    per update. Only hand it to readers that expect to see those updates.
+    """
+
+    __slots__ = (
+        "nodes", "node_index", "indptr", "indices", "node_attrs",
+        "edge_attr_names", "_edge_attrs", "_adjacency", "_edge_lists",
+    )
+
+    def __init__(
+        self,
+        nodes: Sequence[str],
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        edge_attrs: Mapping[str, np.ndarray],
+        node_attrs: Optional[Mapping[str, Sequence[Any]]] = None,
+        edge_attr_names: Optional[Sequence[str]] = None,
+    ) -> None:
+        self.nodes: Tuple[str, ...] = tuple(nodes)
+        self.node_index: Dict[str, int] = {node: i for i, node in enumerate(self.nodes)}
+        self.indptr = _read_only(np.asarray(indptr, dtype=np.int64))
+        self.indices = _read_only(np.asarray(indices, dtype=np.int32))
+        if len(self.indptr) != len(self.nodes) + 1 or self.indptr[-1] != len(self.indices):
+            raise ValueError("indptr does not match nodes / indices")
+
+        self._edge_attrs: Dict[str, np.ndarray] = {}
+        for name, default in EDGE_ATTRIBUTES.items():
+            values = edge_attrs.get(name)
+            column = (
+                np.full(len(self.indices), default) if values is None
+                else np.array(values, dtype=np.float64)
+            )
+            if column.shape != self.indices.shape:
+                raise ValueError(f"edge attribute {name!r} has the wrong length")
+            self._edge_attrs[name] = _read_only(column)
+
+        self.node_attrs: Dict[str, Tuple[Any, ...]] = {
+            name: tuple(values) for name, values in (node_attrs or {}).items()
+        }
+        # Attributes the source graph actually carried (restored by to_networkx).
+        self.edge_attr_names: Tuple[str, ...] = tuple(
+            edge_attr_names if edge_attr_names is not None else edge_attrs
+        )
+        # Python lists for the search loops: indexing a list is much
+        # cheaper than indexing a NumPy array one element at a time.
+        self._adjacency: Tuple[List[int], List[int]] = (self.indptr.tolist(), self.indices.tolist())
+        self._edge_lists: Dict[str, List[float]] = {}
+
+    # ---------- Conversion ----------
+
+    @classmethod
+    def from_networkx(cls, graph: Any) -> "GraphKernel":
+        """Compile a networkx (Di)Graph; undirected edges become two arcs."""
+        nodes = list(graph.nodes())
+        index = {node: i for i, node in enumerate(nodes)}
+
+        rows: List[Tuple[int, int, Mapping[str, Any]]] = []
+        for u, v, attrs in graph.edges(data=True):
+            rows.append((index[u], index[v], attrs))
+            if not graph.is_directed():
+                rows.append((index[v], index[u], attrs))
+        rows.sort(key=lambda row: (row[0], row[1]))
+
+        indptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+        np.add.at(indptr, [u + 1 for u, _, _ in rows], 1)
+        indptr = np.cumsum(indptr)
+
+        present = [name for name in EDGE_ATTRIBUTES if any(name in attrs for _, _, attrs in rows)]
+        edge_attrs = {
+            name: np.fromiter(
+                (float(attrs.get(name, EDGE_ATTRIBUTES[name])) for _, _, attrs in rows),
+                dtype=np.float64,
+                count=len(rows),
+            )
+            for name in present
+        }
+
+        node_attr_names = sorted({name for _, attrs in graph.nodes(data=True) for name in attrs})
+        node_attrs = {
+            name: [graph.nodes[node].get(name) for node in nodes] for name in node_attr_names
+        }
+        return cls(
+            nodes,
+            indptr,
+            np.array([v for _, v, _ in rows], dtype=np.int32),
+            edge_attrs,
+            node_attrs,
+            present,
+        )
+
+    def to_networkx(self) -> nx.DiGraph:
+        """A fresh, mutable networkx copy (same nodes, edges and attributes)."""
+        graph = nx.DiGraph()
+        for i, node in enumerate(self.nodes):
+            graph.add_node(
+                node,
+                **{name: values[i] for name, values in self.node_attrs.items() if values[i] is not None},
+            )
+        for u, v, e in self.edges():
+            graph.add_edge(self.nodes[u], self.nodes[v], **self.edge_data(e))
+        return graph
+
+    # ---------- Updated copies ----------
+
+    def with_edge(self, u: str, v: str, attrs: Mapping[str, Any]) -> "GraphKernel":
+        """
+        A kernel with the edge u → v added or its attributes updated.
+
+        Re-weighting an existing edge copies only the touched attribute
+        columns (the structure is shared); adding an edge or a node
+        recompiles the kernel.
+        """
+        e = self.edge_id(self.node_index[u], self.node_index[v]) if u in self and v in self else -1
+        if e < 0:
+            graph = self.to_networkx()
+            graph.add_edge(u, v, **attrs)
+            return GraphKernel.from_networkx(graph)
+
+        kernel = copy.copy(self)
+        kernel._edge_attrs = dict(self._edge_attrs)
+        kernel._edge_lists = {}
+        names = list(self.edge_attr_names)
+        for name, value in attrs.items():
+            if name not in EDGE_ATTRIBUTES or not isinstance(value, (int, float)):
+                continue
+            column = self._edge_attrs[name].copy()
+            column[e] = float(value)
+            kernel._edge_attrs[name] = _read_only(column)
+            if name not in names:
+                names.append(name)
+        kernel.edge_attr_names = tuple(names)
+        return kernel
+
+    def private_copy(self) -> "GraphKernel":
+        """A kernel sharing this structure with its own writable edge columns."""
+        kernel = copy.copy(self)
+        kernel._edge_attrs = {name: column.copy() for name, column in self._edge_attrs.items()}
+        kernel._edge_lists = {}
+        return kernel
+
+    def set_edge(self, e: int, attrs: Mapping[str, Any]) -> None:
+        """
+        Re-weight edge e in place; only valid on a `private_copy`.
+
+        Non-numeric and unknown attributes are ignored, as in `with_edge`.
+        """
+        names = list(self.edge_attr_names)
+        for name, value in attrs.items():
+            if name not in EDGE_ATTRIBUTES or not isinstance(value, (int, float)):
+                continue
+            self._edge_attrs[name][e] = float(value)
+            values = self._edge_lists.get(name)
+            if values is not None:
+                values[e] = float(value)
+            if name not in names:
+                names.append(name)
+        self.edge_attr_names = tuple(names)
+
+    def without_edge(self, u: str, v: str) -> "GraphKernel":
+        """A kernel without the edge u → v (this kernel if there is none)."""
+        if u not in self or v not in self or self.edge_id(self.node_index[u], self.node_index[v]) < 0:
+            return self
+        graph = self.to_networkx()
+        graph.remove_edge(u, v)
+        return GraphKernel.from_networkx(graph)
+
+    # ---------- Structure ----------
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.indices)
+
+    def __contains__(self, node: str) -> bool:
+        return node in self.node_index
+
+    def adjacency(self) -> Tuple[List[int], List[int]]:
+        """(indptr, indices) as Python lists, for search loops."""
+        return self._adjacency
+
+    def edges(self) -> Iterator[Tuple[int, int, int]]:
+        """(u, v, edge id) for every edge, in CSR order."""
+        indptr, indices = self._adjacency
+        for u in range(len(self.nodes)):
+            for e in range(indptr[u], indptr[u + 1]):
+                yield u, indices[e], e
+
+    def successors(self, node: int) -> np.ndarray:
+        return self.indices[self.indptr[node]:self.indptr[node + 1]]
+
+    def edge_id(self, u: int, v: int) -> int:
+        """Edge id of u → v, or -1 if there is no such edge (binary search)."""
+        start, end = int(self.indptr[u]), int(self.indptr[u + 1])
+        pos = start + int(np.searchsorted(self.indices[start:end], v))
+        return pos if pos < end and self.indices[pos] == v else -1
+
+    def edge_attr(self, name: str) -> np.ndarray:
+        return self._edge_attrs[name]
+
+    def edge_values(self, name: str) -> List[float]:
+        """`edge_attr(name)` as a (cached) Python list, for search loops."""
+        values = self._edge_lists.get(name)
+        if values is None:
+            values = self._edge_lists[name] = self._edge_attrs[name].tolist()
+        return values
+
+    def edge_data(self, e: int) -> Dict[str, float]:
+        """Attribute dict of edge e, as the source graph carried it."""
+        data = {name: self.edge_values(name)[e] for name in self.edge_attr_names}
+        return {name: value for name, value in data.items() if not math.isnan(value)}
+
+    def node_attr(self, name: str, node: int, default: Any = None) -> Any:
+        values = self.node_attrs.get(name)
+        value = values[node] if values is not None else None
+        return default if value is None else value
+
+    # ---------- Vectorised edge costs ----------
+
+    def hop_costs(self) -> np.ndarray:
+        """`hop_edge_cost` for every edge: latency / reliability, inf if unusable."""
+        latency, reliability = self._edge_attrs["latency"], self._edge_attrs["reliability"]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            costs = latency / reliability
+        return np.where(reliability <= 0.0, math.inf, costs)
+
+    def fx_costs(self, stability_weight: float, liquidity_weight: float) -> np.ndarray:
+        """`make_fx_edge_cost(stability_weight, liquidity_weight)` for every edge."""
+        spread = self._edge_attrs["spread"]
+        stability = np.minimum(self._edge_attrs["stability"], 1.0)
+        liquidity = np.minimum(self._edge_attrs["liquidity"], 1.0)
+        unusable = (spread >= 1.0) | (stability <= 0.0) | (liquidity <= 0.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            costs = (
+                -np.log1p(-np.maximum(spread, 0.0))
+                - stability_weight * np.log(stability)
+                - liquidity_weight * np.log(liquidity)
+            )
+        return np.where(unusable, math.inf, costs)
+
+    # ---------- Search ----------
+
+    def dijkstra(
+        self,
+        source: int,
+        costs: np.ndarray,
+        excluded: Optional[Set[int]] = None,
+        extra: Optional[Mapping[int, Mapping[int, float]]] = None,
+        num_nodes: Optional[int] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Single-source shortest paths over non-negative edge `costs`.
+
+        Returns (dist, pred) arrays indexed by node id: dist is inf and
+        pred is -1 for unreachable nodes (pred[source] is -1 too).
+        Nodes in `excluded` are never entered. `extra` adds arcs
+        {u: {v: cost}} on top of the CSR edges; with `num_nodes`, they may
+        use ids past the kernel's own nodes.
+        """
+        kernel_nodes = len(self.nodes)
+        n = kernel_nodes if num_nodes is None else num_nodes
+        dist = [math.inf] * n
+        pred = [-1] * n
+        done = [False] * n
+        indptr, indices = self._adjacency
+        weights = costs.tolist()
+        blocked = excluded or set()
+        arcs: Mapping[int, Mapping[int, float]] = extra or {}
+
+        dist[source] = 0.0
+        heap = [(0.0, source)]
+        while heap:
+            d, u = heapq.heappop(heap)
+            if done[u]:
+                continue
+            done[u] = True
+            if u < kernel_nodes:
+                for e in range(indptr[u], indptr[u + 1]):
+                    v = indices[e]
+                    nd = d + weights[e]
+                    if nd < dist[v] and v not in blocked:
+                        dist[v] = nd
+                        pred[v] = u
+                        heapq.heappush(heap, (nd, v))
+            for v, w in arcs.get(u, {}).items():
+                nd = d + w
+                if nd < dist[v] and v not in blocked:
+                    dist[v] = nd
+                    pred[v] = u
+                    heapq.heappush(heap, (nd, v))
+
+        return np.array(dist, dtype=np.float64), np.array(pred, dtype=np.int64)
+
+    def path(self, pred: np.ndarray, source: int, target: int) -> List[str]:
+        """Walk a `dijkstra` predecessor array back into node names."""
+        if target != source and pred[target] < 0:
+            return []
+        path = [target]
+        while path[-1] != source:
+            path.append(int(pred[path[-1]]))
+        return [self.nodes[i] for i in reversed(path)]
+
+
+# ---------- Shared kernels ----------
+
+
+@lru_cache(maxsize=None)
+def hop_graph_kernel() -> GraphKernel:
+    """The base hop graph, compiled once per process and shared read-only."""
+    return GraphKernel.from_networkx(build_hop_graph())
+
+
+@lru_cache(maxsize=None)
+def corridor_graph_kernel() -> GraphKernel:
+    """The base FX corridor graph, compiled once per process and shared read-only."""
+    return GraphKernel.from_networkx(build_corridor_graph())
@@ -10,13 +10,15 @@ def build_hop_graph():
     G = nx.DiGraph()
 
     # Define institutions (Phase 1 basic version)
+    # Each node carries its jurisdiction and settlement currency so the
+    # merge engine can run compliance and FX volatility checks per hop.
     nodes = [
-        "AU_BANK_A",
-        "AU_BANK_B",
-        "SG_CORR_1",
-        "SG_CORR_2",
-        "EU_BANK_X",
-        "EU_BANK_Y",
+        ("AU_BANK_A", {"country": "Australia", "currency": "AUD"}),
+        ("AU_BANK_B", {"country": "Australia", "currency": "AUD"}),
+        ("SG_CORR_1", {"country": "Singapore", "currency": "SGD"}),
+        ("SG_CORR_2", {"country": "Singapore", "currency": "SGD"}),
+        ("EU_BANK_X", {"country": "European Union", "currency": "EUR"}),
+        ("EU_BANK_Y", {"country": "European Union", "currency": "EUR"}),
     ]
     G.add_nodes_from(nodes)
 
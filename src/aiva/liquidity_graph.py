@@ -3,13 +3,26 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict
+from typing import TYPE_CHECKING, Dict, Mapping, Optional
 
+import numpy as np
+
+from .score_cache import LIQUIDITY, ScoreCache
+
+if TYPE_CHECKING:
+    from .liquidity_ledger import LiquidityLedger
 
 # Mock "balance sheet" for key nodes in the network.
 MOCK_NODE_BALANCES: Dict[str, float] = {
     "Bank_Sydney": 1_000_000.00,
     "Bank_Singapore": 50_000.00,
+    # Hop graph institutions
+    "AU_BANK_A": 5_000_000.00,
+    "AU_BANK_B": 2_000_000.00,
+    "SG_CORR_1": 750_000.00,
+    "SG_CORR_2": 1_500_000.00,
+    "EU_BANK_X": 3_000_000.00,
+    "EU_BANK_Y": 2_500_000.00,
 }
 
 
@@ -44,8 +57,35 @@ class LiquidityGraph:
         score = 0.5   (high stress; not suitable for automated routing)
     - Otherwise:
         score = 1.0   (healthy liquidity headroom)
+
+    Balances come from `balances` (default: `MOCK_NODE_BALANCES`). Pass a
+    `LiquidityLedger` as `ledger` to score against live available
+    liquidity instead: scalar scores read the node's current available
+    balance, and each batch is scored against one consistent
+    `ledger.snapshot()`.
+
+    Pass a `ScoreCache` to memoise scores per context against static
+    `balances`; call `cache.invalidate("liquidity")` after editing them.
+    Live ledger balances move with every reservation, so scores are never
+    cached while a ledger is attached.
     """
 
+    def __init__(
+        self,
+        balances: Optional[Mapping[str, float]] = None,
+        ledger: Optional["LiquidityLedger"] = None,
+        cache: Optional[ScoreCache] = None,
+    ) -> None:
+        self.balances: Mapping[str, float] = MOCK_NODE_BALANCES if balances is None else balances
+        self.ledger = ledger
+        self.cache = cache
+        self._cache_owner = object()  # keeps this graph's scores apart in a shared cache
+
+    def _balance(self, node_id: str) -> Optional[float]:
+        if self.ledger is not None:
+            return self.ledger.available(node_id) if node_id in self.ledger else None
+        return self.balances.get(node_id)
+
     def get_liquidity_score(self, ctx: LiquidityContext) -> float:
         """
         Compute a liquidity score for the given node.
@@ -60,10 +100,15 @@ class LiquidityGraph:
         float
             Liquidity score in [0.0, 1.0].
         """
+        if self.cache is not None and self.ledger is None:
+            return self.cache.get_or_compute(LIQUIDITY, ctx, self._score, self._cache_owner)
+        return self._score(ctx)
+
+    def _score(self, ctx: LiquidityContext) -> float:
         node_id = ctx.node_id
         amount = ctx.transaction_amount
 
-        balance = MOCK_NODE_BALANCES.get(node_id)
+        balance = self._balance(node_id)
 
         # Unknown node: treat as zero balance for now.
         if balance is None:
@@ -85,6 +130,54 @@ class LiquidityGraph:
         # Otherwise assume healthy.
         return 1.0
 
+    def calculate_score(self, node_id: str, transaction_amount: float) -> float:
+        """Keyword convenience wrapper around `get_liquidity_score`."""
+        return self.get_liquidity_score(
+            LiquidityContext(node_id=node_id, transaction_amount=transaction_amount)
+        )
+
+    def get_liquidity_score_batch(
+        self,
+        node_ids: np.ndarray,
+        transaction_amounts: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Vectorised `get_liquidity_score` over columnar node ids and amounts.
+
+        Balances are looked up once per distinct node, not once per row,
+        from a single ledger snapshot when a ledger is attached.
+
+        Returns
+        -------
+        np.ndarray
+            float64 scores, identical to the scalar version element-wise.
+        """
+        node_ids, amounts = np.broadcast_arrays(
+            np.asarray(node_ids),
+            np.asarray(transaction_amounts, dtype=np.float64),
+        )
+        unique_nodes, inverse = np.unique(node_ids, return_inverse=True)
+        view = self.ledger.snapshot() if self.ledger is not None else self.balances
+        known_balances = np.array(
+            [view.get(str(n), np.nan) for n in unique_nodes],
+            dtype=np.float64,
+        )
+        balances = known_balances[inverse.reshape(node_ids.shape)]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            utilisation_ratio = amounts / balances
+
+        return np.select(
+            [
+                np.isnan(balances),                             # unknown node
+                amounts > balances,                             # not enough funds
+                amounts <= 0,                                   # trivially safe
+                utilisation_ratio >= LIQUIDITY_STRESS_THRESHOLD,  # stress zone
+            ],
+            [0.0, 0.0, 1.0, 0.5],
+            default=1.0,
+        )
+
 
 if __name__ == "__main__":
     graph = LiquidityGraph()
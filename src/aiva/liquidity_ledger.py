@@ -0,0 +1,232 @@
+# src/aiva/liquidity_ledger.py
+
+from __future__ import annotations
+
+import itertools
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from .liquidity_graph import MOCK_NODE_BALANCES
+
+
+DEFAULT_SNAPSHOT_RETRIES: int = 8
+
+
+class InsufficientLiquidityError(ValueError):
+    """Raised when a node cannot cover a reservation."""
+
+    def __init__(self, node_id: str, amount: float, available: float) -> None:
+        super().__init__(
+            f"insufficient liquidity at {node_id}: requested {amount:,.2f}, available {available:,.2f}"
+        )
+        self.node_id = node_id
+        self.amount = amount
+        self.available = available
+
+
+@dataclass(frozen=True)
+class Reservation:
+    """Funds held at one node until they are committed or released."""
+    reservation_id: int
+    node_id: str
+    amount: float
+
+
+class _Account:
+    __slots__ = ("balance", "reserved", "holds", "version", "lock")
+
+    def __init__(self, balance: float) -> None:
+        self.balance = balance
+        self.reserved = 0.0
+        self.holds: Dict[int, float] = {}
+        # Seqlock counter, bumped under `lock` before and after every
+        # change: odd while a write is in progress.
+        self.version = 0
+        self.lock = threading.Lock()
+
+    @property
+    def available(self) -> float:
+        return self.balance - self.reserved
+
+
+class LedgerSnapshot(Mapping[str, float]):
+    """Immutable, mutually consistent view of available balance per node."""
+
+    def __init__(self, available: Dict[str, float]) -> None:
+        self._available = available
+
+    def __getitem__(self, node_id: str) -> float:
+        return self._available[node_id]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._available)
+
+    def __len__(self) -> int:
+        return len(self._available)
+
+
+class LiquidityLedger:
+    """
+    Live per-node liquidity with reservations.
+
+    Each node is an account with its own lock, so transactions touching
+    different correspondents never contend; there is no global lock on
+    the hot path.
+
+    - `reserve` holds funds at one node (available = balance - reserved).
+    - `reserve_many` holds funds at several nodes all-or-nothing, taking
+      the node locks in sorted order so concurrent callers cannot deadlock.
+    - `commit` consumes a reservation (the funds leave the node),
+      `release` returns it to the available balance.
+    - `snapshot` returns a consistent view for scoring: it reads every
+      account's (version, available) without locking, then re-checks the
+      versions and retries until no account was written in between
+      (a seqlock), falling back to briefly holding every lock if writers
+      keep winning.
+
+    Parameters
+    ----------
+    balances : Optional[Mapping[str, float]]
+        Opening balance per node (default: `MOCK_NODE_BALANCES`).
+    """
+
+    def __init__(self, balances: Optional[Mapping[str, float]] = None) -> None:
+        opening = MOCK_NODE_BALANCES if balances is None else balances
+        self._accounts: Dict[str, _Account] = {
+            node: _Account(float(amount)) for node, amount in opening.items()
+        }
+        self._accounts_lock = threading.Lock()  # only for opening new accounts
+        self._ids = itertools.count(1)
+
+    # ---------- Accounts ----------
+
+    def _account(self, node_id: str) -> _Account:
+        try:
+            return self._accounts[node_id]
+        except KeyError:
+            raise KeyError(f"unknown node {node_id!r}") from None
+
+    def open_account(self, node_id: str, balance: float = 0.0) -> None:
+        with self._accounts_lock:
+            if node_id in self._accounts:
+                raise ValueError(f"account {node_id!r} already exists")
+            # Copy-on-write so lock-free readers never see a dict mid-resize.
+            accounts = dict(self._accounts)
+            accounts[node_id] = _Account(float(balance))
+            self._accounts = accounts
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self._accounts
+
+    def nodes(self) -> List[str]:
+        return list(self._accounts)
+
+    def balance(self, node_id: str) -> float:
+        return self._account(node_id).balance
+
+    def reserved(self, node_id: str) -> float:
+        return self._account(node_id).reserved
+
+    def available(self, node_id: str) -> float:
+        return self._account(node_id).available
+
+    def credit(self, node_id: str, amount: float) -> None:
+        if amount < 0:
+            raise ValueError("amount must be >= 0")
+        account = self._account(node_id)
+        with account.lock:
+            account.version += 1
+            account.balance += amount
+            account.version += 1
+
+    # ---------- Reservations ----------
+
+    @staticmethod
+    def _hold(account: _Account, node_id: str, amount: float, reservation_id: int) -> Reservation:
+        if amount > account.available:
+            raise InsufficientLiquidityError(node_id, amount, account.available)
+        account.version += 1
+        account.reserved += amount
+        account.holds[reservation_id] = amount
+        account.version += 1
+        return Reservation(reservation_id, node_id, amount)
+
+    def reserve(self, node_id: str, amount: float) -> Reservation:
+        """Hold `amount` at `node_id`; raises InsufficientLiquidityError."""
+        if amount < 0:
+            raise ValueError("amount must be >= 0")
+        account = self._account(node_id)
+        with account.lock:
+            return self._hold(account, node_id, amount, next(self._ids))
+
+    def reserve_many(self, requests: Iterable[Tuple[str, float]]) -> List[Reservation]:
+        """
+        Hold several (node_id, amount) amounts atomically: either every
+        reservation is made or none is (InsufficientLiquidityError).
+
+        Amounts for the same node are summed into one reservation.
+        """
+        totals: Dict[str, float] = {}
+        for node_id, amount in requests:
+            if amount < 0:
+                raise ValueError("amount must be >= 0")
+            totals[node_id] = totals.get(node_id, 0.0) + amount
+
+        ordered = sorted(totals)
+        accounts = [self._account(node_id) for node_id in ordered]
+        for account in accounts:
+            account.lock.acquire()
+        try:
+            for node_id, account in zip(ordered, accounts):
+                if totals[node_id] > account.available:
+                    raise InsufficientLiquidityError(node_id, totals[node_id], account.available)
+            return [
+                self._hold(account, node_id, totals[node_id], next(self._ids))
+                for node_id, account in zip(ordered, accounts)
+            ]
+        finally:
+            for account in reversed(accounts):
+                account.lock.release()
+
+    def _settle(self, reservation: Reservation, consume: bool) -> None:
+        account = self._account(reservation.node_id)
+        with account.lock:
+            amount = account.holds.pop(reservation.reservation_id, None)
+            if amount is None:
+                raise ValueError(f"reservation {reservation.reservation_id} is not active")
+            account.version += 1
+            account.reserved -= amount
+            if consume:
+                account.balance -= amount
+            account.version += 1
+
+    def commit(self, reservation: Reservation) -> None:
+        """Consume a reservation: the held funds leave the node."""
+        self._settle(reservation, consume=True)
+
+    def release(self, reservation: Reservation) -> None:
+        """Cancel a reservation: the held funds become available again."""
+        self._settle(reservation, consume=False)
+
+    # ---------- Snapshots ----------
+
+    def snapshot(self, retries: int = DEFAULT_SNAPSHOT_RETRIES) -> LedgerSnapshot:
+        """Consistent available balance for every node (see class docstring)."""
+        accounts = self._accounts
+        for _ in range(retries):
+            first = [(node, acc.version, acc.available) for node, acc in accounts.items()]
+            if all(
+                version % 2 == 0 and acc.version == version
+                for (_, version, _), acc in zip(first, accounts.values())
+            ):
+                return LedgerSnapshot({node: available for node, _, available in first})
+
+        ordered = sorted(accounts)
+        for node in ordered:
+            accounts[node].lock.acquire()
+        try:
+            return LedgerSnapshot({node: accounts[node].available for node in ordered})
+        finally:
+            for node in reversed(ordered):
+                accounts[node].lock.release()
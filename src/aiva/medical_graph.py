@@ -2,8 +2,18 @@
 
 from __future__ import annotations
 
+import math
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Dict, Tuple
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .batch_utils import round_and_clamp
+
+SECONDS_PER_HOUR: float = 3600.0
+MAX_VIABILITY_TABLE_BYTES: int = 32 * 1024 * 1024  # viability tables kept per engine
 
 
 @dataclass(frozen=True)
@@ -25,6 +35,20 @@ class MedicalGraph:
     - Otherwise, viability decays from 1.0 down towards 0.1
       as we approach the limit.
     - Temperature outside the safe band reduces viability further.
+
+    Routing asks for viability at many transit durations with one fixed
+    container temperature, and hop latencies are whole seconds. So
+    `lookup_viability` answers from a float64 table with one entry per
+    second up to the payload's time limit, built once with the vectorised
+    scorer and identical to `calculate_viability` at every entry.
+
+    Temperature only enters the formula through the penalty factor, so
+    tables are keyed on (payload, factor) rather than the raw reading:
+    every temperature inside the safe band shares one table, as does
+    every temperature 10 °C or more outside it. Tables are kept in an LRU
+    bounded by `max_table_bytes`; a payload whose table alone exceeds the
+    budget is always scored with the formula. Payload types beyond the
+    built-ins can be added with `register_payload`.
     """
 
     # Hard limits & safe temperature bands (simplified)
@@ -34,12 +58,55 @@ class MedicalGraph:
         "Vaccine": PayloadSpec(time_limit_hours=24.0, safe_temp_range_c=(2.0, 8.0)),
     }
 
+    def __init__(
+        self,
+        payload_specs: Optional[Dict[str, PayloadSpec]] = None,
+        max_table_bytes: int = MAX_VIABILITY_TABLE_BYTES,
+    ) -> None:
+        self._payload_specs: Dict[str, PayloadSpec] = dict(self._PAYLOAD_SPECS)
+        self._payload_specs.update(payload_specs or {})
+        self.max_table_bytes = max_table_bytes
+        # (payload_type, temp_factor) -> viability per whole second of transit,
+        # least recently used first
+        self._tables: "OrderedDict[Tuple[str, float], np.ndarray]" = OrderedDict()
+        self._table_bytes = 0
+        # Guards _tables/_table_bytes: one engine is shared by scoring threads.
+        self._tables_lock = threading.Lock()
+
     def _get_spec(self, payload_type: str) -> PayloadSpec:
         try:
-            return self._PAYLOAD_SPECS[payload_type]
+            return self._payload_specs[payload_type]
         except KeyError as exc:
             raise ValueError(f"Unknown payload_type: {payload_type!r}") from exc
 
+    def register_payload(
+        self,
+        payload_type: str,
+        time_limit_hours: float,
+        safe_temp_range_c: Tuple[float, float],
+    ) -> PayloadSpec:
+        """Add (or replace) a payload spec, e.g. "Kidney" (36h, 4–8 °C)."""
+        t_min, t_max = safe_temp_range_c
+        if time_limit_hours <= 0:
+            raise ValueError("time_limit_hours must be > 0")
+        if t_min > t_max:
+            raise ValueError("safe_temp_range_c must be (min, max)")
+
+        spec = PayloadSpec(time_limit_hours=time_limit_hours, safe_temp_range_c=(t_min, t_max))
+        with self._tables_lock:
+            self._payload_specs[payload_type] = spec
+            for key in [key for key in self._tables if key[0] == payload_type]:
+                self._table_bytes -= self._tables.pop(key).nbytes
+        return spec
+
+    def payload_spec(self, payload_type: str) -> PayloadSpec:
+        """Spec for `payload_type`; raises ValueError if it is not registered."""
+        return self._get_spec(payload_type)
+
+    @property
+    def payload_types(self) -> List[str]:
+        return list(self._payload_specs)
+
     def calculate_viability(
         self,
         payload_type: str,
@@ -71,23 +138,160 @@ class MedicalGraph:
             remaining_fraction = (spec.time_limit_hours - duration_hours) / spec.time_limit_hours
             base_viability = 0.1 + remaining_fraction * 0.9
 
-        # Temperature penalty
+        viability = base_viability * self._temp_factor(spec, temp_celsius)
+        # Clamp to [0, 1] and round slightly for nicer printing
+        return max(0.0, min(1.0, round(viability, 3)))
+
+    @staticmethod
+    def _temp_factor(spec: PayloadSpec, temp_celsius: float) -> float:
+        """Temperature penalty multiplier in [0.5, 1.0]."""
         t_min, t_max = spec.safe_temp_range_c
         if t_min <= temp_celsius <= t_max:
-            temp_factor = 1.0
+            return 1.0
+        # Degrees outside safe band (simplified penalty, capped)
+        if temp_celsius < t_min:
+            delta = t_min - temp_celsius
         else:
-            # Degrees outside safe band (simplified penalty, capped)
-            if temp_celsius < t_min:
-                delta = t_min - temp_celsius
-            else:
-                delta = temp_celsius - t_max
-            delta_capped = min(delta, 10.0)
-            # Each degree outside range reduces viability by 5%, up to 50%
-            temp_factor = max(0.5, 1.0 - 0.05 * delta_capped)
-
-        viability = base_viability * temp_factor
-        # Clamp to [0, 1] and round slightly for nicer printing
-        return max(0.0, min(1.0, round(viability, 3)))
+            delta = temp_celsius - t_max
+        delta_capped = min(delta, 10.0)
+        # Each degree outside range reduces viability by 5%, up to 50%
+        return max(0.5, 1.0 - 0.05 * delta_capped)
+
+    def calculate_viability_batch(
+        self,
+        payload_types: np.ndarray,
+        durations_hours: np.ndarray,
+        temps_celsius: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Vectorised `calculate_viability` over columnar inputs.
+
+        Parameters
+        ----------
+        payload_types : array-like of str
+        durations_hours : array-like of float
+        temps_celsius : array-like of float
+            Equal-length (or broadcastable) columns, one row per candidate.
+
+        Returns
+        -------
+        np.ndarray
+            float64 viability scores, identical to calling
+            `calculate_viability` row by row.
+        """
+        payload_types, durations, temps = np.broadcast_arrays(
+            np.asarray(payload_types),
+            np.asarray(durations_hours, dtype=np.float64),
+            np.asarray(temps_celsius, dtype=np.float64),
+        )
+        scores = np.zeros(durations.shape, dtype=np.float64)
+
+        for payload_type in np.unique(payload_types):
+            spec = self._get_spec(str(payload_type))
+            mask = payload_types == payload_type
+            d = durations[mask]
+            t = temps[mask]
+
+            limit = spec.time_limit_hours
+            remaining_fraction = (limit - d) / limit
+            base_viability = np.where(d <= 0, 1.0, 0.1 + remaining_fraction * 0.9)
+
+            t_min, t_max = spec.safe_temp_range_c
+            delta = np.where(t < t_min, t_min - t, t - t_max)
+            delta_capped = np.minimum(delta, 10.0)
+            penalised = 1.0 - 0.05 * delta_capped
+            temp_factor = np.where(penalised > 0.5, penalised, 0.5)
+            temp_factor = np.where((t_min <= t) & (t <= t_max), 1.0, temp_factor)
+
+            viability = round_and_clamp(base_viability * temp_factor)
+            scores[mask] = np.where(d >= limit, 0.0, viability)
+
+        return scores
+
+    # ---------- Precomputed tables ----------
+
+    def _table(self, payload_type: str, temp_celsius: float) -> Optional[np.ndarray]:
+        spec = self._get_spec(payload_type)
+        key = (payload_type, self._temp_factor(spec, temp_celsius))
+        with self._tables_lock:
+            table = self._tables.get(key)
+            if table is not None:
+                self._tables.move_to_end(key)
+                return table
+
+        limit_seconds = math.ceil(spec.time_limit_hours * SECONDS_PER_HOUR)
+        nbytes = (limit_seconds + 1) * np.dtype(np.float64).itemsize
+        if nbytes > self.max_table_bytes:
+            return None
+
+        seconds = np.arange(limit_seconds + 1, dtype=np.float64)
+        durations = seconds / SECONDS_PER_HOUR
+        remaining_fraction = (spec.time_limit_hours - durations) / spec.time_limit_hours
+        base_viability = np.where(durations <= 0, 1.0, 0.1 + remaining_fraction * 0.9)
+        table = round_and_clamp(base_viability * key[1])
+        table[durations >= spec.time_limit_hours] = 0.0
+        table.setflags(write=False)
+
+        # Built outside the lock; insert unless another thread beat us to it
+        # or the payload was re-registered meanwhile (then just don't cache).
+        with self._tables_lock:
+            existing = self._tables.get(key)
+            if existing is not None:
+                self._tables.move_to_end(key)
+                return existing
+            if self._payload_specs.get(payload_type) is not spec:
+                return table
+            while self._tables and self._table_bytes + table.nbytes > self.max_table_bytes:
+                _, evicted = self._tables.popitem(last=False)
+                self._table_bytes -= evicted.nbytes
+            self._tables[key] = table
+            self._table_bytes += table.nbytes
+        return table
+
+    @property
+    def table_bytes(self) -> int:
+        """Memory held by the cached viability tables."""
+        return self._table_bytes
+
+    def viability_table(self, payload_type: str, temp_celsius: float) -> np.ndarray:
+        """Viability at 0, 1, 2, ... seconds of transit (read-only; 0.0 past the end)."""
+        table = self._table(payload_type, temp_celsius)
+        if table is None:
+            spec = self._get_spec(payload_type)
+            seconds = np.arange(math.ceil(spec.time_limit_hours * SECONDS_PER_HOUR) + 1)
+            table = self.calculate_viability_batch(
+                np.array([payload_type]), seconds / SECONDS_PER_HOUR, temp_celsius
+            )
+            table.setflags(write=False)
+        return table
+
+    def lookup_viability(
+        self,
+        payload_type: str,
+        duration_seconds: float,
+        temp_celsius: float,
+    ) -> float:
+        """
+        `calculate_viability` for a transit time given in seconds.
+
+        Whole, non-negative seconds are an O(1) table lookup. Anything
+        else, such as fractional seconds, a NaN input or a payload too
+        long-lived to table, falls back to the formula, so the result
+        always equals
+        ``calculate_viability(payload_type, duration_seconds / 3600, temp_celsius)``.
+        """
+        if (
+            duration_seconds >= 0
+            and float(duration_seconds).is_integer()
+            and not math.isnan(temp_celsius)
+        ):
+            table = self._table(payload_type, temp_celsius)
+            if table is not None:
+                i = int(duration_seconds)
+                return float(table[i]) if i < len(table) else 0.0
+        return self.calculate_viability(
+            payload_type, duration_seconds / SECONDS_PER_HOUR, temp_celsius
+        )
 
 
 if __name__ == "__main__":
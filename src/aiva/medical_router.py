@@ -0,0 +1,189 @@
+# src/aiva/medical_router.py
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from .graph_kernel import GraphKernel, hop_graph_kernel
+from .medical_graph import SECONDS_PER_HOUR, MedicalGraph
+
+
+@dataclass(frozen=True)
+class MedicalRoute:
+    """
+    Best cold-chain route for one payload.
+
+    Attributes
+    ----------
+    path : List[str]
+        Hop graph nodes from origin to destination, inclusive.
+    viability : float
+        `MedicalGraph` viability at arrival.
+    duration_hours : float
+        Cumulative transit time (sum of hop `latency`, in hours).
+    worst_temp_celsius : float
+        Temperature of the leg furthest outside the payload's safe band
+        (the exposure that drives the temperature penalty).
+    labels_expanded : int
+        Partial paths taken off the search frontier (search effort).
+    """
+    path: List[str]
+    viability: float
+    duration_hours: float
+    worst_temp_celsius: float
+    labels_expanded: int
+
+
+def _band_excess(temp: float, safe_range: Tuple[float, float]) -> float:
+    t_min, t_max = safe_range
+    if temp < t_min:
+        return t_min - temp
+    if temp > t_max:
+        return temp - t_max
+    return 0.0
+
+
+class MedicalRouter:
+    """
+    Time-dependent route search for biological payloads.
+
+    Transit time accumulates along hop `latency` (seconds). Temperature
+    exposure accumulates along legs: a leg may carry its own
+    `temp_celsius` attribute (e.g. an unrefrigerated transfer), otherwise
+    it runs at the container temperature, and a path is penalised for the
+    leg furthest outside the safe band.
+
+    Viability never increases as a path grows (more time, equal or worse
+    exposure), so the search is best-first on viability: the first
+    complete path taken off the frontier is optimal. Along the way,
+
+    - a partial path is dropped as soon as it reaches the payload's
+      `time_limit_hours` (viability 0.0), before any of its extensions
+      are generated
+    - a partial path is dropped when another path to the same node is
+      no slower and no more exposed (dominance)
+
+    The search runs on a `GraphKernel` (integer node ids, `latency` and
+    `temp_celsius` read from its edge arrays).
+
+    Parameters
+    ----------
+    graph : Optional[nx.DiGraph]
+        Hop graph with `latency` on every edge (default: the shared
+        `hop_graph_kernel()`).
+    medical : Optional[MedicalGraph]
+        Viability engine (and payload specs).
+    kernel : Optional[GraphKernel]
+        Precompiled hop graph kernel to use instead of `graph`.
+    """
+
+    def __init__(
+        self,
+        graph: Optional[Any] = None,
+        medical: Optional[MedicalGraph] = None,
+        kernel: Optional[GraphKernel] = None,
+    ) -> None:
+        if kernel is None:
+            kernel = GraphKernel.from_networkx(graph) if graph is not None else hop_graph_kernel()
+        self.kernel = kernel
+        self.medical = medical or MedicalGraph()
+
+    def best_route(
+        self,
+        origin: str,
+        destination: str,
+        payload_type: str,
+        temp_celsius: float = 4.0,
+    ) -> Optional[MedicalRoute]:
+        """
+        Return the max-viability route origin → destination, or None.
+
+        None means every route exceeds the payload's time limit (or the
+        nodes are unknown / disconnected). Raises ValueError for an
+        unknown payload type.
+        """
+        spec = self.medical.payload_spec(payload_type)
+        kernel = self.kernel
+        source = kernel.node_index.get(origin)
+        target = kernel.node_index.get(destination)
+        if source is None or target is None:
+            return None
+        indptr, indices = kernel.adjacency()
+        latencies = kernel.edge_values("latency")
+        leg_temps = kernel.edge_values("temp_celsius")  # NaN: container temperature
+
+        limit_seconds = spec.time_limit_hours * SECONDS_PER_HOUR
+        safe_range = spec.safe_temp_range_c
+
+        def viability(seconds: float, worst_temp: float) -> float:
+            return self.medical.lookup_viability(payload_type, seconds, worst_temp)
+
+        # Non-dominated (seconds, excess) labels per node.
+        labels: Dict[int, List[Tuple[float, float]]] = {}
+
+        def dominated(node: int, seconds: float, excess: float) -> bool:
+            kept = labels.setdefault(node, [])
+            if any(s <= seconds and e <= excess for s, e in kept):
+                return True
+            kept[:] = [(s, e) for s, e in kept if not (seconds <= s and excess <= e)]
+            kept.append((seconds, excess))
+            return False
+
+        start_excess = _band_excess(temp_celsius, safe_range)
+        start_viability = viability(0.0, temp_celsius)
+        if start_viability == 0.0:
+            return None
+        dominated(source, 0.0, start_excess)
+
+        # Max-heap on viability, then fastest; the counter keeps pops stable.
+        tie = itertools.count()
+        frontier = [(-start_viability, 0.0, next(tie), source, (source,), temp_celsius, start_excess)]
+        expanded = 0
+
+        while frontier:
+            neg_viability, seconds, _, node, path, worst_temp, excess = heapq.heappop(frontier)
+            expanded += 1
+
+            if node == target:
+                return MedicalRoute(
+                    path=[kernel.nodes[i] for i in path],
+                    viability=-neg_viability,
+                    duration_hours=seconds / SECONDS_PER_HOUR,
+                    worst_temp_celsius=worst_temp,
+                    labels_expanded=expanded,
+                )
+
+            for e in range(indptr[node], indptr[node + 1]):
+                nbr = indices[e]
+                if nbr in path:
+                    continue
+                new_seconds = seconds + latencies[e]
+                if new_seconds >= limit_seconds:
+                    continue  # hard time limit: prune before going any deeper
+
+                leg_temp = temp_celsius if math.isnan(leg_temps[e]) else leg_temps[e]
+                leg_excess = _band_excess(leg_temp, safe_range)
+                new_worst, new_excess = (
+                    (leg_temp, leg_excess) if leg_excess > excess else (worst_temp, excess)
+                )
+                if dominated(nbr, new_seconds, new_excess):
+                    continue
+
+                new_viability = viability(new_seconds, new_worst)
+                if new_viability == 0.0:
+                    continue
+                heapq.heappush(
+                    frontier,
+                    (-new_viability, new_seconds, next(tie), nbr, path + (nbr,), new_worst, new_excess),
+                )
+
+        return None
+
+
+if __name__ == "__main__":
+    router = MedicalRouter()
+    print("Heart AU_BANK_A → EU_BANK_Y:", router.best_route("AU_BANK_A", "EU_BANK_Y", "Heart"))
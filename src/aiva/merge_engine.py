@@ -2,41 +2,401 @@
 
 from __future__ import annotations
 
-from typing import List
+import heapq
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
-from .hop_graph import build_hop_graph
+from .compliance_graph import ComplianceContext, ComplianceGraph
+from .graph_kernel import GraphKernel, hop_graph_kernel
+from .liquidity_graph import LiquidityContext, LiquidityGraph
+from .medical_graph import MedicalGraph
+from .route_index import RouteIndex
+from .score_cache import ScoreCache
+from .volatility_graph import CorridorVolatilityContext, VolatilityGraph
 
 
 class RouteEngine:
     """
     Thin routing facade used by the Lupine walking skeleton.
 
-    Right now this is intentionally simple:
-    - We build the hop graph (so future work can use it).
-    - We expose a single method `get_best_route(origin, destination)`
-      that returns a static happy-path route for the demo.
+    Routes are answered from a `RouteIndex` over the hop graph's
+    `GraphKernel` (default: the process-wide `hop_graph_kernel()`, so
+    creating an engine compiles nothing):
+    - Edge weight is the expected settlement time of a hop,
+      latency / reliability (see `hop_edge_cost`).
+    - A shortest-path tree is built the first time an origin is queried,
+      so repeated `get_best_route(origin, destination)` calls are a
+      predecessor walk rather than a graph search.
+    - `update_edge` re-weights a hop and only rebuilds the origins whose
+      routes can change.
 
-    Later, this class can be upgraded to call the full multi-graph
-    Aiva engine without changing the public interface.
+    `kernel` always reflects this engine's updates. The first re-weight
+    swaps in a `private_copy` of the shared kernel, which later re-weights
+    update in place (adding a hop recompiles it); the shared kernel is
+    never modified. `graph` is a networkx view for callers that want one:
+    the `graph` passed in, or a private copy of the kernel materialised on
+    first access.
     """
 
-    def __init__(self) -> None:
-        # Build and keep a reference to the hop graph, even if the
-        # current skeleton does not yet traverse it dynamically.
-        try:
-            self.graph = build_hop_graph()
-        except Exception:
-            # Fail-safe: if hop_graph changes or is not available,
-            # we still allow the skeleton to run.
-            self.graph = None
+    def __init__(self, graph: Optional[Any] = None, kernel: Optional[GraphKernel] = None) -> None:
+        self._graph = graph
+        self.kernel = kernel
+        self._owns_kernel = False  # True once self.kernel is this engine's private copy
+        if graph is not None and kernel is None:
+            self.kernel = GraphKernel.from_networkx(graph)
+        elif graph is None and kernel is None:
+            try:
+                self.kernel = hop_graph_kernel()
+            except Exception:
+                # Fail-safe: if hop_graph changes or is not available,
+                # we still allow the skeleton to run (with no routes).
+                self.kernel = None
+
+        self.index: Optional[RouteIndex] = (
+            RouteIndex.from_kernel(self.kernel) if self.kernel is not None else None
+        )
+
+    @property
+    def graph(self) -> Optional[Any]:
+        """Mutable networkx hop graph (copied from the kernel on first use)."""
+        if self._graph is None and self.kernel is not None:
+            self._graph = self.kernel.to_networkx()
+        return self._graph
+
+    def edge_attrs(self, u: str, v: str) -> Optional[Dict[str, float]]:
+        """Current attributes of the hop u → v (None if there is no such hop)."""
+        kernel = self.kernel
+        if kernel is None or u not in kernel or v not in kernel:
+            return None
+        e = kernel.edge_id(kernel.node_index[u], kernel.node_index[v])
+        return kernel.edge_data(e) if e >= 0 else None
 
     def get_best_route(self, origin: str, destination: str) -> List[str]:
         """
         Return the preferred route between origin and destination.
 
-        For the current skeleton we return a fixed happy-path route
-        that matches the rest of the demo and tests.
+        The route includes both endpoints. An empty list means there is no
+        usable route (unknown node, unreachable, or no hop graph loaded),
+        which Rail treats as an Aiva rejection.
+        """
+        if self.index is None:
+            return []
+        return self.index.path(origin, destination)
+
+    def update_edge(self, u: str, v: str, **attrs: Any) -> int:
+        """
+        Update attributes (e.g. latency, reliability) of the hop u → v.
+
+        Returns the number of origins whose precomputed routes were dropped.
+        """
+        if self.kernel is None or self.index is None:
+            return 0
+
+        self._reweight_kernel(u, v, attrs)
+        if self._graph is None:
+            merged = self.edge_attrs(u, v) or dict(attrs)
+        else:
+            if self._graph.has_edge(u, v):
+                self._graph[u][v].update(attrs)
+            else:
+                self._graph.add_edge(u, v, **attrs)
+            merged = self._graph[u][v]
+        return self.index.update_edge(u, v, merged)
+
+    def _reweight_kernel(self, u: str, v: str, attrs: Mapping[str, Any]) -> None:
+        kernel = self.kernel
+        e = kernel.edge_id(kernel.node_index[u], kernel.node_index[v]) if u in kernel and v in kernel else -1
+        if e < 0:
+            # New hop: recompiled (read-only); the next re-weight copies it once.
+            self.kernel, self._owns_kernel = kernel.with_edge(u, v, attrs), False
+            return
+        if not self._owns_kernel:
+            self.kernel = kernel.private_copy()
+            self._owns_kernel = True
+        self.kernel.set_edge(e, attrs)
+
+
+# ---------- Multi-graph merge engine ----------
+
+SCORE_KEYS: Tuple[str, ...] = ("compliance", "liquidity", "volatility", "hop", "medical")
+
+
+@dataclass(frozen=True)
+class RouteRequest:
+    """
+    Everything the merge engine needs to score candidate routes.
+
+    Attributes
+    ----------
+    origin, destination : str
+        Hop graph node identifiers.
+    amount : float
+        Amount that must be settled at every node on the route.
+    beneficiary_id : str
+        Opaque beneficiary identifier (passed to compliance).
+    beneficiary_name : str
+        Beneficiary name, screened against sanctioned entity names.
+    payload_type : Optional[str]
+        Medical payload ("Heart", "Blood", ...). None skips the medical check.
+    temp_celsius : float
+        Container temperature for medical payloads.
+    volatility_indices : Mapping[str, float]
+        Market volatility index per corridor id ("AUD-SGD"). Corridors not
+        listed (including same-currency hops) are treated as calm (0.0).
+    """
+    origin: str
+    destination: str
+    amount: float = 0.0
+    beneficiary_id: str = ""
+    beneficiary_name: str = ""
+    payload_type: Optional[str] = None
+    temp_celsius: float = 4.0
+    volatility_indices: Mapping[str, float] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class ScoredRoute:
+    """A candidate route with its per-graph and composite scores."""
+    path: List[str]
+    composite_score: float
+    scores: Dict[str, float]
+    total_latency: float
+
+
+class MergeEngine(RouteEngine):
+    """
+    Multi-Graph Merge Engine.
+
+    Evaluates all five Aiva graphs along candidate hop-graph paths:
+
+    - per node:  compliance (node jurisdiction) and liquidity (node balance)
+    - per edge:  volatility (FX corridor) and hop reliability
+    - per path:  medical viability over the cumulative transit time
+
+    Per-graph path scores are the weakest link along the path (hop score
+    is the product of reliabilities), and the composite score is their
+    product, so a single 0.0 anywhere is a hard reject.
+
+    Candidates are grown hop by hop with a depth-first search over the
+    engine's `GraphKernel` (integer node ids, edge attributes read from
+    its arrays). Checks run
+    cheapest-first (compliance, liquidity, volatility, hop, medical) and a
+    partial path is pruned as soon as any score hits 0.0, or once it can
+    no longer beat the current k-th best route (scores only fall as a
+    path grows).
+
+    With a `cache`, the default volatility, compliance and liquidity
+    graphs share one `ScoreCache`, so repeated bursts over the same
+    corridors reuse their scores across `rank_routes` calls.
+    """
+
+    def __init__(
+        self,
+        graph: Optional[Any] = None,
+        medical: Optional[MedicalGraph] = None,
+        volatility: Optional[VolatilityGraph] = None,
+        compliance: Optional[ComplianceGraph] = None,
+        liquidity: Optional[LiquidityGraph] = None,
+        max_hops: int = 6,
+        cache: Optional[ScoreCache] = None,
+        kernel: Optional[GraphKernel] = None,
+    ) -> None:
+        super().__init__(graph, kernel)
+        self.cache = cache
+        self.medical = medical or MedicalGraph()
+        self.volatility = volatility or VolatilityGraph(cache=cache)
+        self.compliance = compliance or ComplianceGraph(cache=cache)
+        self.liquidity = liquidity or LiquidityGraph(cache=cache)
+        self.max_hops = max_hops
+
+    # ---------- Per-node / per-edge scoring ----------
+
+    def score_node(self, node: str, request: RouteRequest) -> Tuple[float, float]:
+        """
+        Return (compliance, liquidity) for settling `request` at `node`.
+
+        Liquidity is skipped (not computed) when compliance already rejects.
         """
-        # In future: use self.graph to compute the actual path.
-        # For now, the skeleton is built around ['NodeA', 'NodeB'].
-        return ["NodeA", "NodeB"]
+        return self._score_node(self.kernel.node_index[node], request)
+
+    def score_edge(self, u: str, v: str, request: RouteRequest) -> Tuple[float, float]:
+        """Return (volatility, hop reliability) for the hop u → v."""
+        kernel = self.kernel
+        ui, vi = kernel.node_index[u], kernel.node_index[v]
+        e = kernel.edge_id(ui, vi)
+        if e < 0:
+            raise KeyError(f"no hop {u} → {v}")
+        return self._score_edge(ui, vi, e, request)
+
+    def _score_node(self, node: int, request: RouteRequest) -> Tuple[float, float]:
+        kernel = self.kernel
+        compliance = self.compliance.get_compliance_score(
+            ComplianceContext(
+                destination_country=kernel.node_attr("country", node, ""),
+                beneficiary_id=request.beneficiary_id,
+                beneficiary_name=request.beneficiary_name,
+            )
+        )
+        if compliance == 0.0:
+            return 0.0, 0.0
+
+        liquidity = self.liquidity.get_liquidity_score(
+            LiquidityContext(node_id=kernel.nodes[node], transaction_amount=request.amount)
+        )
+        return compliance, liquidity
+
+    def _score_edge(self, u: int, v: int, e: int, request: RouteRequest) -> Tuple[float, float]:
+        kernel = self.kernel
+        corridor_id = f"{kernel.node_attr('currency', u, '')}-{kernel.node_attr('currency', v, '')}"
+        volatility = self.volatility.get_volatility_score(
+            CorridorVolatilityContext(
+                corridor_id=corridor_id,
+                market_volatility_index=request.volatility_indices.get(corridor_id, 0.0),
+            )
+        )
+        if volatility == 0.0:
+            return 0.0, 0.0
+
+        return volatility, kernel.edge_values("reliability")[e]
+
+    # ---------- Route ranking ----------
+
+    def rank_routes(self, request: RouteRequest, k: int = 3) -> List[ScoredRoute]:
+        """
+        Return up to `k` routes origin → destination, best composite first.
+
+        Routes with a composite score of 0.0 are never returned.
+        """
+        kernel = self.kernel
+        if kernel is None or k <= 0:
+            return []
+        origin = kernel.node_index.get(request.origin)
+        destination = kernel.node_index.get(request.destination)
+        if origin is None or destination is None:
+            return []
+
+        indptr, indices = kernel.adjacency()
+        latencies = kernel.edge_values("latency")
+        node_cache: Dict[int, Tuple[float, float]] = {}
+        edge_cache: Dict[int, Tuple[float, float]] = {}
+
+        def node_scores(node: int) -> Tuple[float, float]:
+            if node not in node_cache:
+                node_cache[node] = self._score_node(node, request)
+            return node_cache[node]
+
+        def edge_scores(u: int, v: int, e: int) -> Tuple[float, float]:
+            if e not in edge_cache:
+                edge_cache[e] = self._score_edge(u, v, e, request)
+            return edge_cache[e]
+
+        compliance, liquidity = node_scores(origin)
+        if compliance == 0.0 or liquidity == 0.0:
+            return []
+
+        # Min-heap of (composite, -latency, path, scores): root is the k-th best.
+        best: List[Tuple[float, float, List[int], Dict[str, float]]] = []
+
+        def kth_best() -> float:
+            return best[0][0] if len(best) >= k else 0.0
+
+        start_scores = {key: 1.0 for key in SCORE_KEYS}
+        start_scores["compliance"] = compliance
+        start_scores["liquidity"] = liquidity
+        stack = [([origin], start_scores, 0.0)]
+
+        while stack:
+            path, scores, latency = stack.pop()
+            node = path[-1]
+
+            if node == destination:
+                composite = _composite(scores)
+                item = (composite, -latency, path, scores)
+                if len(best) < k:
+                    heapq.heappush(best, item)
+                elif item[:2] > best[0][:2]:
+                    heapq.heapreplace(best, item)
+                continue
+
+            if len(path) > self.max_hops:
+                continue
+
+            for e in range(indptr[node], indptr[node + 1]):
+                nbr = indices[e]
+                if nbr in path:
+                    continue
+
+                n_compliance, n_liquidity = node_scores(nbr)
+                if n_compliance == 0.0 or n_liquidity == 0.0:
+                    continue
+
+                e_volatility, e_hop = edge_scores(node, nbr, e)
+                if e_volatility == 0.0 or e_hop == 0.0:
+                    continue
+
+                new_latency = latency + latencies[e]
+                medical = 1.0
+                if request.payload_type is not None:
+                    medical = self.medical.lookup_viability(
+                        payload_type=request.payload_type,
+                        duration_seconds=new_latency,
+                        temp_celsius=request.temp_celsius,
+                    )
+                    if medical == 0.0:
+                        continue
+
+                new_scores = {
+                    "compliance": min(scores["compliance"], n_compliance),
+                    "liquidity": min(scores["liquidity"], n_liquidity),
+                    "volatility": min(scores["volatility"], e_volatility),
+                    "hop": scores["hop"] * e_hop,
+                    "medical": medical,
+                }
+                # Scores never increase as a path grows: bound against k-th best.
+                if _composite(new_scores) < kth_best():
+                    continue
+
+                stack.append((path + [nbr], new_scores, new_latency))
+
+        names = kernel.nodes
+        ranked = sorted(
+            ((composite, neg_latency, [names[i] for i in path], scores)
+             for composite, neg_latency, path, scores in best),
+            key=lambda item: (-item[0], -item[1], item[2]),
+        )
+        return [
+            ScoredRoute(
+                path=path,
+                composite_score=composite,
+                scores=scores,
+                total_latency=-neg_latency,
+            )
+            for composite, neg_latency, path, scores in ranked
+        ]
+
+    def get_best_route(
+        self,
+        origin: str,
+        destination: str,
+        request: Optional[RouteRequest] = None,
+    ) -> List[str]:
+        """
+        Return the best route between origin and destination.
+
+        Without a `request` this is the plain shortest route from
+        `RouteEngine`; with one, it is the top composite-scored route.
+        """
+        if request is None:
+            return super().get_best_route(origin, destination)
+
+        if (request.origin, request.destination) != (origin, destination):
+            request = replace(request, origin=origin, destination=destination)
+        ranked = self.rank_routes(request, k=1)
+        return list(ranked[0].path) if ranked else []
+
+
+def _composite(scores: Mapping[str, float]) -> float:
+    composite = 1.0
+    for key in SCORE_KEYS:
+        composite *= scores[key]
+    return composite
@@ -0,0 +1,281 @@
+# src/aiva/route_index.py
+
+from __future__ import annotations
+
+import math
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from .graph_kernel import GraphKernel
+
+
+EdgeCostFn = Callable[[Mapping[str, Any]], float]
+
+
+def hop_edge_cost(attrs: Mapping[str, Any]) -> float:
+    """
+    Cost of a settlement hop, used as the shortest-path weight.
+
+    We treat a hop as "expected time to settle": the base latency inflated
+    by the chance that the hop has to be retried, i.e. latency / reliability.
+    A reliability of 0.0 makes the edge unusable (infinite cost).
+    """
+    latency = float(attrs.get("latency", 0.0))
+    reliability = float(attrs.get("reliability", 1.0))
+
+    if reliability <= 0.0:
+        return math.inf
+    return latency / reliability
+
+
+class RouteIndex:
+    """
+    Shortest-path index over a `GraphKernel`.
+
+    Edge weights live in one float64 array aligned with the kernel's edge
+    ids (infinite = unusable), and searches run on integer node ids with
+    `GraphKernel.dijkstra`. A shortest-path tree (distance + predecessor
+    arrays) is built lazily the first time an origin is queried and kept,
+    so a repeated query origin → destination is just a walk back along
+    the predecessor array, O(path length), with no graph search at all.
+    `precompute` builds trees ahead of time.
+
+    Edge changes are applied incrementally: only the origins whose tree can
+    actually change are dropped, and they are rebuilt lazily on their next
+    query. Everything else keeps answering from the existing trees. Edges
+    and nodes the kernel does not have are kept in a small overlay, so the
+    shared kernel itself is never modified.
+
+    Queries may run on several threads while telemetry updates edges:
+    updates and invalidation hold the index lock, and a tree built
+    outside it is only cached if no edge changed while it was built.
+
+    Parameters
+    ----------
+    graph : networkx graph or GraphKernel
+        Graph to index (a networkx graph is compiled into a kernel).
+    cost_fn : EdgeCostFn
+        Edge weight from an attribute dict; also used by `update_edge`.
+    precompute : bool
+        Build every origin's tree up front instead of on first query.
+    costs : Optional[np.ndarray]
+        One weight per kernel edge, if already computed (e.g.
+        `kernel.hop_costs()`); must agree with `cost_fn`.
+    """
+
+    def __init__(
+        self,
+        graph: Any,
+        cost_fn: EdgeCostFn = hop_edge_cost,
+        precompute: bool = False,
+        costs: Optional[np.ndarray] = None,
+    ) -> None:
+        if isinstance(graph, GraphKernel):
+            kernel = graph
+            if costs is None and cost_fn is hop_edge_cost:
+                costs = kernel.hop_costs()
+            elif costs is None:
+                costs = np.fromiter(
+                    (cost_fn(kernel.edge_data(e)) for e in range(kernel.num_edges)),
+                    dtype=np.float64,
+                    count=kernel.num_edges,
+                )
+        else:
+            kernel = GraphKernel.from_networkx(graph)
+            if costs is None:
+                names = kernel.nodes
+                costs = np.fromiter(
+                    (cost_fn(graph[names[u]][names[v]]) for u, v, _ in kernel.edges()),
+                    dtype=np.float64,
+                    count=kernel.num_edges,
+                )
+
+        self._cost_fn = cost_fn
+        self._kernel = kernel
+        self._costs = np.array(costs, dtype=np.float64)  # private, writable copy
+        if self._costs.shape != (kernel.num_edges,):
+            raise ValueError("costs must have one entry per kernel edge")
+        self._costs[~np.isfinite(self._costs)] = math.inf
+        # Nodes past the kernel's and edges it lacks, added by update_edge.
+        self._names: List[str] = list(kernel.nodes)
+        self._ids: Dict[str, int] = dict(kernel.node_index)
+        self._extra: Dict[int, Dict[int, float]] = {}
+        # origin id -> (dist, pred) arrays
+        self._trees: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        self._lock = threading.Lock()
+        self._version = 0  # bumped by every edge change, under the lock
+
+        if precompute:
+            self.precompute()
+
+    @classmethod
+    def from_kernel(
+        cls,
+        kernel: GraphKernel,
+        costs: Optional[np.ndarray] = None,
+        cost_fn: EdgeCostFn = hop_edge_cost,
+        precompute: bool = False,
+    ) -> "RouteIndex":
+        """
+        Index a `GraphKernel` without touching per-edge attribute dicts.
+
+        `costs` holds one weight per kernel edge (default:
+        `kernel.hop_costs()`, the vectorised `hop_edge_cost`); `cost_fn`
+        must agree with it, since later `update_edge` calls use it.
+        """
+        return cls(kernel, cost_fn, precompute, kernel.hop_costs() if costs is None else costs)
+
+    @property
+    def cost_fn(self) -> EdgeCostFn:
+        return self._cost_fn
+
+    @property
+    def kernel(self) -> GraphKernel:
+        return self._kernel
+
+    # ---------- Index maintenance ----------
+
+    def precompute(self, origins: Optional[Iterable[str]] = None) -> None:
+        """Build shortest-path trees for the given origins (default: all nodes)."""
+        for origin in (self._names if origins is None else origins):
+            i = self._ids.get(origin)
+            if i is not None:
+                self._build_tree(i)
+
+    def invalidate(self) -> None:
+        """Drop every cached tree (they are rebuilt lazily)."""
+        with self._lock:
+            self._version += 1
+            self._trees.clear()
+
+    def update_edge(self, u: str, v: str, attrs: Mapping[str, Any]) -> int:
+        """
+        Insert or re-weight the edge u → v from its attribute dict.
+
+        Returns
+        -------
+        int
+            Number of origin trees invalidated by the change.
+        """
+        cost = self._cost_fn(attrs)
+        if not math.isfinite(cost):
+            return self.remove_edge(u, v)
+
+        with self._lock:
+            ui, vi = self._node_id(u), self._node_id(v)
+            e = self._edge_id(ui, vi)
+            if e >= 0:
+                old_cost: Optional[float] = float(self._costs[e])
+                self._costs[e] = cost
+            else:
+                old_cost = self._extra.get(ui, {}).get(vi)
+                self._extra.setdefault(ui, {})[vi] = cost
+            if old_cost is not None and not math.isfinite(old_cost):
+                old_cost = None  # the edge was unusable, i.e. effectively absent
+            if old_cost == cost:
+                return 0
+            return self._invalidate_for_edge(ui, vi, old_cost, cost)
+
+    def remove_edge(self, u: str, v: str) -> int:
+        """Remove the edge u → v (no-op if absent). Returns trees invalidated."""
+        with self._lock:
+            ui, vi = self._ids.get(u), self._ids.get(v)
+            if ui is None or vi is None:
+                return 0
+            e = self._edge_id(ui, vi)
+            if e >= 0:
+                old_cost: Optional[float] = float(self._costs[e])
+                self._costs[e] = math.inf
+            else:
+                old_cost = self._extra.get(ui, {}).pop(vi, None)
+            if old_cost is None or not math.isfinite(old_cost):
+                return 0
+            return self._invalidate_for_edge(ui, vi, old_cost, math.inf)
+
+    def _invalidate_for_edge(
+        self, u: int, v: int, old_cost: Optional[float], new_cost: float
+    ) -> int:
+        """Drop the trees the change can affect; caller holds the lock."""
+        self._version += 1
+        stale = []
+        for origin, (dist, pred) in self._trees.items():
+            if old_cost is not None and new_cost > old_cost:
+                # Edge got worse: only trees routing through it are affected.
+                if v < len(pred) and pred[v] == u:
+                    stale.append(origin)
+            else:
+                # Edge got better (or is new): affected if it now offers
+                # a strictly shorter way into v.
+                dist_u = dist[u] if u < len(dist) else math.inf
+                dist_v = dist[v] if v < len(dist) else math.inf
+                if dist_u + new_cost < dist_v:
+                    stale.append(origin)
+
+        for origin in stale:
+            del self._trees[origin]
+        return len(stale)
+
+    # ---------- Queries ----------
+
+    def path(self, origin: str, destination: str) -> List[str]:
+        """
+        Return the cheapest path origin → destination (inclusive).
+
+        Returns an empty list if either node is unknown or unreachable.
+        """
+        source, target = self._ids.get(origin), self._ids.get(destination)
+        if source is None or target is None:
+            return []
+        dist, pred = self._tree(source)
+        if target >= len(dist) or not math.isfinite(dist[target]):
+            return []
+
+        path = [target]
+        while path[-1] != source:
+            path.append(int(pred[path[-1]]))
+        return [self._names[i] for i in reversed(path)]
+
+    def distance(self, origin: str, destination: str) -> float:
+        """Return the path cost origin → destination (inf if unreachable)."""
+        source, target = self._ids.get(origin), self._ids.get(destination)
+        if source is None or target is None:
+            return math.inf
+        dist, _ = self._tree(source)
+        return float(dist[target]) if target < len(dist) else math.inf
+
+    def cached_origins(self) -> List[str]:
+        """Origins that currently have a valid precomputed tree."""
+        with self._lock:
+            return [self._names[i] for i in self._trees]
+
+    # ---------- Internals ----------
+
+    def _node_id(self, node: str) -> int:
+        i = self._ids.get(node)
+        if i is None:
+            i = self._ids[node] = len(self._names)
+            self._names.append(node)
+        return i
+
+    def _edge_id(self, u: int, v: int) -> int:
+        kernel_nodes = self._kernel.num_nodes
+        return self._kernel.edge_id(u, v) if u < kernel_nodes and v < kernel_nodes else -1
+
+    def _tree(self, origin: int) -> Tuple[np.ndarray, np.ndarray]:
+        tree = self._trees.get(origin)
+        return tree if tree is not None else self._build_tree(origin)
+
+    def _build_tree(self, origin: int) -> Tuple[np.ndarray, np.ndarray]:
+        # Search outside the lock (on a snapshot of the overlay); a tree
+        # raced by an edge change is returned to this caller but not kept.
+        with self._lock:
+            version = self._version
+            extra = {u: dict(arcs) for u, arcs in self._extra.items()}
+            num_nodes = len(self._names)
+        tree = self._kernel.dijkstra(origin, self._costs, extra=extra, num_nodes=num_nodes)
+        with self._lock:
+            if self._version == version:
+                self._trees[origin] = tree
+        return tree
@@ -0,0 +1,508 @@
+# src/aiva/sanctions.py
+
+from __future__ import annotations
+
+import csv
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+
+
+SANCTIONED: str = "sanctioned"
+HIGH_RISK: str = "high_risk"
+
+SANCTIONED_SCORE: float = 0.0
+REVIEW_SCORE: float = 0.5
+CLEAR_SCORE: float = 1.0
+
+DEFAULT_REVIEW_THRESHOLD: float = 0.8  # fuzzy-name similarity that triggers review
+DEFAULT_WATCH_INTERVAL: float = 30.0
+
+# Built-in jurisdiction lists. They always apply, whatever the country
+# file says: a file can add countries or escalate one, never drop one.
+BLACKLIST: List[str] = ["North Korea", "Iran"]
+HIGH_RISK_COUNTRIES: List[str] = ["High Risk"]
+
+_STATUS_SEVERITY: Dict[str, int] = {HIGH_RISK: 1, SANCTIONED: 2}
+
+logger = logging.getLogger(__name__)
+
+_END = "\0"  # trie key marking a complete token
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalise_name(name: str) -> str:
+    """
+    Canonical form for name matching.
+
+    Accents are stripped, case folded, punctuation dropped and tokens
+    sorted, so "Kim, Jong-Un" and "jong un kim" normalise identically.
+    """
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
+    tokens = _NON_ALNUM.sub(" ", ascii_name.casefold()).split()
+    return " ".join(sorted(tokens))
+
+
+def normalise_country(country: str) -> str:
+    return " ".join(country.casefold().split())
+
+
+def builtin_country_statuses() -> Dict[str, str]:
+    """`BLACKLIST` as sanctioned and `HIGH_RISK_COUNTRIES` as high risk."""
+    countries: Dict[str, str] = {country: HIGH_RISK for country in HIGH_RISK_COUNTRIES}
+    countries.update({country: SANCTIONED for country in BLACKLIST})
+    return countries
+
+
+def merge_country_statuses(*sources: Mapping[str, str]) -> Dict[str, str]:
+    """Union of country → status maps; the most severe status wins."""
+    merged: Dict[str, str] = {}
+    for source in sources:
+        for country, status in source.items():
+            key = normalise_country(country)
+            current = merged.get(key)
+            if current is None or _STATUS_SEVERITY[status] > _STATUS_SEVERITY[current]:
+                merged[key] = status
+    return merged
+
+
+def default_fuzzy_distance(normalised: str) -> int:
+    """Edits tolerated when fuzzy-matching a name of this length."""
+    if len(normalised) <= 4:
+        return 0
+    if len(normalised) <= 10:
+        return 1
+    return 2
+
+
+# ---------- Token trie ----------
+
+
+class _TokenTrie:
+    """Character trie over name tokens with bounded edit-distance search."""
+
+    def __init__(self) -> None:
+        self.root: Dict[str, Any] = {}
+
+    def insert(self, token: str) -> None:
+        node = self.root
+        for ch in token:
+            node = node.setdefault(ch, {})
+        node[_END] = True
+
+    def search(self, word: str, max_distance: int) -> List[Tuple[str, int]]:
+        """(token, distance) for every token within `max_distance` edits."""
+        results: List[Tuple[str, int]] = []
+        first_row = list(range(len(word) + 1))
+        for ch, child in self.root.items():
+            if ch != _END:
+                self._search(child, ch, ch, word, first_row, max_distance, results)
+        return results
+
+    def _search(
+        self,
+        node: Dict[str, Any],
+        ch: str,
+        prefix: str,
+        word: str,
+        prev_row: List[int],
+        max_distance: int,
+        results: List[Tuple[str, int]],
+    ) -> None:
+        # One Levenshtein DP row per trie edge: shared prefixes are scored once.
+        row = [prev_row[0] + 1]
+        for col in range(1, len(word) + 1):
+            row.append(
+                min(
+                    row[col - 1] + 1,
+                    prev_row[col] + 1,
+                    prev_row[col - 1] + (word[col - 1] != ch),
+                )
+            )
+
+        if row[-1] <= max_distance and _END in node:
+            results.append((prefix, row[-1]))
+
+        if min(row) <= max_distance:
+            for next_ch, child in node.items():
+                if next_ch != _END:
+                    self._search(child, next_ch, prefix + next_ch, word, row, max_distance, results)
+
+
+def bounded_levenshtein(a: str, b: str, max_distance: int) -> int:
+    """Edit distance between `a` and `b`, or `max_distance + 1` once it is exceeded."""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        row = [i]
+        for j, cb in enumerate(b, 1):
+            row.append(min(row[j - 1] + 1, prev[j] + 1, prev[j - 1] + (ca != cb)))
+        if min(row) > max_distance:
+            return max_distance + 1
+        prev = row
+    return min(prev[-1], max_distance + 1)
+
+
+def _token_distance(
+    query: List[str],
+    near: List[Dict[str, int]],
+    listed: List[str],
+    max_distance: int,
+) -> int:
+    """
+    Cheapest alignment of query tokens to listed tokens, or `max_distance + 1`.
+
+    `near[i]` maps listed tokens to their trie distance from `query[i]`;
+    a token left unaligned on either side costs its length.
+    """
+    best: Dict[Tuple[int, int], int] = {}
+
+    def align(i: int, used: int) -> int:
+        if i == len(query):
+            return sum(len(t) for j, t in enumerate(listed) if not used >> j & 1)
+        key = (i, used)
+        if key not in best:
+            cost = len(query[i]) + align(i + 1, used)
+            for j, t in enumerate(listed):
+                d = near[i].get(t)
+                if d is not None and not used >> j & 1 and d < cost:
+                    cost = min(cost, d + align(i + 1, used | 1 << j))
+            best[key] = cost
+        return best[key]
+
+    return min(align(0, 0), max_distance + 1)
+
+
+# ---------- Compiled index ----------
+
+
+@dataclass(frozen=True)
+class NameMatch:
+    entity_id: str
+    matched_name: str
+    distance: int
+    similarity: float
+
+
+@dataclass(frozen=True)
+class ScreeningResult:
+    """Outcome of screening one beneficiary / destination."""
+    score: float
+    reasons: List[str] = field(default_factory=list)
+    matches: List[NameMatch] = field(default_factory=list)
+
+
+def _required_field(row: Mapping[str, Optional[str]], column: str, path: str, line: int) -> str:
+    """`row[column]` stripped; ValueError if the column is missing or blank."""
+    value = (row.get(column) or "").strip()
+    if not value:
+        raise ValueError(f"{path}:{line}: missing {column!r}")
+    return value
+
+
+class SanctionsIndex:
+    """
+    Immutable, compiled sanctions lists.
+
+    - entity ids: a frozenset, O(1) exact lookup
+    - names: dict of normalised name → entity ids for exact hits; for
+      fuzzy hits each query token is searched in a trie of listed tokens
+      with a bounded Levenshtein automaton, and names sharing enough
+      matched tokens are scored by summing those per-token distances
+    - countries: dict of normalised country → SANCTIONED / HIGH_RISK
+
+    Build one directly or with `from_files`; it is never mutated after.
+    """
+
+    def __init__(
+        self,
+        entity_ids: Iterable[str] = (),
+        names: Iterable[Tuple[str, str]] = (),
+        countries: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        self.entity_ids: FrozenSet[str] = frozenset(entity_ids)
+        self.exact_names: Dict[str, FrozenSet[str]] = {}
+        self.trie = _TokenTrie()
+        self._names_by_token: Dict[str, List[str]] = {}
+
+        grouped: Dict[str, set] = {}
+        for entity_id, name in names:
+            normalised = normalise_name(name)
+            if normalised:
+                grouped.setdefault(normalised, set()).add(entity_id)
+        self.exact_names = {name: frozenset(ids) for name, ids in grouped.items()}
+
+        for name in self.exact_names:
+            for token in set(name.split()):
+                listed = self._names_by_token.get(token)
+                if listed is None:
+                    self._names_by_token[token] = listed = []
+                    self.trie.insert(token)
+                listed.append(name)
+
+        self.countries: Dict[str, str] = {
+            normalise_country(country): status for country, status in (countries or {}).items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.entity_ids)
+
+    # ---------- Loading ----------
+
+    @classmethod
+    def from_files(
+        cls,
+        entities_path: Optional[str] = None,
+        countries_path: Optional[str] = None,
+        base_countries: Optional[Mapping[str, str]] = None,
+    ) -> "SanctionsIndex":
+        """
+        Compile an index from local CSV files.
+
+        entities_path : header `entity_id,name,aliases`; aliases are
+            separated by ";" and are matched like the primary name.
+        countries_path : header `country,status`, where status is
+            "sanctioned" or "high_risk".
+        base_countries : country → status entries merged under the file's
+            (see `merge_country_statuses`); the file can only escalate them.
+
+        Raises ValueError for a row with a missing or blank `entity_id`,
+        `country` or `status`, or an unknown status.
+        """
+        entity_ids: List[str] = []
+        names: List[Tuple[str, str]] = []
+        if entities_path:
+            with open(entities_path, newline="", encoding="utf-8") as f:
+                reader = csv.DictReader(f)
+                for row in reader:
+                    entity_id = _required_field(row, "entity_id", entities_path, reader.line_num)
+                    entity_ids.append(entity_id)
+                    names.append((entity_id, row.get("name") or ""))
+                    for alias in (row.get("aliases") or "").split(";"):
+                        if alias.strip():
+                            names.append((entity_id, alias))
+
+        countries: Dict[str, str] = {}
+        if countries_path:
+            with open(countries_path, newline="", encoding="utf-8") as f:
+                reader = csv.DictReader(f)
+                for row in reader:
+                    country = _required_field(row, "country", countries_path, reader.line_num)
+                    status = _required_field(row, "status", countries_path, reader.line_num).lower()
+                    if status not in (SANCTIONED, HIGH_RISK):
+                        raise ValueError(f"unknown country status {row['status']!r}")
+                    countries[country] = status
+
+        return cls(entity_ids, names, merge_country_statuses(base_countries or {}, countries))
+
+    # ---------- Screening ----------
+
+    def country_score(self, country: str) -> float:
+        status = self.countries.get(normalise_country(country))
+        if status == SANCTIONED:
+            return SANCTIONED_SCORE
+        if status == HIGH_RISK:
+            return REVIEW_SCORE
+        return CLEAR_SCORE
+
+    def match_name(self, name: str, max_distance: Optional[int] = None) -> List[NameMatch]:
+        """Listed names matching `name` exactly or within the edit budget, best first."""
+        normalised = normalise_name(name)
+        if not normalised:
+            return []
+
+        exact = self.exact_names.get(normalised)
+        if exact:
+            return [NameMatch(eid, normalised, 0, 1.0) for eid in sorted(exact)]
+
+        budget = default_fuzzy_distance(normalised) if max_distance is None else max_distance
+        if budget <= 0:
+            return []
+
+        # Candidate names must share all but `budget` tokens with the query
+        # (each edit touches at most one token), matched within the token's
+        # own budget. Every token gets at least one edit: a typo in a short
+        # token ("zong" for "jong") still counts against the name's budget.
+        tokens = normalised.split()
+        near: List[Dict[str, int]] = []
+        shared: Dict[str, int] = {}
+        for token in tokens:
+            token_budget = min(budget, max(1, default_fuzzy_distance(token)))
+            similar = dict(self.trie.search(token, token_budget))
+            near.append(similar)
+            seen: set = set()
+            for t in similar:
+                for name in self._names_by_token[t]:
+                    if name not in seen:
+                        seen.add(name)
+                        shared[name] = shared.get(name, 0) + 1
+
+        required = max(1, len(tokens) - budget)
+        matches: List[NameMatch] = []
+        for name, count in shared.items():
+            if count < required:
+                continue
+            # Token by token, so a typo that reorders the sorted tokens still
+            # matches; the whole string still catches split or merged tokens.
+            distance = min(
+                _token_distance(tokens, near, name.split(), budget),
+                bounded_levenshtein(normalised, name, budget),
+            )
+            if distance <= budget:
+                similarity = 1.0 - distance / max(len(normalised), len(name))
+                matches.extend(
+                    NameMatch(eid, name, distance, similarity) for eid in sorted(self.exact_names[name])
+                )
+        return sorted(matches, key=lambda m: (m.distance, m.entity_id))
+
+    def screen(
+        self,
+        destination_country: str = "",
+        beneficiary_id: str = "",
+        beneficiary_name: str = "",
+        review_threshold: float = DEFAULT_REVIEW_THRESHOLD,
+    ) -> ScreeningResult:
+        """
+        Screen a beneficiary and destination.
+
+        - listed entity id, exact name hit or sanctioned country → 0.0
+        - fuzzy name hit with similarity ≥ `review_threshold`, or a
+          high-risk country → 0.5 (manual review)
+        - otherwise → 1.0
+        """
+        score = CLEAR_SCORE
+        reasons: List[str] = []
+
+        if beneficiary_id and beneficiary_id in self.entity_ids:
+            return ScreeningResult(SANCTIONED_SCORE, [f"listed entity id {beneficiary_id}"])
+
+        country_score = self.country_score(destination_country)
+        if country_score < CLEAR_SCORE:
+            score = country_score
+            label = "sanctioned" if country_score == SANCTIONED_SCORE else "high-risk"
+            reasons.append(f"{label} country {destination_country}")
+            if score == SANCTIONED_SCORE:
+                return ScreeningResult(score, reasons)
+
+        matches: List[NameMatch] = []
+        if beneficiary_name:
+            matches = self.match_name(beneficiary_name)
+            if matches and matches[0].distance == 0:
+                return ScreeningResult(
+                    SANCTIONED_SCORE, reasons + [f"name matches {matches[0].entity_id}"], matches
+                )
+            matches = [m for m in matches if m.similarity >= review_threshold]
+            if matches:
+                score = min(score, REVIEW_SCORE)
+                reasons.append(f"name similar to {matches[0].entity_id} ({matches[0].similarity:.2f})")
+
+        return ScreeningResult(score, reasons, matches)
+
+
+# ---------- Hot-reloading screener ----------
+
+
+class SanctionsScreener:
+    """
+    Screens against a `SanctionsIndex` and hot-reloads it from disk.
+
+    Reloading compiles a complete new index first and then swaps one
+    reference, so screening never waits for a reload and never sees a
+    half-built index. `reload_if_changed` only recompiles when a source
+    file's mtime moved; `start_watching` runs it on a daemon thread.
+    Callbacks registered with `add_reload_listener` receive each new
+    index right after the swap (e.g. to invalidate cached scores).
+
+    Every loaded index also carries `base_countries` (default: the
+    built-in `BLACKLIST` / `HIGH_RISK_COUNTRIES`), so a screener with only
+    an entity file still rejects sanctioned jurisdictions. A failed
+    reload keeps the last good index; `last_reload_error` holds the
+    failure until the next successful reload, at `last_reload_at`.
+    """
+
+    def __init__(
+        self,
+        entities_path: Optional[str] = None,
+        countries_path: Optional[str] = None,
+        index: Optional[SanctionsIndex] = None,
+        base_countries: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        self.entities_path = entities_path
+        self.countries_path = countries_path
+        self.base_countries: Dict[str, str] = (
+            builtin_country_statuses() if base_countries is None else dict(base_countries)
+        )
+        self.last_reload_at: Optional[float] = None  # wall-clock time of the last good reload
+        self.last_reload_error: Optional[BaseException] = None
+        self._reload_lock = threading.Lock()  # serialises reloaders, never screeners
+        self._mtimes: Tuple[Optional[float], ...] = ()
+        self._stop: Optional[threading.Event] = None
+        self._listeners: List[Callable[[SanctionsIndex], None]] = []
+        self._index = index if index is not None else SanctionsIndex()
+        if entities_path or countries_path:
+            self.reload()
+
+    @property
+    def index(self) -> SanctionsIndex:
+        return self._index
+
+    def _source_mtimes(self) -> Tuple[Optional[float], ...]:
+        return tuple(
+            os.path.getmtime(p) if p and os.path.exists(p) else None
+            for p in (self.entities_path, self.countries_path)
+        )
+
+    def reload(self) -> SanctionsIndex:
+        with self._reload_lock:
+            mtimes = self._source_mtimes()
+            try:
+                index = SanctionsIndex.from_files(
+                    self.entities_path, self.countries_path, self.base_countries
+                )
+            except Exception as exc:
+                self.last_reload_error = exc
+                raise
+            self._index, self._mtimes = index, mtimes
+            self.last_reload_at, self.last_reload_error = time.time(), None
+            for listener in list(self._listeners):
+                listener(index)
+            return index
+
+    def add_reload_listener(self, listener: Callable[[SanctionsIndex], None]) -> None:
+        self._listeners.append(listener)
+
+    def reload_if_changed(self) -> bool:
+        if self._source_mtimes() == self._mtimes:
+            return False
+        self.reload()
+        return True
+
+    def start_watching(self, interval: float = DEFAULT_WATCH_INTERVAL) -> None:
+        if self._stop is not None:
+            return
+        self._stop = threading.Event()
+
+        def watch(stop: threading.Event) -> None:
+            while not stop.wait(interval):
+                try:
+                    self.reload_if_changed()
+                except Exception:
+                    # Keep screening against the last good index (a bad
+                    # file, a CSV error or a failing listener alike).
+                    logger.exception("sanctions reload failed")
+
+        threading.Thread(target=watch, args=(self._stop,), name="sanctions-watch", daemon=True).start()
+
+    def stop_watching(self) -> None:
+        if self._stop is not None:
+            self._stop.set()
+            self._stop = None
+
+    def screen(self, *args: Any, **kwargs: Any) -> ScreeningResult:
+        return self._index.screen(*args, **kwargs)
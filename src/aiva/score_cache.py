@@ -0,0 +1,267 @@
+# src/aiva/score_cache.py
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Mapping, Optional, Tuple
+
+
+VOLATILITY: str = "volatility"
+COMPLIANCE: str = "compliance"
+LIQUIDITY: str = "liquidity"
+
+# Seconds a score stays valid, per graph. Volatility follows the market
+# feed, compliance only moves when the sanctions lists are reloaded.
+DEFAULT_TTLS: Dict[str, float] = {
+    VOLATILITY: 1.0,
+    LIQUIDITY: 5.0,
+    COMPLIANCE: 3600.0,
+}
+DEFAULT_TTL: float = 60.0  # namespaces not listed above
+DEFAULT_MAX_ENTRIES: int = 100_000
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Counters for one cache namespace (or the whole cache)."""
+    hits: int = 0
+    misses: int = 0
+    expirations: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+    size: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "expirations": self.expirations,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "size": self.size,
+            "hit_rate": self.hit_rate,
+        }
+
+
+class _Counters:
+    __slots__ = ("hits", "misses", "expirations", "evictions", "invalidations", "size")
+
+    def __init__(self) -> None:
+        self.hits = self.misses = self.expirations = 0
+        self.evictions = self.invalidations = self.size = 0
+
+    def freeze(self) -> CacheStats:
+        return CacheStats(
+            self.hits, self.misses, self.expirations, self.evictions, self.invalidations, self.size
+        )
+
+
+class ScoreCache:
+    """
+    Shared, thread-safe memo for AIVA graph scores.
+
+    The volatility, compliance and liquidity graphs are pure functions of
+    their frozen context dataclasses (and their own configuration), so a
+    score is keyed on (namespace, owner, context), where `owner` is a
+    per-graph token that keeps two differently configured graphs sharing
+    one cache from reading each other's scores:
+
+    - each namespace has its own TTL (`ttls`, falling back to
+      `DEFAULT_TTLS` / `DEFAULT_TTL`); expired entries count as misses
+    - all namespaces share one LRU of at most `max_entries` entries,
+      so hot corridors stay resident and cold ones are evicted
+    - `invalidate` drops a namespace, or just the contexts matching a
+      predicate, when market data or sanctions lists change; it also
+      bumps the namespace generation, so a score computed from the old
+      data by a lookup that missed before the invalidation is discarded
+      rather than cached
+    - `stats` reports hits / misses / expirations / evictions per
+      namespace
+
+    Parameters
+    ----------
+    max_entries : int
+        Memory cap, as a number of cached scores across all namespaces.
+    ttls : Optional[Mapping[str, float]]
+        Per-namespace TTL overrides in seconds.
+    clock : Callable[[], float]
+        Monotonic time source (injectable for tests).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttls: Optional[Mapping[str, float]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_entries <= 0:
+            raise ValueError("max_entries must be > 0")
+        self.max_entries = max_entries
+        self.ttls: Dict[str, float] = dict(DEFAULT_TTLS)
+        self.ttls.update(ttls or {})
+        self._clock = clock
+        # (namespace, owner, context) -> (expires_at, score), least recently used first
+        self._entries: "OrderedDict[Tuple[str, Hashable, Hashable], Tuple[float, float]]" = OrderedDict()
+        self._counters: Dict[str, _Counters] = {}
+        # Bumped by invalidate(): per namespace, and `_epoch` for all of them.
+        self._generations: Dict[str, int] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def ttl(self, namespace: str) -> float:
+        return self.ttls.get(namespace, DEFAULT_TTL)
+
+    def generation(self, namespace: str) -> Tuple[int, int]:
+        """Token that changes whenever `namespace` is invalidated (see `put`)."""
+        return self._epoch, self._generations.get(namespace, 0)
+
+    def _counter(self, namespace: str) -> _Counters:
+        counters = self._counters.get(namespace)
+        if counters is None:
+            counters = self._counters[namespace] = _Counters()
+        return counters
+
+    # ---------- Lookups ----------
+
+    def get_or_compute(
+        self,
+        namespace: str,
+        context: Hashable,
+        compute: Callable[[Any], float],
+        owner: Hashable = None,
+    ) -> float:
+        """
+        Return the cached score for `context`, or `compute(context)` and cache it.
+
+        `compute` runs outside the lock, so a slow scorer never blocks
+        other lookups; two threads missing on the same key at once may
+        both compute it (the result is identical). If the namespace is
+        invalidated while `compute` runs, the result is returned but not
+        cached.
+        """
+        key = (namespace, owner, context)
+        now = self._clock()
+        with self._lock:
+            counters = self._counter(namespace)
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    counters.hits += 1
+                    return entry[1]
+                del self._entries[key]
+                counters.size -= 1
+                counters.expirations += 1
+            counters.misses += 1
+            generation = self.generation(namespace)
+
+        score = compute(context)
+        self.put(namespace, context, score, owner, generation)
+        return score
+
+    def put(
+        self,
+        namespace: str,
+        context: Hashable,
+        score: float,
+        owner: Hashable = None,
+        generation: Optional[Tuple[int, int]] = None,
+    ) -> bool:
+        """
+        Cache `score`; returns False if it was dropped as stale.
+
+        generation : `generation(namespace)` read before computing the
+            score; if the namespace has been invalidated since, the score
+            may reflect old data and is not cached.
+        """
+        key = (namespace, owner, context)
+        expires_at = self._clock() + self.ttl(namespace)
+        with self._lock:
+            if generation is not None and generation != self.generation(namespace):
+                return False
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            else:
+                self._counter(namespace).size += 1
+            self._entries[key] = (expires_at, score)
+
+            while len(self._entries) > self.max_entries:
+                (evicted_namespace, _, _), _ = self._entries.popitem(last=False)
+                counters = self._counter(evicted_namespace)
+                counters.size -= 1
+                counters.evictions += 1
+            return True
+
+    # ---------- Invalidation ----------
+
+    def invalidate(
+        self,
+        namespace: Optional[str] = None,
+        predicate: Optional[Callable[[Any], bool]] = None,
+        owner: Hashable = None,
+    ) -> int:
+        """
+        Drop cached scores; returns how many were dropped.
+
+        namespace : only this namespace (default: every namespace).
+        predicate : only contexts for which `predicate(context)` is true,
+            e.g. ``lambda ctx: ctx.corridor_id == "AUD-SGD"``.
+        owner : only scores cached by this owner (default: any owner).
+
+        In-flight computations in the affected namespace(s) are not
+        cached when they finish, even if they match neither filter.
+        """
+        with self._lock:
+            if namespace is None:
+                self._epoch += 1
+            else:
+                self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            stale = [
+                key
+                for key in self._entries
+                if (namespace is None or key[0] == namespace)
+                and (owner is None or key[1] == owner)
+                and (predicate is None or predicate(key[2]))
+            ]
+            for key in stale:
+                del self._entries[key]
+                counters = self._counter(key[0])
+                counters.size -= 1
+                counters.invalidations += 1
+            return len(stale)
+
+    def clear(self) -> None:
+        """Drop every entry and reset all counters."""
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+            self._counters.clear()
+
+    # ---------- Metrics ----------
+
+    def stats(self, namespace: Optional[str] = None) -> CacheStats:
+        """Counters for one namespace, or summed over all of them."""
+        with self._lock:
+            if namespace is not None:
+                counters = self._counters.get(namespace)
+                return counters.freeze() if counters is not None else CacheStats()
+            total = _Counters()
+            for counters in self._counters.values():
+                for name in _Counters.__slots__:
+                    setattr(total, name, getattr(total, name) + getattr(counters, name))
+            return total.freeze()
+
+    def namespaces(self) -> Dict[str, CacheStats]:
+        with self._lock:
+            return {namespace: counters.freeze() for namespace, counters in self._counters.items()}
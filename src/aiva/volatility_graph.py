@@ -3,7 +3,12 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import Optional
 
+import numpy as np
+
+from .batch_utils import round_and_clamp
+from .score_cache import VOLATILITY, ScoreCache
 
 MAX_VOLATILITY_THRESHOLD: float = 5.0  # 0–10 scale, 5+ is considered unsafe
 
@@ -32,8 +37,15 @@ class VolatilityGraph:
 
     This is a deliberately simple version of the volatility model from
     the Lupine book, suitable for early Aiva risk gating and pre-checks.
+
+    Pass a `ScoreCache` to memoise scores per context; call
+    `cache.invalidate("volatility")` when the market feed moves.
     """
 
+    def __init__(self, cache: Optional[ScoreCache] = None) -> None:
+        self.cache = cache
+        self._cache_owner = object()  # keeps this graph's scores apart in a shared cache
+
     def get_volatility_score(self, ctx: CorridorVolatilityContext) -> float:
         """
         Compute a normalized volatility score for a corridor.
@@ -50,6 +62,12 @@ class VolatilityGraph:
             - 0.0 means "reject corridor" (too volatile)
             - (0.1, 1.0] means "usable", higher = safer
         """
+        if self.cache is not None:
+            return self.cache.get_or_compute(VOLATILITY, ctx, self._score, self._cache_owner)
+        return self._score(ctx)
+
+    @staticmethod
+    def _score(ctx: CorridorVolatilityContext) -> float:
         v = ctx.market_volatility_index
 
         # Hard reject if above threshold
@@ -74,6 +92,38 @@ class VolatilityGraph:
         # Clamp + round for cleaner output
         return max(0.0, min(1.0, round(score, 3)))
 
+    def calculate_score(self, corridor_id: str, market_volatility_index: float) -> float:
+        """Keyword convenience wrapper around `get_volatility_score`."""
+        return self.get_volatility_score(
+            CorridorVolatilityContext(
+                corridor_id=corridor_id,
+                market_volatility_index=market_volatility_index,
+            )
+        )
+
+    def get_volatility_score_batch(self, volatility_indices: np.ndarray) -> np.ndarray:
+        """
+        Vectorised `get_volatility_score` over an array of volatility indices.
+
+        Returns
+        -------
+        np.ndarray
+            float64 scores, identical to the scalar version element-wise.
+        """
+        v = np.asarray(volatility_indices, dtype=np.float64)
+        reject = v > MAX_VOLATILITY_THRESHOLD
+
+        if MAX_VOLATILITY_THRESHOLD == 0:
+            return np.where(reject, 0.0, 1.0)
+
+        v = np.where(v < 0.0, 0.0, v)
+        v = np.where(v > MAX_VOLATILITY_THRESHOLD, MAX_VOLATILITY_THRESHOLD, v)
+
+        remaining_fraction = (MAX_VOLATILITY_THRESHOLD - v) / MAX_VOLATILITY_THRESHOLD
+        score = 0.1 + remaining_fraction * 0.9
+
+        return np.where(reject, 0.0, round_and_clamp(score))
+
 
 if __name__ == "__main__":
     graph = VolatilityGraph()
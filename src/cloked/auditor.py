@@ -1,7 +1,9 @@
 import hashlib
-import json
 from datetime import datetime, timezone
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List
+
+from src.cloked.hash_chain import canonical_event_json, compute_event_hash, hash_event_json
+from src.cloked.merkle import InclusionProof, MerkleTree, event_leaf_hash
 
 
 class ClokedLogger:
@@ -27,10 +29,19 @@ class AuditChain:
 
     Each entry links:
       prev_hash + event_json  ->  sha256 -> current hash
+
+    This is the in-memory chain for a single run. For long-lived chains
+    see `src.cloked.hash_chain.SegmentedHashChain`, which persists the same
+    hashes to append-only segment files with incremental verification.
+
+    Alongside the linear chain, every event is also a leaf of a Merkle
+    tree (entry i is leaf i), so a single event can be proven against the
+    published `merkle_root()` with an O(log n) `inclusion_proof(i)`.
     """
 
     def __init__(self) -> None:
         self.chain: List[Dict[str, Any]] = []
+        self.merkle = MerkleTree()
 
         # Genesis block with a fixed previous_hash
         genesis_prev = "0" * 64
@@ -40,7 +51,8 @@ class AuditChain:
             "event_type": "GENESIS",
             "details": {},
         }
-        genesis_hash = self._compute_hash(genesis_prev, genesis_event)
+        genesis_json = canonical_event_json(genesis_event)
+        genesis_hash = hash_event_json(genesis_prev, genesis_json)
         self.chain.append(
             {
                 "event": genesis_event,
@@ -48,15 +60,14 @@ class AuditChain:
                 "previous_hash": genesis_prev,
             }
         )
+        self.merkle.append(event_leaf_hash(genesis_event, genesis_json))
 
     # ----------------- internal helpers -----------------
 
     def _compute_hash(
         self, previous_hash: str, event: Dict[str, Any]
     ) -> str:
-        event_str = json.dumps(event, sort_keys=True, separators=(",", ":"))
-        payload = (previous_hash + event_str).encode("utf-8")
-        return hashlib.sha256(payload).hexdigest()
+        return compute_event_hash(previous_hash, event)
 
     # ----------------- public API -----------------
 
@@ -65,13 +76,41 @@ class AuditChain:
         Append an event to the chain and compute a new tip hash.
         """
         previous_hash = self.chain[-1]["hash"] if self.chain else "0" * 64
-        new_hash = self._compute_hash(previous_hash, event)
+        # Serialise once: the chain hash and the Merkle leaf share the bytes.
+        event_json = canonical_event_json(event)
+        new_hash = hash_event_json(previous_hash, event_json)
         entry = {
             "event": event,
             "hash": new_hash,
             "previous_hash": previous_hash,
         }
         self.chain.append(entry)
+        self.merkle.append(event_leaf_hash(event, event_json))
+
+    def log_events(self, events: Iterable[Dict[str, Any]]) -> None:
+        """
+        Append many events at once.
+
+        Same result as calling `log_event` per event, but every event is
+        serialised up front with the shared canonical encoder and the
+        hashing loop runs without per-call overhead.
+        """
+        payloads = [(event, canonical_event_json(event)) for event in events]
+
+        chain = self.chain
+        merkle_append = self.merkle.append
+        previous_hash = chain[-1]["hash"] if chain else "0" * 64
+        for event, event_json in payloads:
+            new_hash = hash_event_json(previous_hash, event_json)
+            chain.append(
+                {
+                    "event": event,
+                    "hash": new_hash,
+                    "previous_hash": previous_hash,
+                }
+            )
+            merkle_append(event_leaf_hash(event, event_json))
+            previous_hash = new_hash
 
     def verify_integrity(self) -> bool:
         """
@@ -103,3 +142,16 @@ class AuditChain:
         if not self.chain:
             return ""
         return self.chain[-1]["hash"]
+
+    def merkle_root(self) -> str:
+        """
+        Return the current Merkle root over all logged events (to publish).
+        """
+        return self.merkle.root()
+
+    def inclusion_proof(self, index: int) -> InclusionProof:
+        """
+        Return an O(log n) inclusion proof for chain entry `index`
+        against the current `merkle_root()`.
+        """
+        return self.merkle.inclusion_proof(index)
@@ -5,16 +5,21 @@ from datetime import datetime
 
 class EvidenceCapsule:
     def __init__(self, capsule_id, transaction_id, generated_at,
-                 schema_version, events, audit_hash):
+                 schema_version, events, audit_hash,
+                 merkle_root=None, inclusion_proofs=None):
         self.capsule_id = capsule_id
         self.transaction_id = transaction_id
         self.generated_at = generated_at
         self.schema_version = schema_version
         self.events = events
         self.audit_hash = audit_hash
+        # Optional: Merkle root + one inclusion proof per event, so the
+        # capsule can be checked without the full audit chain.
+        self.merkle_root = merkle_root
+        self.inclusion_proofs = inclusion_proofs
 
     def to_dict(self):
-        return {
+        data = {
             "capsule_id": self.capsule_id,
             "transaction_id": self.transaction_id,
             "schema_version": self.schema_version,
@@ -22,6 +27,13 @@ class EvidenceCapsule:
             "audit_hash": self.audit_hash,
             "events": self.events
         }
+        if self.merkle_root is not None:
+            data["merkle_root"] = self.merkle_root
+            data["inclusion_proofs"] = [
+                p.to_dict() if hasattr(p, "to_dict") else p
+                for p in (self.inclusion_proofs or [])
+            ]
+        return data
 
     def to_json(self):
         return json.dumps(self.to_dict(), indent=2)
@@ -0,0 +1,297 @@
+# src/cloked/capsule_stream.py
+
+from __future__ import annotations
+
+import json
+import mmap
+import struct
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.cloked.capsule import EvidenceCapsule
+from src.cloked.hash_chain import canonical_event_json
+
+
+# ---------- Wire format ----------
+#
+# A streamed capsule is a short file header followed by frames:
+#
+#     file header : MAGIC (4 bytes) | version (1 byte) | flags (1 byte)
+#     frame       : kind (1 byte) | payload length (uint32, big-endian) | payload
+#
+# The first frame is HEADER (capsule metadata), then one EVENT frame per
+# event in canonical JSON, then a FOOTER (audit hash, Merkle root, proofs)
+# written when the capsule is finished. Every frame is flushed to the OS
+# as soon as it is written, so a capsule without a footer was not
+# finished (e.g. the process died mid-transaction) but every event
+# appended before that is still readable. A frame cut short at the end of
+# the file (the write in flight when the process died) is dropped.
+#
+# With FLAG_ZLIB every payload is a sync-flushed chunk of one zlib stream
+# for the whole file, so small, repetitive events compress against each
+# other while frames can still be written and read one at a time.
+
+MAGIC: bytes = b"CLKC"
+FORMAT_VERSION: int = 1
+FLAG_ZLIB: int = 0x01
+
+FRAME_HEADER: int = 1
+FRAME_EVENT: int = 2
+FRAME_FOOTER: int = 3
+
+_FILE_HEADER = struct.Struct(">4sBB")
+_FRAME = struct.Struct(">BI")
+_MAX_PAYLOAD: int = 0xFFFFFFFF
+
+DEFAULT_SCHEMA_VERSION: str = "1.1"
+
+
+class CapsuleFormatError(ValueError):
+    """The file is not a streamed capsule, or it is corrupt."""
+
+
+# ---------- Writer ----------
+
+
+class CapsuleStreamWriter:
+    """
+    Appends events to a streamed evidence capsule as they happen.
+
+    Each `append` encodes one event and writes and flushes one frame, so
+    memory use is independent of the capsule size and a crash loses at
+    most the frame being written. Call `finish` once the audit hash (and
+    optionally Merkle root / proofs) is known; `close` without `finish`
+    leaves an unfinished capsule.
+
+    Parameters
+    ----------
+    path : str
+        File to create (overwritten if it exists).
+    capsule_id, transaction_id : str
+        Capsule metadata, stored in the HEADER frame.
+    schema_version : str
+        Capsule schema version.
+    generated_at : Optional[str]
+        ISO-8601 timestamp; defaults to now (UTC).
+    compress : bool
+        zlib-compress the frame payloads.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        capsule_id: str,
+        transaction_id: str,
+        schema_version: str = DEFAULT_SCHEMA_VERSION,
+        generated_at: Optional[str] = None,
+        compress: bool = False,
+    ) -> None:
+        self.path = path
+        self.compress = compress
+        self.event_count = 0
+        self._compressor = zlib.compressobj() if compress else None
+        self._file = open(path, "wb")
+        self._finished = False
+
+        self._file.write(_FILE_HEADER.pack(MAGIC, FORMAT_VERSION, FLAG_ZLIB if compress else 0))
+        self._write_frame(
+            FRAME_HEADER,
+            canonical_event_json(
+                {
+                    "capsule_id": capsule_id,
+                    "transaction_id": transaction_id,
+                    "schema_version": schema_version,
+                    "generated_at": generated_at or datetime.now(timezone.utc).isoformat(),
+                }
+            ),
+        )
+
+    def _write_frame(self, kind: int, payload_json: str) -> None:
+        payload = payload_json.encode("utf-8")
+        if self._compressor is not None:
+            payload = self._compressor.compress(payload) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        if len(payload) > _MAX_PAYLOAD:
+            raise ValueError("capsule frame too large")
+        self._file.write(_FRAME.pack(kind, len(payload)))
+        self._file.write(payload)
+        self._file.flush()
+
+    def append(self, event: Dict[str, Any]) -> None:
+        if self._finished:
+            raise ValueError("capsule already finished")
+        self._write_frame(FRAME_EVENT, canonical_event_json(event))
+        self.event_count += 1
+
+    def append_many(self, events: Iterable[Dict[str, Any]]) -> None:
+        for event in events:
+            self.append(event)
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def finish(
+        self,
+        audit_hash: str,
+        merkle_root: Optional[str] = None,
+        inclusion_proofs: Optional[List[Any]] = None,
+    ) -> None:
+        """Write the FOOTER frame and close the file."""
+        footer: Dict[str, Any] = {"audit_hash": audit_hash, "event_count": self.event_count}
+        if merkle_root is not None:
+            footer["merkle_root"] = merkle_root
+            footer["inclusion_proofs"] = [
+                p.to_dict() if hasattr(p, "to_dict") else p for p in (inclusion_proofs or [])
+            ]
+        self._write_frame(FRAME_FOOTER, canonical_event_json(footer))
+        self._finished = True
+        self.close()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self) -> "CapsuleStreamWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def write_capsule(capsule: EvidenceCapsule, path: str, compress: bool = False) -> None:
+    """Write an in-memory `EvidenceCapsule` in the streamed format."""
+    writer = CapsuleStreamWriter(
+        path,
+        capsule.capsule_id,
+        capsule.transaction_id,
+        schema_version=capsule.schema_version,
+        generated_at=capsule.generated_at,
+        compress=compress,
+    )
+    writer.append_many(capsule.events)
+    writer.finish(capsule.audit_hash, capsule.merkle_root, capsule.inclusion_proofs)
+
+
+# ---------- Reader ----------
+
+
+class CapsuleStreamReader:
+    """
+    Lazily reads a streamed evidence capsule.
+
+    The file is memory-mapped by default (`use_mmap=False` reads it with
+    plain buffered I/O instead); `iter_events` decodes one frame at a time,
+    so iterating never holds more than one event in memory. A frame cut
+    short at the end of the file ends the capsule cleanly and sets
+    `truncated`.
+    """
+
+    def __init__(self, path: str, use_mmap: bool = True) -> None:
+        self.path = path
+        self.use_mmap = use_mmap
+        self._file = open(path, "rb")
+        self._map: Optional[mmap.mmap] = None
+        self.truncated = False
+
+        raw = self._file.read(_FILE_HEADER.size)
+        if len(raw) < _FILE_HEADER.size:
+            self.close()
+            raise CapsuleFormatError("truncated capsule header")
+        magic, version, flags = _FILE_HEADER.unpack(raw)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.close()
+            raise CapsuleFormatError(f"not a streamed capsule: {path}")
+        self.compressed = bool(flags & FLAG_ZLIB)
+
+        if use_mmap:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        frames = self._frames()
+        kind, header = next(frames, (None, None))
+        frames.close()
+        if kind != FRAME_HEADER:
+            self.close()
+            raise CapsuleFormatError("capsule has no header frame")
+        self.header: Dict[str, Any] = header
+
+    def _raw_frames(self) -> Iterator[Tuple[int, bytes]]:
+        if self._map is not None:
+            buf, offset, end = self._map, _FILE_HEADER.size, len(self._map)
+            while offset + _FRAME.size <= end:
+                kind, length = _FRAME.unpack_from(buf, offset)
+                offset += _FRAME.size
+                if offset + length > end:
+                    self.truncated = True
+                    return
+                yield kind, buf[offset:offset + length]
+                offset += length
+            self.truncated = offset != end
+            return
+
+        self._file.seek(_FILE_HEADER.size)
+        while True:
+            head = self._file.read(_FRAME.size)
+            if len(head) < _FRAME.size:
+                self.truncated = bool(head)
+                return
+            kind, length = _FRAME.unpack(head)
+            payload = self._file.read(length)
+            if len(payload) < length:
+                self.truncated = True
+                return
+            yield kind, payload
+
+    def _frames(self) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        decompressor = zlib.decompressobj() if self.compressed else None
+        for kind, payload in self._raw_frames():
+            if decompressor is not None:
+                payload = decompressor.decompress(payload)
+            yield kind, json.loads(payload)
+
+    def iter_events(self) -> Iterator[Dict[str, Any]]:
+        for kind, data in self._frames():
+            if kind == FRAME_EVENT:
+                yield data
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self.iter_events()
+
+    def footer(self) -> Optional[Dict[str, Any]]:
+        """The FOOTER frame, or None if the capsule was never finished."""
+        for kind, data in self._frames():
+            if kind == FRAME_FOOTER:
+                return data
+        return None
+
+    def to_capsule(self) -> EvidenceCapsule:
+        """Materialise the whole capsule as an `EvidenceCapsule`."""
+        events: List[Dict[str, Any]] = []
+        footer: Dict[str, Any] = {}
+        for kind, data in self._frames():
+            if kind == FRAME_EVENT:
+                events.append(data)
+            elif kind == FRAME_FOOTER:
+                footer = data
+        return EvidenceCapsule(
+            capsule_id=self.header["capsule_id"],
+            transaction_id=self.header["transaction_id"],
+            generated_at=self.header["generated_at"],
+            schema_version=self.header["schema_version"],
+            events=events,
+            audit_hash=footer.get("audit_hash"),
+            merkle_root=footer.get("merkle_root"),
+            inclusion_proofs=footer.get("inclusion_proofs"),
+        )
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self) -> "CapsuleStreamReader":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
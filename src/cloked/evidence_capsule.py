@@ -1 +1,231 @@
+# src/cloked/evidence_capsule.py
 
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from src.cloked.capsule import EvidenceCapsule
+from src.cloked.export_logs import iso_to_epoch
+from src.cloked.hash_chain import canonical_event_json
+
+
+TimeBound = Union[float, str, datetime, None]
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS capsules (
+    transaction_id TEXT PRIMARY KEY,
+    capsule_id     TEXT NOT NULL,
+    generated_at   TEXT NOT NULL,
+    audit_hash     TEXT,
+    merkle_root    TEXT,
+    body           TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS events (
+    transaction_id TEXT NOT NULL,
+    seq            INTEGER NOT NULL,
+    event_id       TEXT,
+    event_type     TEXT,
+    node_id        TEXT,
+    ts             REAL,
+    body           TEXT NOT NULL,
+    PRIMARY KEY (transaction_id, seq)
+);
+CREATE INDEX IF NOT EXISTS events_node_type_ts ON events (node_id, event_type, ts);
+CREATE INDEX IF NOT EXISTS events_type_ts ON events (event_type, ts);
+CREATE INDEX IF NOT EXISTS events_ts ON events (ts);
+"""
+
+
+def _epoch(value: TimeBound) -> Optional[float]:
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, datetime):
+        return iso_to_epoch(value.isoformat())
+    return iso_to_epoch(value)
+
+
+def _event_row(transaction_id: str, seq: int, event: Dict[str, Any]) -> Tuple[Any, ...]:
+    details = event.get("details") or {}
+    timestamp = event.get("timestamp")
+    return (
+        transaction_id,
+        seq,
+        event.get("event_id"),
+        event.get("event_type"),
+        details.get("node_id"),
+        iso_to_epoch(timestamp) if timestamp else None,
+        canonical_event_json(event),
+    )
+
+
+class CapsuleStore:
+    """
+    Indexed evidence capsule store on SQLite.
+
+    Each capsule is one row in `capsules` (keyed by transaction_id) and
+    each of its events one row in `events`, with the event's node
+    (`details["node_id"]`), type and timestamp broken out into indexed
+    columns. A query such as "all HOP_FAILUREs at SG_CORR_1 last week" is
+    a range scan over the (node_id, event_type, ts) index instead of a
+    walk over capsule files.
+
+    Parameters
+    ----------
+    path : str
+        Database file, or ":memory:".
+    """
+
+    def __init__(self, path: str = ":memory:") -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    # ---------- Writes ----------
+
+    def _put_locked(self, capsule: Any) -> None:
+        data = capsule.to_dict() if isinstance(capsule, EvidenceCapsule) else capsule
+        transaction_id = data["transaction_id"]
+        self._conn.execute("DELETE FROM events WHERE transaction_id = ?", (transaction_id,))
+        self._conn.execute(
+            "INSERT OR REPLACE INTO capsules VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                transaction_id,
+                data["capsule_id"],
+                data["generated_at"],
+                data.get("audit_hash"),
+                data.get("merkle_root"),
+                canonical_event_json(data),
+            ),
+        )
+        self._conn.executemany(
+            "INSERT INTO events VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [_event_row(transaction_id, seq, ev) for seq, ev in enumerate(data.get("events", []))],
+        )
+
+    def put(self, capsule: Any) -> None:
+        """Store a capsule (an `EvidenceCapsule` or its dict form), replacing any earlier one."""
+        with self._lock, self._conn:
+            self._put_locked(capsule)
+
+    def put_many(self, capsules: Iterable[Any]) -> int:
+        """Store many capsules in a single SQLite transaction."""
+        count = 0
+        with self._lock, self._conn:
+            for capsule in capsules:
+                self._put_locked(capsule)
+                count += 1
+        return count
+
+    # ---------- Queries ----------
+
+    def get(self, transaction_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body FROM capsules WHERE transaction_id = ?", (transaction_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    @staticmethod
+    def _where(
+        transaction_id: Optional[str],
+        node_id: Optional[str],
+        event_type: Optional[str],
+        start: TimeBound,
+        end: TimeBound,
+    ) -> Tuple[str, List[Any]]:
+        clauses: List[str] = []
+        params: List[Any] = []
+        for column, value in (
+            ("transaction_id", transaction_id),
+            ("node_id", node_id),
+            ("event_type", event_type),
+        ):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if start is not None:
+            clauses.append("ts >= ?")
+            params.append(_epoch(start))
+        if end is not None:
+            clauses.append("ts <= ?")
+            params.append(_epoch(end))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query_events(
+        self,
+        transaction_id: Optional[str] = None,
+        node_id: Optional[str] = None,
+        event_type: Optional[str] = None,
+        start: TimeBound = None,
+        end: TimeBound = None,
+        limit: Optional[int] = None,
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Events matching every given filter, oldest first.
+
+        `start` / `end` are inclusive and may be POSIX seconds, ISO-8601
+        strings or datetimes.
+
+        Returns
+        -------
+        List[Tuple[str, Dict[str, Any]]]
+            (transaction_id, event) pairs.
+        """
+        where, params = self._where(transaction_id, node_id, event_type, start, end)
+        sql = f"SELECT transaction_id, body FROM events{where} ORDER BY ts, transaction_id, seq"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [(txid, json.loads(body)) for txid, body in rows]
+
+    def count_events(
+        self,
+        transaction_id: Optional[str] = None,
+        node_id: Optional[str] = None,
+        event_type: Optional[str] = None,
+        start: TimeBound = None,
+        end: TimeBound = None,
+    ) -> int:
+        where, params = self._where(transaction_id, node_id, event_type, start, end)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM events{where}", params).fetchone()[0]
+
+    def transactions(
+        self,
+        node_id: Optional[str] = None,
+        event_type: Optional[str] = None,
+        start: TimeBound = None,
+        end: TimeBound = None,
+    ) -> List[str]:
+        """Distinct transaction ids with at least one matching event."""
+        where, params = self._where(None, node_id, event_type, start, end)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT DISTINCT transaction_id FROM events{where} ORDER BY transaction_id", params
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM capsules").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "CapsuleStore":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
@@ -1 +1,358 @@
+# src/cloked/export_logs.py
 
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import struct
+import threading
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import IO, Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from src.cloked.capsule import EvidenceCapsule
+from src.cloked.hash_chain import canonical_event_json
+
+
+ARCHIVE_SUFFIX: str = ".clka"
+INDEX_SUFFIX: str = ".index.sqlite"
+INDEX_COMMIT_EVERY: int = 256  # index rows per SQLite commit between flushes
+
+DEFAULT_SHARDS: int = 16
+DEFAULT_MAX_ARCHIVE_BYTES: int = 64 * 1024 * 1024
+
+
+# ---------- Records & index ----------
+#
+# Archive files hold many capsules back to back, one record each:
+#
+#     flags (1 byte) | payload length (uint32, big-endian) | payload
+#
+# The payload is the capsule's canonical JSON, zlib-compressed when
+# FLAG_ZLIB is set. Records are compressed one by one so any capsule can
+# be read with a single seek.
+#
+# Each shard has its own SQLite index, `shard-03.index.sqlite`, with one
+# row per exported capsule, committed after its record has been written:
+#
+#     transaction_id | archive file | offset | length | start | end
+#
+# where start/end are the first/last event times (POSIX seconds). A record
+# without an index row (crash between the two writes) is ignored. Rows are
+# appended in file/offset order, so scanning a shard's index by rowid
+# visits its records in the order they sit on disk.
+
+FLAG_ZLIB: int = 0x01
+_RECORD = struct.Struct(">BI")
+
+_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    transaction_id TEXT PRIMARY KEY,
+    file           TEXT NOT NULL,
+    pos            INTEGER NOT NULL,
+    length         INTEGER NOT NULL,
+    start_ts       REAL NOT NULL,
+    end_ts         REAL NOT NULL
+);
+"""
+_ENTRY_COLUMNS = "transaction_id, file, pos, length, start_ts, end_ts"
+
+
+def iso_to_epoch(timestamp: str) -> float:
+    """ISO-8601 → POSIX seconds; a trailing "Z" and naive times mean UTC."""
+    if timestamp.endswith("Z"):
+        timestamp = timestamp[:-1] + "+00:00"
+    dt = datetime.fromisoformat(timestamp)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def capsule_time_range(capsule: Mapping[str, Any]) -> Tuple[float, float]:
+    """(first, last) event time of a capsule dict; `generated_at` if it has no events."""
+    times = [iso_to_epoch(ev["timestamp"]) for ev in capsule.get("events", []) if ev.get("timestamp")]
+    if not times:
+        generated = iso_to_epoch(capsule["generated_at"])
+        return generated, generated
+    return min(times), max(times)
+
+
+@dataclass(frozen=True)
+class IndexEntry:
+    """Where one transaction's capsule lives in the archive."""
+    transaction_id: str
+    file: str
+    offset: int
+    length: int
+    start: float
+    end: float
+
+
+# ---------- Archive ----------
+
+
+class EvidenceArchive:
+    """
+    Sharded, rotated archive of evidence capsules.
+
+    Instead of one JSON file per transaction, capsules are appended to a
+    small number of archive files: each transaction is assigned to one of
+    `shards` shards by a hash of its id, and a shard rolls over to a new
+    file once it reaches `max_archive_bytes`. File names look like
+    `shard-03-000001.clka`.
+
+    Each shard's SQLite index maps transaction_id → (file, offset), so
+    `get` is one primary-key lookup, one seek and one read, and nothing
+    is held in memory per transaction. `iter_range` / `export_range`
+    stream the capsules that overlap a time range one at a time, shard by
+    shard in on-disk order, so memory use does not depend on how many
+    transactions the archive holds or how many match.
+
+    Parameters
+    ----------
+    directory : str
+        Archive directory (created if missing).
+    shards : int
+        Number of shards. Must not change once the archive has data.
+    max_archive_bytes : int
+        Size at which a shard's current file is rotated.
+    compress : bool
+        zlib-compress new records.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        shards: int = DEFAULT_SHARDS,
+        max_archive_bytes: int = DEFAULT_MAX_ARCHIVE_BYTES,
+        compress: bool = True,
+    ) -> None:
+        if shards < 1:
+            raise ValueError("shards must be >= 1")
+        self.directory = directory
+        self.shards = shards
+        self.max_archive_bytes = max_archive_bytes
+        self.compress = compress
+
+        self._lock = threading.Lock()
+        self._indexes: Dict[int, sqlite3.Connection] = {}
+        self._uncommitted = 0
+        self._writers: Dict[int, Tuple[str, IO[bytes]]] = {}
+
+        os.makedirs(directory, exist_ok=True)
+
+    # ---------- Layout ----------
+
+    def shard_for(self, transaction_id: str) -> int:
+        return zlib.crc32(transaction_id.encode("utf-8")) % self.shards
+
+    @staticmethod
+    def _archive_name(shard: int, generation: int) -> str:
+        return f"shard-{shard:02d}-{generation:06d}{ARCHIVE_SUFFIX}"
+
+    @staticmethod
+    def _generation_of(name: str) -> int:
+        return int(name[: -len(ARCHIVE_SUFFIX)].rsplit("-", 1)[1])
+
+    def _latest_generation(self, shard: int) -> int:
+        prefix = f"shard-{shard:02d}-"
+        generations = [
+            self._generation_of(name)
+            for name in os.listdir(self.directory)
+            if name.startswith(prefix) and name.endswith(ARCHIVE_SUFFIX)
+        ]
+        return max(generations, default=1)
+
+    def archives(self) -> List[str]:
+        return sorted(n for n in os.listdir(self.directory) if n.endswith(ARCHIVE_SUFFIX))
+
+    def _index_path(self, shard: int) -> str:
+        return os.path.join(self.directory, f"shard-{shard:02d}{INDEX_SUFFIX}")
+
+    def _index_for(self, shard: int) -> sqlite3.Connection:
+        conn = self._indexes.get(shard)
+        if conn is None:
+            conn = sqlite3.connect(self._index_path(shard), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_INDEX_SCHEMA)
+            self._indexes[shard] = conn
+        return conn
+
+    def _commit_locked(self) -> None:
+        for conn in self._indexes.values():
+            conn.commit()
+        self._uncommitted = 0
+
+    def _writer_for(self, shard: int, record_size: int) -> Tuple[str, IO[bytes]]:
+        current = self._writers.get(shard)
+        if current is None:
+            name = self._archive_name(shard, self._latest_generation(shard))
+            current = (name, open(os.path.join(self.directory, name), "ab"))
+            self._writers[shard] = current
+
+        name, f = current
+        if f.tell() > 0 and f.tell() + record_size > self.max_archive_bytes:
+            f.close()
+            name = self._archive_name(shard, self._generation_of(name) + 1)
+            current = (name, open(os.path.join(self.directory, name), "ab"))
+            self._writers[shard] = current
+        return current
+
+    # ---------- Export ----------
+
+    def export(self, capsule: Any) -> IndexEntry:
+        """
+        Append one capsule (an `EvidenceCapsule` or its dict form).
+
+        Re-exporting a transaction appends a new record and repoints the
+        index at it.
+        """
+        data = capsule.to_dict() if isinstance(capsule, EvidenceCapsule) else capsule
+        payload = canonical_event_json(data).encode("utf-8")
+        flags = 0
+        if self.compress:
+            payload, flags = zlib.compress(payload), FLAG_ZLIB
+        record = _RECORD.pack(flags, len(payload)) + payload
+        start, end = capsule_time_range(data)
+        transaction_id = data["transaction_id"]
+
+        with self._lock:
+            shard = self.shard_for(transaction_id)
+            name, f = self._writer_for(shard, len(record))
+            offset = f.tell()
+            f.write(record)
+            f.flush()
+            entry = IndexEntry(transaction_id, name, offset, len(record), start, end)
+            self._index_for(shard).execute(
+                f"INSERT OR REPLACE INTO entries ({_ENTRY_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+                (entry.transaction_id, entry.file, entry.offset, entry.length, entry.start, entry.end),
+            )
+            self._uncommitted += 1
+            if self._uncommitted >= INDEX_COMMIT_EVERY:
+                self._commit_locked()
+        return entry
+
+    def export_many(self, capsules: Iterable[Any]) -> int:
+        count = 0
+        for capsule in capsules:
+            self.export(capsule)
+            count += 1
+        self.flush()
+        return count
+
+    def flush(self) -> None:
+        """Flush archive files and commit pending index rows."""
+        with self._lock:
+            for _, f in self._writers.values():
+                f.flush()
+            self._commit_locked()
+
+    def close(self) -> None:
+        with self._lock:
+            for _, f in self._writers.values():
+                f.close()
+            self._writers.clear()
+            self._commit_locked()
+            for conn in self._indexes.values():
+                conn.close()
+            self._indexes.clear()
+
+    def __enter__(self) -> "EvidenceArchive":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    # ---------- Lookup ----------
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(
+                self._index_for(shard).execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+                for shard in range(self.shards)
+                if shard in self._indexes or os.path.exists(self._index_path(shard))
+            )
+
+    def __contains__(self, transaction_id: str) -> bool:
+        return self.locate(transaction_id) is not None
+
+    def locate(self, transaction_id: str) -> Optional[IndexEntry]:
+        shard = self.shard_for(transaction_id)
+        with self._lock:
+            if shard not in self._indexes and not os.path.exists(self._index_path(shard)):
+                return None
+            row = self._index_for(shard).execute(
+                f"SELECT {_ENTRY_COLUMNS} FROM entries WHERE transaction_id = ?", (transaction_id,)
+            ).fetchone()
+        return IndexEntry(*row) if row else None
+
+    def _read(self, f: IO[bytes], entry: IndexEntry) -> Dict[str, Any]:
+        f.seek(entry.offset)
+        record = f.read(entry.length)
+        flags, length = _RECORD.unpack_from(record)
+        payload = record[_RECORD.size:_RECORD.size + length]
+        if flags & FLAG_ZLIB:
+            payload = zlib.decompress(payload)
+        return json.loads(payload)
+
+    def get(self, transaction_id: str) -> Optional[Dict[str, Any]]:
+        """The capsule dict for `transaction_id`, or None if it was never exported."""
+        entry = self.locate(transaction_id)
+        if entry is None:
+            return None
+        self.flush()
+        with open(os.path.join(self.directory, entry.file), "rb") as f:
+            return self._read(f, entry)
+
+    def _iter_entries(self, shard: int, start: float, end: float) -> Iterator[IndexEntry]:
+        """Index rows of one shard overlapping [start, end], in file/offset order."""
+        path = self._index_path(shard)
+        if not os.path.exists(path):
+            return
+        # A private read connection: the cursor streams rows from a
+        # committed snapshot while exports carry on.
+        conn = sqlite3.connect(path)
+        try:
+            rows = conn.execute(
+                f"SELECT {_ENTRY_COLUMNS} FROM entries WHERE start_ts <= ? AND end_ts >= ? ORDER BY rowid",
+                (end, start),
+            )
+            for row in rows:
+                yield IndexEntry(*row)
+        finally:
+            conn.close()
+
+    def iter_range(self, start: float, end: float) -> Iterator[Dict[str, Any]]:
+        """
+        Yield capsules whose events overlap [start, end] (POSIX seconds).
+
+        Shards are visited in turn and each one's records in file/offset
+        order, one at a time, with a single open archive file.
+        """
+        self.flush()
+        f: Optional[IO[bytes]] = None
+        current = None
+        try:
+            for shard in range(self.shards):
+                for entry in self._iter_entries(shard, start, end):
+                    if entry.file != current:
+                        if f is not None:
+                            f.close()
+                        f = open(os.path.join(self.directory, entry.file), "rb")
+                        current = entry.file
+                    yield self._read(f, entry)
+        finally:
+            if f is not None:
+                f.close()
+
+    def export_range(self, start: float, end: float, out_path: str) -> int:
+        """Write capsules overlapping [start, end] to `out_path` as JSON lines; returns the count."""
+        count = 0
+        with open(out_path, "w", encoding="utf-8") as out:
+            for capsule in self.iter_range(start, end):
+                out.write(canonical_event_json(capsule) + "\n")
+                count += 1
+        return count
@@ -1 +1,588 @@
+# src/cloked/hash_chain.py
 
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+GENESIS_PREVIOUS_HASH: str = "0" * 64
+
+SEGMENT_PREFIX: str = "segment-"
+SEGMENT_SUFFIX: str = ".log"
+CHECKPOINTS_FILE: str = "checkpoints.log"
+VERIFIED_FILE: str = "verified.json"
+
+DEFAULT_MAX_SEGMENT_BYTES: int = 64 * 1024 * 1024
+DEFAULT_CHECKPOINT_INTERVAL: int = 1024
+DEFAULT_FSYNC_EVERY: int = 256
+
+
+# ---------- Hashing primitives (shared with AuditChain) ----------
+
+
+# One shared encoder: json.dumps with non-default options builds a new
+# JSONEncoder on every call, which dominates the cost for small events.
+_CANONICAL_ENCODER = json.JSONEncoder(sort_keys=True, separators=(",", ":"))
+
+
+def canonical_event_json(event: Dict[str, Any]) -> str:
+    """Canonical JSON for hashing: sorted keys, no whitespace."""
+    return _CANONICAL_ENCODER.encode(event)
+
+
+def hash_event_json(previous_hash: str, event_json: str) -> str:
+    return hashlib.sha256((previous_hash + event_json).encode("utf-8")).hexdigest()
+
+
+def compute_event_hash(previous_hash: str, event: Dict[str, Any]) -> str:
+    """prev_hash + event_json -> sha256 (same scheme as `AuditChain`)."""
+    return hash_event_json(previous_hash, canonical_event_json(event))
+
+
+# ---------- Records & checkpoints ----------
+#
+# Segment files hold one record per line:
+#
+#     <seq>\t<previous_hash>\t<hash>\t<canonical event json>\n
+#
+# Canonical JSON never contains a raw tab or newline, and the hash covers
+# exactly the stored event bytes, so verification can rehash lines as
+# they stream past without parsing JSON.
+
+
+@dataclass(frozen=True)
+class Checkpoint:
+    """Position right after record `seq`, whose hash is `hash`."""
+    seq: int
+    segment: int
+    offset: int
+    hash: str
+
+    def to_line(self) -> str:
+        return f"{self.seq}\t{self.segment}\t{self.offset}\t{self.hash}\n"
+
+    @classmethod
+    def from_line(cls, line: str) -> "Checkpoint":
+        seq, segment, offset, hash_ = line.rstrip("\n").split("\t")
+        return cls(int(seq), int(segment), int(offset), hash_)
+
+
+@dataclass(frozen=True)
+class VerificationResult:
+    ok: bool
+    records: int
+    last_seq: int
+    last_hash: str
+    error: Optional[str] = None
+    first_prev: Optional[str] = None
+
+
+def verify_segment_range(
+    path: str,
+    start_offset: int = 0,
+    end_offset: Optional[int] = None,
+    expected_prev: Optional[str] = None,
+) -> VerificationResult:
+    """
+    Verify the records of one segment file between two byte offsets.
+
+    Streams the file: each record's hash is recomputed from its stored
+    previous hash and event bytes, and each record must link to the one
+    before it. If `expected_prev` is given the first record must link to
+    it; either way the first record's previous hash is reported as
+    `first_prev` so independently verified ranges can be stitched together.
+
+    Module-level so it can run in worker processes.
+    """
+    prev = expected_prev
+    first_prev: Optional[str] = None
+    records = 0
+    last_seq = -1
+    with open(path, "rb") as f:
+        f.seek(start_offset)
+        pos = start_offset
+        for raw in f:
+            if end_offset is not None and pos >= end_offset:
+                break
+            if not raw.endswith(b"\n"):
+                break  # partial tail still being written
+            try:
+                seq_b, stored_prev, stored_hash, event_json = raw[:-1].split(b"\t", 3)
+                seq = int(seq_b)
+                stored_prev_s = stored_prev.decode("ascii")
+                stored_hash_s = stored_hash.decode("ascii")
+            except (ValueError, UnicodeDecodeError):
+                # Garbage line, or a start offset that is not a record boundary.
+                return VerificationResult(
+                    False, records, last_seq, prev or "", f"malformed record at offset {pos}", first_prev
+                )
+            if first_prev is None:
+                first_prev = stored_prev_s
+
+            if prev is not None and stored_prev_s != prev:
+                return VerificationResult(
+                    False, records, last_seq, prev, f"broken link at seq {seq}", first_prev
+                )
+
+            expected = hashlib.sha256(stored_prev + event_json).hexdigest()
+            if expected != stored_hash_s:
+                return VerificationResult(
+                    False, records, last_seq, prev or "", f"hash mismatch at seq {seq}", first_prev
+                )
+
+            prev = stored_hash_s
+            last_seq = seq
+            records += 1
+            pos += len(raw)
+
+    return VerificationResult(True, records, last_seq, prev or "", None, first_prev)
+
+
+def _verify_range_job(job: Tuple[str, int, Optional[int], Optional[Checkpoint]]) -> VerificationResult:
+    """Verify one range; a range ending at a checkpoint must end on its seq and hash."""
+    path, start, end, checkpoint = job
+    result = verify_segment_range(path, start, end)
+    if result.ok and checkpoint is not None and (
+        result.last_hash != checkpoint.hash or result.last_seq != checkpoint.seq
+    ):
+        return VerificationResult(
+            False, result.records, result.last_seq, result.last_hash,
+            f"checkpoint mismatch at seq {checkpoint.seq}", result.first_prev,
+        )
+    return result
+
+
+class SegmentedHashChain:
+    """
+    Persistent, append-only hash chain stored as segment files.
+
+    - Append is O(1): we only keep the tip (seq, hash) in memory.
+    - Records are fsync'ed in batches (`fsync_every` records) rather than
+      one by one; `flush()` forces a sync, e.g. before sealing a capsule.
+    - Segments roll over at `max_segment_bytes`.
+    - Every `checkpoint_interval` records a checkpoint (seq, file, offset,
+      hash) is appended to `checkpoints.log`.
+    - `verify()` resumes from the last checkpoint that was previously
+      verified (remembered in `verified.json`), so routine verification
+      only rehashes what was appended since.
+    - `verify_range()` streams a byte range of one segment, so any part of
+      the chain can be verified without loading it into memory.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_segment_bytes: int = DEFAULT_MAX_SEGMENT_BYTES,
+        checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL,
+        fsync_every: int = DEFAULT_FSYNC_EVERY,
+    ) -> None:
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self.checkpoint_interval = checkpoint_interval
+        self.fsync_every = fsync_every
+
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        self._file = None
+        self._checkpoints_file = None
+
+        os.makedirs(directory, exist_ok=True)
+        self._recover()
+
+    # ---------- Paths ----------
+
+    def segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"{SEGMENT_PREFIX}{segment:08d}{SEGMENT_SUFFIX}")
+
+    def segments(self) -> List[int]:
+        found = []
+        for name in os.listdir(self.directory):
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX):
+                found.append(int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]))
+        return sorted(found)
+
+    # ---------- Opening / recovery ----------
+
+    def _recover(self) -> None:
+        segments = self.segments()
+        if not segments:
+            self._segment = 0
+            self._offset = 0
+            self._seq = -1
+            self._tip = GENESIS_PREVIOUS_HASH
+            self._open_segment(0)
+            self._open_checkpoints()
+            genesis_event = {
+                "event_id": "GENESIS",
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "event_type": "GENESIS",
+                "details": {},
+            }
+            self.append(genesis_event)
+            self.flush()
+            return
+
+        self._segment = segments[-1]
+        path = self.segment_path(self._segment)
+        last_line, valid_end = self._read_last_record(path)
+        if valid_end != os.path.getsize(path):
+            # Torn write from a crash: drop the partial trailing record.
+            with open(path, "r+b") as f:
+                f.truncate(valid_end)
+
+        tip = self._segment_tip(path, last_line)
+        # Empty last segment: tip lives at the end of the previous one.
+        self._seq, self._tip = tip if tip is not None else self._tip_from_previous(segments[:-1])
+
+        self._offset = valid_end
+        self._open_segment(self._segment)
+        self._open_checkpoints()
+
+    def _truncation(self) -> Optional[VerificationResult]:
+        """
+        Detect records lost from the end of the chain.
+
+        Checkpoints and the verified marker are only ever written for
+        records that reached disk, so one past the recovered tip means
+        whole records (e.g. trailing segments) went missing. They are the
+        only evidence of that, so they are never rewritten to match.
+        """
+        furthest = -1
+        for checkpoint in self.checkpoints():
+            furthest = max(furthest, checkpoint.seq)
+        verified = self._load_verified()
+        if verified is not None:
+            furthest = max(furthest, verified.seq)
+        if furthest <= self._seq:
+            return None
+        return VerificationResult(
+            False, 0, self._seq, self._tip, f"chain truncated at seq {self._seq + 1}"
+        )
+
+    def _tip_from_previous(self, segments: List[int]) -> Tuple[int, str]:
+        for segment in reversed(segments):
+            path = self.segment_path(segment)
+            tip = self._segment_tip(path, self._read_last_record(path)[0])
+            if tip is not None:
+                return tip
+        return -1, GENESIS_PREVIOUS_HASH
+
+    @staticmethod
+    def _parse_tip(line: bytes) -> Optional[Tuple[int, str]]:
+        """(seq, hash) of a record line, or None if it is malformed."""
+        try:
+            seq, _, hash_, _ = line.split(b"\t", 3)
+            return int(seq), hash_.decode("ascii")
+        except (ValueError, UnicodeDecodeError):
+            return None
+
+    def _segment_tip(self, path: str, last_line: Optional[bytes]) -> Optional[Tuple[int, str]]:
+        """
+        (seq, hash) of the last well-formed record in a segment.
+
+        A malformed last line is left in place for `verify` to report; the
+        tip falls back to the record before it (found by a forward scan).
+        """
+        if last_line is None:
+            return None
+        tip = self._parse_tip(last_line)
+        if tip is not None:
+            return tip
+        with open(path, "rb") as f:
+            for raw in f:
+                if raw.endswith(b"\n"):
+                    tip = self._parse_tip(raw[:-1]) or tip
+        return tip
+
+    @staticmethod
+    def _read_last_record(path: str, block: int = 64 * 1024) -> Tuple[Optional[bytes], int]:
+        """Return (last complete line, end offset of that line) reading backwards."""
+        size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            pos = size
+            tail = b""
+            while pos > 0:
+                step = min(block, pos)
+                pos -= step
+                f.seek(pos)
+                tail = f.read(step) + tail
+                end = tail.rfind(b"\n")
+                if end == -1:
+                    continue
+                start = tail.rfind(b"\n", 0, end) + 1
+                if start > 0 or pos == 0:
+                    return tail[start:end], pos + end + 1
+        return None, 0
+
+    def _open_segment(self, segment: int) -> None:
+        if self._file is not None:
+            self._sync()
+            self._file.close()
+        self._segment = segment
+        self._file = open(self.segment_path(segment), "ab")
+        self._offset = self._file.tell()
+
+    def _open_checkpoints(self) -> None:
+        self._checkpoints_file = open(os.path.join(self.directory, CHECKPOINTS_FILE), "a")
+
+    # ---------- Append ----------
+
+    def append(self, event: Dict[str, Any]) -> str:
+        """Append an event; returns its chain hash."""
+        return self.append_json(canonical_event_json(event))
+
+    def append_json(self, event_json: str) -> str:
+        """Append an event that is already canonical JSON."""
+        with self._lock:
+            return self._append_locked(event_json)
+
+    def append_many(self, events: Iterable[Dict[str, Any]]) -> str:
+        """
+        Append a batch of events under one lock acquisition; returns the tip.
+
+        Events are serialised up front with the shared encoder, before the
+        lock is taken, so concurrent appenders only contend on hashing+I/O.
+        """
+        payloads = [canonical_event_json(event) for event in events]
+        with self._lock:
+            for event_json in payloads:
+                self._append_locked(event_json)
+            return self._tip
+
+    def _append_locked(self, event_json: str) -> str:
+        if self._offset >= self.max_segment_bytes:
+            self._open_segment(self._segment + 1)
+
+        seq = self._seq + 1
+        new_hash = hash_event_json(self._tip, event_json)
+        line = f"{seq}\t{self._tip}\t{new_hash}\t{event_json}\n".encode("utf-8")
+
+        self._file.write(line)
+        self._offset += len(line)
+        self._seq = seq
+        self._tip = new_hash
+
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every:
+            self._sync()
+
+        if seq % self.checkpoint_interval == self.checkpoint_interval - 1:
+            # The record must be durable before a checkpoint vouches for it,
+            # or a crash could leave a checkpoint past the recovered tip.
+            self._sync()
+            checkpoint = Checkpoint(seq, self._segment, self._offset, new_hash)
+            self._checkpoints_file.write(checkpoint.to_line())
+            self._checkpoints_file.flush()
+
+        return new_hash
+
+    def _sync(self) -> None:
+        if self._file is None:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def flush(self) -> None:
+        """Force buffered records (and checkpoints) to stable storage."""
+        with self._lock:
+            self._sync()
+            if self._checkpoints_file is not None:
+                self._checkpoints_file.flush()
+                os.fsync(self._checkpoints_file.fileno())
+
+    def close(self) -> None:
+        with self._lock:
+            self._sync()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if self._checkpoints_file is not None:
+                self._checkpoints_file.close()
+                self._checkpoints_file = None
+
+    def __enter__(self) -> "SegmentedHashChain":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    # ---------- Tip / checkpoints ----------
+
+    def __len__(self) -> int:
+        return self._seq + 1
+
+    def get_final_hash(self) -> str:
+        """Current tip hash (for EvidenceCapsule)."""
+        return self._tip
+
+    def checkpoints(self) -> Iterator[Checkpoint]:
+        path = os.path.join(self.directory, CHECKPOINTS_FILE)
+        if not os.path.exists(path):
+            return
+        with open(path, "r") as f:
+            for line in f:
+                if line.endswith("\n"):
+                    yield Checkpoint.from_line(line)
+
+    def _load_verified(self) -> Optional[Checkpoint]:
+        path = os.path.join(self.directory, VERIFIED_FILE)
+        try:
+            with open(path, "r") as f:
+                return Checkpoint(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def _store_verified(self, checkpoint: Checkpoint) -> None:
+        path = os.path.join(self.directory, VERIFIED_FILE)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(checkpoint.__dict__, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    # ---------- Verification ----------
+
+    def verify_range(
+        self,
+        segment: int,
+        start_offset: int = 0,
+        end_offset: Optional[int] = None,
+        expected_prev: Optional[str] = None,
+    ) -> VerificationResult:
+        """Verify records in `segment` between two byte offsets (streaming)."""
+        return verify_segment_range(
+            self.segment_path(segment), start_offset, end_offset, expected_prev
+        )
+
+    def verify(self, full: bool = False) -> VerificationResult:
+        """
+        Verify the chain up to the current tip.
+
+        Resumes from the last previously-verified checkpoint unless `full`
+        is set, and records each checkpoint passed as verified.
+        """
+        self.flush()
+
+        truncated = self._truncation()
+        if truncated is not None:
+            return truncated
+
+        start = None if full else self._load_verified()
+        if start is not None:
+            segment, offset, prev = start.segment, start.offset, start.hash
+        else:
+            segment, offset, prev = 0, 0, GENESIS_PREVIOUS_HASH
+
+        checkpoints = [c for c in self.checkpoints() if start is None or c.seq > start.seq]
+        total = 0
+        last_seq = start.seq if start is not None else -1
+
+        for seg in [s for s in self.segments() if s >= segment]:
+            seg_start = offset if seg == segment else 0
+            seg_checkpoints = [c for c in checkpoints if c.segment == seg]
+            bounds = [c.offset for c in seg_checkpoints] + [None]
+            for cp, end in zip(seg_checkpoints + [None], bounds):
+                result = self.verify_range(seg, seg_start, end, expected_prev=prev)
+                total += result.records
+                if not result.ok:
+                    return VerificationResult(False, total, result.last_seq, result.last_hash, result.error)
+                if result.records:
+                    prev, last_seq = result.last_hash, result.last_seq
+                if cp is not None:
+                    if cp.hash != prev or cp.seq != last_seq:
+                        return VerificationResult(False, total, last_seq, prev, f"checkpoint mismatch at seq {cp.seq}")
+                    self._store_verified(cp)
+                    seg_start = cp.offset
+
+        if last_seq == self._seq and prev != self._tip:
+            return VerificationResult(False, total, last_seq, prev, "tip mismatch")
+        return VerificationResult(True, total, last_seq, prev)
+
+    def verify_parallel(self, max_workers: Optional[int] = None) -> VerificationResult:
+        """
+        Verify the whole chain with a process pool.
+
+        The segments are split at every stored checkpoint (and segment
+        boundary) into independent byte ranges. Each range is rehashed in
+        a worker, which also checks that a range ending at a checkpoint
+        ends on that checkpoint's seq and hash; the parent then checks
+        that consecutive ranges link up
+        (first previous hash == last hash of the range before) and that
+        the chain starts at genesis and ends at the current tip.
+        """
+        self.flush()
+
+        truncated = self._truncation()
+        if truncated is not None:
+            return truncated
+
+        by_segment: Dict[int, List[Checkpoint]] = {}
+        for cp in self.checkpoints():
+            by_segment.setdefault(cp.segment, []).append(cp)
+
+        jobs: List[Tuple[str, int, Optional[int], Optional[Checkpoint]]] = []
+        for seg in self.segments():
+            path = self.segment_path(seg)
+            seg_checkpoints = by_segment.get(seg, [])
+            starts = [0] + [cp.offset for cp in seg_checkpoints]
+            ends: List[Optional[int]] = [cp.offset for cp in seg_checkpoints] + [None]
+            ends_at: List[Optional[Checkpoint]] = list(seg_checkpoints) + [None]
+            jobs.extend(zip([path] * len(starts), starts, ends, ends_at))
+
+        if max_workers == 1 or len(jobs) <= 1:
+            results = [_verify_range_job(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                results = list(pool.map(_verify_range_job, jobs, chunksize=max(1, len(jobs) // 64)))
+
+        prev = GENESIS_PREVIOUS_HASH
+        total = 0
+        last_seq = -1
+        for result in results:
+            if not result.ok:
+                return VerificationResult(False, total + result.records, result.last_seq, result.last_hash, result.error)
+            if result.records == 0:
+                continue
+            if result.first_prev != prev:
+                return VerificationResult(False, total, last_seq, prev, f"broken link at seq {last_seq + 1}")
+            prev, last_seq = result.last_hash, result.last_seq
+            total += result.records
+
+        if last_seq == self._seq and prev != self._tip:
+            return VerificationResult(False, total, last_seq, prev, "tip mismatch")
+        return VerificationResult(True, total, last_seq, prev)
+
+    def iter_events(self) -> Iterator[Tuple[int, str, Dict[str, Any]]]:
+        """Stream (seq, hash, event) for every record, segment by segment."""
+        self.flush()
+        for seg in self.segments():
+            with open(self.segment_path(seg), "rb") as f:
+                for raw in f:
+                    if not raw.endswith(b"\n"):
+                        break
+                    seq, _, hash_, event_json = raw[:-1].split(b"\t", 3)
+                    yield int(seq), hash_.decode("ascii"), json.loads(event_json)
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        with SegmentedHashChain(tmp, checkpoint_interval=1000) as chain:
+            for i in range(10_000):
+                chain.append({"event_type": "HOP_SUCCESS", "details": {"i": i}})
+            print("Tip:", chain.get_final_hash())
+            print("Verify (full):", chain.verify(full=True))
+            print("Verify (incremental):", chain.verify())
+        print(f"Elapsed: {time.perf_counter() - started:.3f}s")
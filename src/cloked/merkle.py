@@ -0,0 +1,162 @@
+# src/cloked/merkle.py
+
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional
+
+from src.cloked.hash_chain import canonical_event_json
+
+
+# RFC 6962 domain separation: leaves and interior nodes never collide.
+LEAF_PREFIX: bytes = b"\x00"
+NODE_PREFIX: bytes = b"\x01"
+
+
+def leaf_hash(data: bytes) -> bytes:
+    return hashlib.sha256(LEAF_PREFIX + data).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+def event_leaf_hash(event: Dict[str, Any], event_json: Optional[str] = None) -> str:
+    """
+    Merkle leaf for a CLOKED event (hex), over its canonical JSON.
+
+    Pass `event_json` if the canonical JSON is already at hand.
+    """
+    if event_json is None:
+        event_json = canonical_event_json(event)
+    return leaf_hash(event_json.encode("utf-8")).hex()
+
+
+def _largest_power_of_two_below(n: int) -> int:
+    return 1 << ((n - 1).bit_length() - 1)
+
+
+@dataclass(frozen=True)
+class InclusionProof:
+    """Audit path proving leaf `leaf_index` is in the tree of `tree_size` leaves."""
+    leaf_index: int
+    tree_size: int
+    path: List[str]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"leaf_index": self.leaf_index, "tree_size": self.tree_size, "path": self.path}
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "InclusionProof":
+        return cls(int(data["leaf_index"]), int(data["tree_size"]), list(data["path"]))
+
+
+class MerkleTree:
+    """
+    Append-only Merkle tree (RFC 6962 / Certificate Transparency shape).
+
+    Every complete, aligned subtree hash is kept in `levels`, so:
+    - append is amortised O(1) (carry up like a binary counter),
+    - the root and any inclusion proof need O(log n) subtree hashes,
+    - proofs can be produced for any earlier tree size too.
+
+    An inclusion proof has O(log n) hashes and is checked with
+    `verify_inclusion` against a published root only — no log access.
+    """
+
+    def __init__(self) -> None:
+        self.levels: List[List[bytes]] = [[]]
+
+    def __len__(self) -> int:
+        return len(self.levels[0])
+
+    def append(self, leaf: str) -> int:
+        """Append a leaf hash (hex); returns its index."""
+        level = 0
+        self.levels[0].append(bytes.fromhex(leaf))
+        while len(self.levels[level]) % 2 == 0:
+            nodes = self.levels[level]
+            if level + 1 == len(self.levels):
+                self.levels.append([])
+            self.levels[level + 1].append(node_hash(nodes[-2], nodes[-1]))
+            level += 1
+        return len(self.levels[0]) - 1
+
+    def _subtree(self, start: int, size: int) -> bytes:
+        if size & (size - 1) == 0 and start % size == 0:
+            height = size.bit_length() - 1
+            return self.levels[height][start >> height]
+        k = _largest_power_of_two_below(size)
+        return node_hash(self._subtree(start, k), self._subtree(start + k, size - k))
+
+    def root(self, tree_size: Optional[int] = None) -> str:
+        """Root hash (hex) of the first `tree_size` leaves (default: all)."""
+        size = len(self) if tree_size is None else tree_size
+        if size == 0:
+            return hashlib.sha256(b"").hexdigest()
+        return self._subtree(0, size).hex()
+
+    def inclusion_proof(self, leaf_index: int, tree_size: Optional[int] = None) -> InclusionProof:
+        size = len(self) if tree_size is None else tree_size
+        if not 0 <= leaf_index < size <= len(self):
+            raise IndexError(f"leaf {leaf_index} not in tree of size {size}")
+
+        path: List[bytes] = []
+        start, n, m = 0, size, leaf_index
+        while n > 1:
+            k = _largest_power_of_two_below(n)
+            if m < k:
+                path.append(self._subtree(start + k, n - k))
+                n = k
+            else:
+                path.append(self._subtree(start, k))
+                start, n, m = start + k, n - k, m - k
+        path.reverse()
+        return InclusionProof(leaf_index, size, [p.hex() for p in path])
+
+
+def verify_inclusion(leaf: str, proof: InclusionProof, root: str) -> bool:
+    """Check an inclusion proof against a root (RFC 9162, section 2.1.3.2)."""
+    if not 0 <= proof.leaf_index < proof.tree_size:
+        return False
+
+    fn, sn = proof.leaf_index, proof.tree_size - 1
+    r = bytes.fromhex(leaf)
+    for p_hex in proof.path:
+        p = bytes.fromhex(p_hex)
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            r = node_hash(p, r)
+            if not fn & 1:
+                while fn and not fn & 1:
+                    fn >>= 1
+                    sn >>= 1
+        else:
+            r = node_hash(r, p)
+        fn >>= 1
+        sn >>= 1
+
+    return sn == 0 and r.hex() == root
+
+
+def verify_capsule(capsule: Mapping[str, Any], published_root: str) -> bool:
+    """
+    Verify an evidence capsule (dict form) against a published Merkle root.
+
+    Every event must carry an inclusion proof, and every proof must check
+    out against `published_root` — no access to the audit log is needed.
+    """
+    if capsule.get("merkle_root") != published_root:
+        return False
+
+    events = capsule.get("events", [])
+    proofs = capsule.get("inclusion_proofs") or []
+    if not events or len(proofs) != len(events):
+        return False
+
+    return all(
+        verify_inclusion(event_leaf_hash(event), InclusionProof.from_dict(proof), published_root)
+        for event, proof in zip(events, proofs)
+    )
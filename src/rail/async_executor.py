@@ -0,0 +1,106 @@
+# src/rail/async_executor.py
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Iterable, List, Optional, Tuple
+
+from src.aiva.liquidity_ledger import LiquidityLedger
+from src.rail.event_sinks import EventSink
+from src.rail.events import CompactRailEvent
+from src.rail.failover import FailoverPlanner
+from src.rail.executor import SEND, RailExecutorCore
+from src.rail.hop_executor import HopTransport
+from src.rail.retry import CircuitBreakerRegistry, RetryPolicy
+from src.rail.state_machine import TransactionContext
+
+
+DEFAULT_MAX_CONCURRENCY: int = 1000
+
+
+class AsyncRailExecutor(RailExecutorCore):
+    """
+    Asyncio-native counterpart of `RailExecutor`.
+
+    Same lifecycle and event stream as the synchronous executor (both run
+    `RailExecutorCore`), but hop attempts (`transport.send_async`) and
+    retry backoff (`asyncio.sleep`) are awaited instead of blocking the
+    process, so one flaky bank only delays the transactions routed
+    through it.
+
+    All per-transaction state lives in a `TransactionContext`, so one
+    instance can run any number of transactions concurrently on a single
+    event loop. `max_concurrency` bounds how many are in flight at once.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        transport: Optional[HopTransport] = None,
+        failover: Optional[FailoverPlanner] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        breakers: Optional[CircuitBreakerRegistry] = None,
+        sink: Optional[EventSink] = None,
+        ledger: Optional[LiquidityLedger] = None,
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
+        super().__init__(transport, failover, retry_policy, breakers, sink, ledger)
+        self.max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    # ---------- Public API ----------
+
+    async def execute_transaction(
+        self, route: List[str], amount: float = 0.0
+    ) -> Tuple[str, List[CompactRailEvent]]:
+        """
+        Execute a transaction along the given route.
+
+        Waits for a concurrency slot first, then behaves exactly like
+        `RailExecutor.execute_transaction`.
+
+        Returns
+        -------
+        Tuple[str, List[CompactRailEvent]]
+            (final_status_string, list_of_events)
+        """
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+
+        async with self._semaphore:
+            ctx = TransactionContext(route, amount=amount)
+            await self._run(ctx)
+            return ctx.state.name, ctx.events
+
+    async def execute_many(
+        self, routes: Iterable[List[str]]
+    ) -> List[Tuple[str, List[CompactRailEvent]]]:
+        """Execute many transactions concurrently; results keep input order."""
+        return list(
+            await asyncio.gather(*(self.execute_transaction(route) for route in routes))
+        )
+
+    async def _run(self, ctx: TransactionContext) -> None:
+        steps = self._steps(ctx)
+        outcome: Any = None
+        try:
+            while True:
+                try:
+                    op, arg = steps.send(outcome)
+                except StopIteration:
+                    return
+                outcome = None
+                if op == SEND:
+                    try:
+                        outcome = await self.transport.send_async(*arg)
+                    except ConnectionError as exc:
+                        outcome = exc
+                else:
+                    await asyncio.sleep(arg)
+        except BaseException as exc:  # includes cancellation
+            self._abort(ctx, steps, exc)
+            raise
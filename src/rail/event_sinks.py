@@ -0,0 +1,296 @@
+# src/rail/event_sinks.py
+
+from __future__ import annotations
+
+import json
+import queue
+import sys
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from enum import Enum
+from typing import IO, TYPE_CHECKING, List, Optional
+
+from src.cloked.auditor import AuditChain
+from src.rail.events import CompactRailEvent
+
+if TYPE_CHECKING:
+    from src.aiva.edge_telemetry import EdgeTelemetry
+
+
+DEFAULT_RING_CAPACITY: int = 10_000
+DEFAULT_QUEUE_SIZE: int = 10_000
+DEFAULT_BATCH_SIZE: int = 256
+DEFAULT_POLL_INTERVAL: float = 0.05
+
+
+class EventSink(ABC):
+    """
+    Destination for Rail events.
+
+    Executors hand every event to `emit` as soon as it is recorded, so
+    `emit` sits on the settlement hot path and must be cheap. Sinks that
+    do real I/O should defer it (see `JsonlFileSink`).
+    """
+
+    @abstractmethod
+    def emit(self, event: CompactRailEvent) -> None:
+        ...
+
+    def flush(self) -> None:
+        """Block until every emitted event has been handled."""
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> "EventSink":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+# ---------- Simple sinks ----------
+
+
+class StdoutSink(EventSink):
+    """One JSON line per event on stdout (the executors' default)."""
+
+    def __init__(self, stream: Optional[IO[str]] = None) -> None:
+        self.stream = stream
+
+    def emit(self, event: CompactRailEvent) -> None:
+        # Resolve sys.stdout late so redirection/capture keeps working.
+        print(json.dumps(event.to_dict(), ensure_ascii=False), file=self.stream or sys.stdout)
+
+
+class NullSink(EventSink):
+    """Discards events; for benchmarks."""
+
+    def emit(self, event: CompactRailEvent) -> None:
+        pass
+
+
+class RingBufferSink(EventSink):
+    """Keeps the last `capacity` events in memory, oldest evicted first."""
+
+    def __init__(self, capacity: int = DEFAULT_RING_CAPACITY) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self._buffer: deque = deque(maxlen=capacity)
+
+    def emit(self, event: CompactRailEvent) -> None:
+        self._buffer.append(event)
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def events(self) -> List[CompactRailEvent]:
+        return list(self._buffer)
+
+    def clear(self) -> None:
+        self._buffer.clear()
+
+
+class AuditChainSink(EventSink):
+    """Hashes every event straight into a CLOKED `AuditChain`."""
+
+    def __init__(self, chain: AuditChain) -> None:
+        self.chain = chain
+        self._lock = threading.Lock()
+
+    def emit(self, event: CompactRailEvent) -> None:
+        data = event.to_dict()
+        with self._lock:
+            self.chain.log_event(data)
+
+
+class TelemetrySink(EventSink):
+    """Feeds hop outcomes into AIVA `EdgeTelemetry` so routing tracks live edge health."""
+
+    def __init__(self, telemetry: "EdgeTelemetry") -> None:
+        self.telemetry = telemetry
+
+    def emit(self, event: CompactRailEvent) -> None:
+        self.telemetry.ingest(event)
+
+
+class FanoutSink(EventSink):
+    """Forwards every event to several sinks, in order."""
+
+    def __init__(self, *sinks: EventSink) -> None:
+        self.sinks = list(sinks)
+
+    def emit(self, event: CompactRailEvent) -> None:
+        for sink in self.sinks:
+            sink.emit(event)
+
+    def flush(self) -> None:
+        for sink in self.sinks:
+            sink.flush()
+
+    def close(self) -> None:
+        for sink in self.sinks:
+            sink.close()
+
+
+# ---------- Background JSON-lines file sink ----------
+
+
+class BackpressurePolicy(Enum):
+    BLOCK = "BLOCK"              # emit waits for room in the queue
+    DROP_NEWEST = "DROP_NEWEST"  # the event being emitted is discarded
+    DROP_OLDEST = "DROP_OLDEST"  # the oldest queued event is discarded
+
+
+_STOP = object()
+
+
+class JsonlFileSink(EventSink):
+    """
+    Appends events to a JSON-lines file from a background thread.
+
+    `emit` only enqueues the event object; serialisation and file writes
+    happen on the writer thread, which drains up to `batch_size` events
+    at a time and writes them with a single call. The queue is bounded by
+    `max_queue`; when it is full, `backpressure` decides whether the
+    producer waits or an event is dropped (`dropped` counts those).
+
+    A batch that fails to serialise or write is counted as dropped and
+    its exception is kept in `error`; the writer carries on with the next
+    batch, and `flush` / `close` raise the error to the caller.
+
+    Parameters
+    ----------
+    path : str
+        File to append to.
+    max_queue : int
+        Maximum number of events waiting to be written.
+    batch_size : int
+        Maximum number of events per write.
+    poll_interval : float
+        How often the idle writer thread wakes up, in seconds.
+    backpressure : BackpressurePolicy
+        What to do when the queue is full.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_queue: int = DEFAULT_QUEUE_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        backpressure: BackpressurePolicy = BackpressurePolicy.BLOCK,
+    ) -> None:
+        if max_queue < 1 or batch_size < 1:
+            raise ValueError("max_queue and batch_size must be >= 1")
+        self.path = path
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.backpressure = backpressure
+        self.dropped = 0
+        self.written = 0
+        self.error: Optional[BaseException] = None  # first failed write, raised by flush / close
+        self._counts_lock = threading.Lock()  # producers and the writer both count drops
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._file = open(path, "a", encoding="utf-8")
+        self._closed = False
+        self._emit_lock = threading.Lock()  # serialises the closed check with close()
+        self._thread = threading.Thread(target=self._writer, name="rail-jsonl-sink", daemon=True)
+        self._thread.start()
+
+    def emit(self, event: CompactRailEvent) -> None:
+        # Held across the enqueue so close() cannot slip _STOP in ahead of
+        # an event that already passed the closed check.
+        with self._emit_lock:
+            if self._closed:
+                raise ValueError("sink is closed")
+            self._enqueue(event)
+
+    def _enqueue(self, event: CompactRailEvent) -> None:
+        if self.backpressure is BackpressurePolicy.BLOCK:
+            self._queue.put(event)
+            return
+
+        try:
+            self._queue.put_nowait(event)
+            return
+        except queue.Full:
+            if self.backpressure is BackpressurePolicy.DROP_NEWEST:
+                self._count_dropped(1)
+                return
+
+        # DROP_OLDEST: make room by discarding the head of the queue.
+        while True:
+            try:
+                head = self._queue.get_nowait()
+                self._queue.task_done()
+                if head is _STOP:
+                    # Never discard the writer's stop signal.
+                    self._queue.put_nowait(_STOP)
+                    raise ValueError("sink is closed")
+                self._count_dropped(1)
+            except queue.Empty:
+                pass
+            try:
+                self._queue.put_nowait(event)
+                return
+            except queue.Full:
+                continue
+
+    def flush(self) -> None:
+        self._queue.join()
+        self._raise_error()
+
+    def close(self) -> None:
+        with self._emit_lock:
+            stopping = not self._closed
+            if stopping:
+                self._closed = True
+                self._queue.put(_STOP)
+        if stopping:
+            self._thread.join()
+            self._file.close()
+        self._raise_error()
+
+    def _raise_error(self) -> None:
+        if self.error is not None:
+            raise self.error
+
+    def _count_dropped(self, n: int) -> None:
+        with self._counts_lock:
+            self.dropped += n
+
+    def _writer(self) -> None:
+        stopping = False
+        while not stopping:
+            try:
+                first = self._queue.get(timeout=self.poll_interval)
+            except queue.Empty:
+                continue
+
+            batch = [first]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stopping = any(ev is _STOP for ev in batch)
+            events = [ev for ev in batch if ev is not _STOP]
+            try:
+                if events:
+                    self._file.write(
+                        "".join(json.dumps(ev.to_dict(), ensure_ascii=False) + "\n" for ev in events)
+                    )
+                    self._file.flush()
+                    with self._counts_lock:
+                        self.written += len(events)
+            except Exception as exc:
+                self._count_dropped(len(events))
+                if self.error is None:
+                    self.error = exc
+            finally:
+                # Always settle the batch, or flush() / close() would hang.
+                for _ in batch:
+                    self._queue.task_done()
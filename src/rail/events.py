@@ -2,11 +2,12 @@
 
 from __future__ import annotations
 
+import time
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from enum import Enum
-from typing import Any, Dict
-from uuid import uuid4
+from typing import Any, Dict, Optional
+from uuid import UUID, uuid4
 
 
 class RailEventType(Enum):
@@ -14,6 +15,7 @@ class RailEventType(Enum):
     HOP_ATTEMPT = "HOP_ATTEMPT"
     HOP_SUCCESS = "HOP_SUCCESS"
     HOP_FAILURE = "HOP_FAILURE"
+    FAILOVER_REROUTE = "FAILOVER_REROUTE"
     TRANSACTION_COMPLETE = "TRANSACTION_COMPLETE"
 
 
@@ -41,3 +43,81 @@ class RailEvent:
             "details": self.details,
         }
 
+
+# ---------- Compact events (Rail hot path) ----------
+
+# Event ids are UUIDs whose low 32 bits are the event's sequence number
+# within its transaction; the upper bits come from one uuid4 per
+# transaction, so ids stay globally unique and valid version-4 UUIDs.
+_SEQ_BITS = 32
+_SEQ_MASK = (1 << _SEQ_BITS) - 1
+
+
+class CompactRailEvent:
+    """
+    Slot-based RailEvent for the executor hot path.
+
+    Stores only integers and references at creation time (transaction
+    prefix, sequence number, wall-clock nanoseconds). The UUID string and
+    ISO-8601 timestamp are only formatted when asked for, e.g. by
+    `to_dict()` when the event is serialised. Exposes the same attributes
+    and `to_dict()` shape as `RailEvent`.
+    """
+
+    __slots__ = ("prefix", "seq", "timestamp_ns", "event_type", "details")
+
+    def __init__(
+        self,
+        prefix: int,
+        seq: int,
+        timestamp_ns: int,
+        event_type: RailEventType,
+        details: Dict[str, Any],
+    ) -> None:
+        self.prefix = prefix
+        self.seq = seq
+        self.timestamp_ns = timestamp_ns
+        self.event_type = event_type
+        self.details = details
+
+    @property
+    def event_id(self) -> str:
+        return str(UUID(int=self.prefix | self.seq))
+
+    @property
+    def timestamp(self) -> str:
+        seconds, nanos = divmod(self.timestamp_ns, 1_000_000_000)
+        dt = datetime.fromtimestamp(seconds, tz=timezone.utc)
+        return dt.replace(microsecond=nanos // 1000).isoformat()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "event_id": self.event_id,
+            "timestamp": self.timestamp,
+            "event_type": self.event_type.name,
+            "details": self.details,
+        }
+
+    def __repr__(self) -> str:
+        return f"CompactRailEvent({self.event_type.name}, seq={self.seq}, details={self.details!r})"
+
+
+class RailEventLog(list):
+    """
+    Transaction-scoped event list that mints `CompactRailEvent`s.
+
+    Each log draws one uuid4 prefix; events get sequential ids from it.
+    """
+
+    def __init__(self, prefix: Optional[int] = None) -> None:
+        super().__init__()
+        if prefix is None:
+            prefix = uuid4().int
+        self.prefix = prefix & ~_SEQ_MASK
+
+    def record(self, event_type: RailEventType, details: Dict[str, Any]) -> CompactRailEvent:
+        event = CompactRailEvent(
+            self.prefix, len(self) & _SEQ_MASK, time.time_ns(), event_type, details or {}
+        )
+        self.append(event)
+        return event
@@ -2,185 +2,409 @@
 
 from __future__ import annotations
 
-import json
 import random
 import time
-from typing import List, Tuple
+from typing import Any, Generator, List, Optional, Set, Tuple
 
-from src.rail.state_machine import TransactionState
-from src.rail.events import RailEvent, RailEventType
+from src.aiva.liquidity_ledger import InsufficientLiquidityError, LiquidityLedger
+from src.rail.state_machine import TransactionContext, TransactionState, can_transition
+from src.rail.event_sinks import EventSink, StdoutSink
+from src.rail.events import CompactRailEvent, RailEventType
+from src.rail.failover import FailoverPlanner
+from src.rail.hop_executor import HopTransport, default_transport
+from src.rail.retry import (
+    DEFAULT_BREAKERS,
+    DEFAULT_MAX_ATTEMPTS,
+    CircuitBreakerRegistry,
+    RetryPolicy,
+)
 
 
-MAX_RETRIES: int = 3  # Story 4.3 – Failover & Retry Logic
+MAX_RETRIES: int = DEFAULT_MAX_ATTEMPTS  # Story 4.3 – Failover & Retry Logic
 
 
-class RailExecutor:
+# ---------- Liquidity reservations ----------
+
+
+def reserve_route_liquidity(
+    ledger: Optional[LiquidityLedger], ctx: TransactionContext, nodes: List[str]
+) -> Optional[str]:
     """
-    Executes a route produced by Aiva across Lupine Rail.
+    Reserve `ctx.amount` at every node in `nodes` not already held.
+
+    All-or-nothing. Returns None on success, or the rejection reason.
+    """
+    if ledger is None or ctx.amount <= 0:
+        return None
+    missing = [node for node in dict.fromkeys(nodes) if node not in ctx.reservations]
+    try:
+        reservations = ledger.reserve_many((node, ctx.amount) for node in missing)
+    except InsufficientLiquidityError as exc:
+        return str(exc)
+    except KeyError as exc:  # node has no ledger account
+        return exc.args[0]
+    for reservation in reservations:
+        ctx.reservations[reservation.node_id] = reservation
+    return None
+
+
+def release_route_liquidity(
+    ledger: Optional[LiquidityLedger], ctx: TransactionContext, keep: Optional[List[str]] = None
+) -> None:
+    """Release every reservation except those at nodes in `keep`."""
+    if ledger is None:
+        return
+    keep_set = set(keep or ())
+    for node in [n for n in ctx.reservations if n not in keep_set]:
+        ledger.release(ctx.reservations.pop(node))
+
+
+def commit_route_liquidity(ledger: Optional[LiquidityLedger], ctx: TransactionContext) -> None:
+    if ledger is None:
+        return
+    for reservation in ctx.reservations.values():
+        ledger.commit(reservation)
+    ctx.reservations.clear()
 
-    Lifecycle (simplified):
-    - Starts at CREATED
-    - (Assume Aiva checks already passed before this call)
-    - Locks liquidity
-    - Moves through hops with retry/failover logic
-    - Ends at SETTLED or FAILED
 
-    All side effects are emitted as structured RailEvent objects.
+# ---------- Shared execution core ----------
+
+# I/O requests yielded by RailExecutorCore._steps; the driver answers a
+# SEND with what the transport returned (reported settlement latency or
+# None) or the ConnectionError it raised.
+SEND = "send"    # argument: (node, attempt)
+SLEEP = "sleep"  # argument: backoff delay in seconds
+
+Step = Tuple[str, Any]
+Steps = Generator[Step, Any, Any]
+
+
+class RailExecutorCore:
     """
+    Transaction lifecycle shared by `RailExecutor` and `AsyncRailExecutor`.
 
-    def __init__(self) -> None:
-        self.state: TransactionState = TransactionState.CREATED
-        self.event_log: List[RailEvent] = []
+    State machine, liquidity reservations, retries, circuit breakers,
+    failover and events all live here, written once as a generator
+    (`_steps`) that performs no I/O itself: it yields `(SEND, (node,
+    attempt))` when a hop attempt is due and `(SLEEP, delay)` for retry
+    backoff, and is resumed with the attempt's outcome. Each executor is
+    then just a driver that performs those two operations, blocking or
+    awaited.
+    """
+
+    def __init__(
+        self,
+        transport: Optional[HopTransport] = None,
+        failover: Optional[FailoverPlanner] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        breakers: Optional[CircuitBreakerRegistry] = None,
+        sink: Optional[EventSink] = None,
+        ledger: Optional[LiquidityLedger] = None,
+    ) -> None:
+        self.transport: HopTransport = transport or default_transport()
+        self.failover = failover
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breakers = breakers if breakers is not None else DEFAULT_BREAKERS
+        self.sink: EventSink = sink if sink is not None else StdoutSink()
+        self.ledger = ledger
+        self._rng = random.Random()
 
     # ---------- Event helper ----------
 
-    def _emit_event(self, event_type: RailEventType, details: dict) -> None:
-        event = RailEvent.create(event_type=event_type, details=details)
-        self.event_log.append(event)
-        # Print structured JSON line (JSON-ready logs) so we can still see it in the terminal
-        print(json.dumps(event.to_dict(), ensure_ascii=False))
+    def _emit_event(self, ctx: TransactionContext, event_type: RailEventType, details: dict) -> None:
+        self.sink.emit(ctx.events.record(event_type, details))
 
     # ---------- Hop execution with retry ----------
 
-    def _execute_hop_with_retries(self, node: str) -> bool:
+    def _hop_steps(
+        self, node: str, ctx: TransactionContext, from_node: Optional[str] = None
+    ) -> Steps:
         """
-        Execute a single hop with retry logic and simulated network failures.
+        Execute a single hop with retry logic.
 
-        Simulated Chaos:
-        - On each attempt, there's a 25% chance of ConnectionError
-          (e.g., "Bank API Offline").
+        Each attempt is a SEND step; the driver reports the ConnectionError
+        (e.g., "Bank API Offline") when the hop fails. Between attempts we
+        back off per `self.retry_policy` (a SLEEP step). If the node's
+        circuit breaker is open the hop fails immediately without an attempt.
 
-        Returns
+        `from_node` (the previous node on the active route, None for the
+        first hop) is recorded on every outcome so edge telemetry can
+        attribute it to a hop-graph edge. Successes carry `latency_ms`, the
+        in-process wall time of the attempt, and, when the transport
+        reports one, `settlement_latency` in hop-graph units (seconds).
+
+        Returns (as the generator's value)
         -------
         bool
-            True if hop eventually succeeded within MAX_RETRIES,
-            False if all retries failed.
+            True if hop eventually succeeded within the retry policy,
+            False if all retries failed (or the circuit is open).
         """
-        for attempt in range(1, MAX_RETRIES + 1):
+        policy = self.retry_policy
+        breaker = self.breakers.get(node)
+        started = time.monotonic()
+
+        for attempt in range(1, policy.max_attempts + 1):
+            if not breaker.allow_request():
+                self._emit_event(
+                    ctx,
+                    RailEventType.HOP_FAILURE,
+                    {
+                        "node_id": node,
+                        "from_node": from_node,
+                        "attempt": attempt,
+                        "max_retries": policy.max_attempts,
+                        "reason": "Circuit open",
+                        "will_retry": False,
+                    },
+                )
+                return False
+
             # Hop attempt event
             self._emit_event(
+                ctx,
                 RailEventType.HOP_ATTEMPT,
                 {
                     "node_id": node,
                     "attempt": attempt,
-                    "max_retries": MAX_RETRIES,
+                    "max_retries": policy.max_attempts,
                 },
             )
 
-            try:
-                # Chaos Monkey: 25% chance of simulated network failure
-                if random.random() < 0.25:
-                    raise ConnectionError("Bank API Offline")
+            sent = time.monotonic()
+            outcome = yield SEND, (node, attempt)
 
-                # Hop succeeded
-                self._emit_event(
-                    RailEventType.HOP_SUCCESS,
-                    {
-                        "node_id": node,
-                        "attempt": attempt,
-                    },
-                )
-                return True
+            if isinstance(outcome, ConnectionError):
+                breaker.record_failure()
+                delay = policy.backoff(attempt, self._rng)
+                will_retry = policy.should_retry(attempt, time.monotonic() - started, delay)
 
-            except ConnectionError as exc:
                 # Failure / retry event
-                will_retry = attempt < MAX_RETRIES
                 self._emit_event(
+                    ctx,
                     RailEventType.HOP_FAILURE,
                     {
                         "node_id": node,
+                        "from_node": from_node,
                         "attempt": attempt,
-                        "max_retries": MAX_RETRIES,
-                        "reason": str(exc),
+                        "max_retries": policy.max_attempts,
+                        "reason": str(outcome),
                         "will_retry": will_retry,
+                        "backoff_seconds": round(delay, 3) if will_retry else 0.0,
                     },
                 )
 
-                if will_retry:
-                    time.sleep(1.0)  # backoff simulation
-                else:
+                if not will_retry:
                     # All retries exhausted
                     return False
+                yield SLEEP, delay
+                continue
+
+            # Hop succeeded
+            breaker.record_success()
+            details = {
+                "node_id": node,
+                "from_node": from_node,
+                "attempt": attempt,
+                "latency_ms": round((time.monotonic() - sent) * 1000.0, 3),
+            }
+            if outcome is not None:
+                details["settlement_latency"] = float(outcome)
+            self._emit_event(ctx, RailEventType.HOP_SUCCESS, details)
+            return True
 
         # Should never hit, but keep for completeness
         return False
 
-    # ---------- Public API ----------
-
-    def execute_transaction(self, route: List[str]) -> Tuple[str, List[RailEvent]]:
-        """
-        Execute a transaction along the given route.
-
-        Parameters
-        ----------
-        route : List[str]
-            Sequence of node identifiers (hops).
+    # ---------- Transaction lifecycle ----------
 
-        Returns
-        -------
-        Tuple[str, List[RailEvent]]
-            (final_status_string, list_of_events)
-        """
-        # Transaction start event
+    def _complete(self, ctx: TransactionContext, state: TransactionState, status: str, **details) -> None:
+        ctx.transition(state)
+        if state is TransactionState.SETTLED:
+            commit_route_liquidity(self.ledger, ctx)
+        else:
+            release_route_liquidity(self.ledger, ctx)
         self._emit_event(
-            RailEventType.TRANSACTION_START,
+            ctx,
+            RailEventType.TRANSACTION_COMPLETE,
             {
-                "route": route,
+                "status": status,
+                "state": ctx.state.name,
+                "code": ctx.state.value,
+                "route": ctx.active_route,
+                **details,
             },
         )
 
+    def _abort(self, ctx: TransactionContext, steps: Steps, exc: BaseException) -> None:
+        """
+        Settle a transaction whose driver hit an unexpected exception.
+
+        Anything but the ConnectionError a SEND reports (a transport bug,
+        a cancelled task, a failing sink) would otherwise leave the
+        transaction IN_FLIGHT with its liquidity still reserved. The
+        driver re-raises `exc` afterwards.
+        """
+        steps.close()
+        if can_transition(ctx.state, TransactionState.FAILED):
+            self._complete(
+                ctx, TransactionState.FAILED, "FAILED", reason=f"Unexpected error: {type(exc).__name__}: {exc}"
+            )
+        else:
+            release_route_liquidity(self.ledger, ctx)
+
+    def _steps(self, ctx: TransactionContext) -> Steps:
+        route = ctx.route
+        # Transaction start event
+        self._emit_event(ctx, RailEventType.TRANSACTION_START, {"route": route})
+
         if not route:
             # No route to execute – treat as rejected/misconfigured.
-            self.state = TransactionState.AIVA_REJECTED
-            self._emit_event(
-                RailEventType.TRANSACTION_COMPLETE,
-                {
-                    "status": "AIVA_REJECTED",
-                    "state": self.state.name,
-                    "code": self.state.value,
-                    "reason": "No route provided",
-                    "route": route,
-                },
-            )
-            return self.state.name, self.event_log
+            self._complete(ctx, TransactionState.AIVA_REJECTED, "AIVA_REJECTED", reason="No route provided")
+            return
 
         # Assume Aiva has already run risk checks before calling Rail.
-        self.state = TransactionState.LIQUIDITY_LOCKED
+        shortfall = reserve_route_liquidity(self.ledger, ctx, route)
+        if shortfall is not None:
+            self._complete(ctx, TransactionState.AIVA_REJECTED, "AIVA_REJECTED", reason=shortfall)
+            return
+
+        ctx.transition(TransactionState.LIQUIDITY_LOCKED)
         self._emit_event(
+            ctx,
             RailEventType.TRANSACTION_START,
             {
                 "status": "LIQUIDITY_LOCKED",
                 "route": route,
+                "reserved": ctx.amount if ctx.reservations else 0.0,
             },
         )
 
-        self.state = TransactionState.IN_FLIGHT
-        for node in route:
-            hop_success = self._execute_hop_with_retries(node)
-            if not hop_success:
+        # Alternates are planned up front so a failover is just a lookup.
+        plan = self.failover.plan(route) if self.failover is not None else None
+
+        ctx.transition(TransactionState.IN_FLIGHT)
+        failed: Set[str] = set()  # nodes already failed over, in this transaction
+        i = 0
+        while i < len(ctx.active_route):
+            node = ctx.active_route[i]
+            from_node = ctx.active_route[i - 1] if i > 0 else None
+            if (yield from self._hop_steps(node, ctx, from_node)):
+                i += 1
+                continue
+
+            alternate = (
+                plan.alternate_for(ctx.active_route[i - 1], node, failed)
+                if plan is not None and i > 0 else None
+            )
+            if alternate is not None and reserve_route_liquidity(self.ledger, ctx, alternate) is not None:
+                alternate = None  # the alternate nodes cannot cover the amount
+            if alternate is None:
                 # Transition to FAILED and stop processing further hops.
-                self.state = TransactionState.FAILED
-                self._emit_event(
-                    RailEventType.TRANSACTION_COMPLETE,
-                    {
-                        "status": "FAILED",
-                        "state": self.state.name,
-                        "code": self.state.value,
-                        "route": route,
-                        "reason": "Network instability / max retries exceeded",
-                    },
+                self._complete(
+                    ctx,
+                    TransactionState.FAILED,
+                    "FAILED",
+                    reason="Network instability / max retries exceeded",
                 )
-                return self.state.name, self.event_log
+                return
 
-        self.state = TransactionState.SETTLED
-        self._emit_event(
-            RailEventType.TRANSACTION_COMPLETE,
-            {
-                "status": "SETTLED",
-                "state": self.state.name,
-                "code": self.state.value,
-                "route": route,
-            },
-        )
+            failed.add(node)
+            ctx.active_route = ctx.active_route[:i] + alternate
+            release_route_liquidity(self.ledger, ctx, keep=ctx.active_route)
+            self._emit_event(
+                ctx,
+                RailEventType.FAILOVER_REROUTE,
+                {
+                    "failed_node": node,
+                    "from_node": ctx.active_route[i - 1],
+                    "alternate": alternate,
+                    "route": ctx.active_route,
+                },
+            )
+
+        self._complete(ctx, TransactionState.SETTLED, "SETTLED")
+
+
+class RailExecutor(RailExecutorCore):
+    """
+    Executes a route produced by Aiva across Lupine Rail.
 
-        return self.state.name, self.event_log
+    Lifecycle (simplified):
+    - Starts at CREATED
+    - (Assume Aiva checks already passed before this call)
+    - Locks liquidity
+    - Moves through hops with retry/failover logic
+    - Ends at SETTLED or FAILED
+
+    Hop attempts go through a pluggable `HopTransport` (see
+    `src.rail.hop_executor`); by default that is pooled connections behind
+    the 25% Chaos Monkey.
+
+    Retries follow a `RetryPolicy` (exponential backoff, full jitter,
+    optional deadline) and every node has a circuit breaker. Breakers live
+    in a registry shared across executor instances, so a node that is
+    failing hard is short-circuited instead of retried by every transaction.
+
+    With a `FailoverPlanner`, a hop that exhausts its retries is rerouted
+    onto a precomputed alternate suffix instead of failing the transaction.
+
+    With a `LiquidityLedger`, LIQUIDITY_LOCKED means what it says: the
+    transaction amount is reserved at every node on the route before the
+    first hop (a shortfall rejects the transaction), moved along on
+    failover, committed on SETTLED and released on FAILED.
+
+    All side effects are emitted as structured RailEvent objects and handed
+    to an `EventSink` (see `src.rail.event_sinks`); the default prints one
+    JSON line per event, as before.
+
+    The executor itself is stateless: each transaction's state, route and
+    events live in a `TransactionContext`, and every state change is
+    checked against `ALLOWED_TRANSITIONS`. One instance can be shared by
+    any number of threads. The lifecycle is `RailExecutorCore`; this class
+    only sends hops with `transport.send` and backs off with `time.sleep`.
+    """
+
+    # ---------- Public API ----------
+
+    def execute_transaction(
+        self, route: List[str], amount: float = 0.0
+    ) -> Tuple[str, List[CompactRailEvent]]:
+        """
+        Execute a transaction along the given route.
+
+        Parameters
+        ----------
+        route : List[str]
+            Sequence of node identifiers (hops).
+        amount : float
+            Amount to reserve at every node (only used with a ledger).
+
+        Returns
+        -------
+        Tuple[str, List[CompactRailEvent]]
+            (final_status_string, list_of_events)
+        """
+        ctx = TransactionContext(route, amount=amount)
+        self._run(ctx)
+        return ctx.state.name, ctx.events
+
+    def _run(self, ctx: TransactionContext) -> None:
+        steps = self._steps(ctx)
+        outcome: Any = None
+        try:
+            while True:
+                try:
+                    op, arg = steps.send(outcome)
+                except StopIteration:
+                    return
+                outcome = None
+                if op == SEND:
+                    try:
+                        outcome = self.transport.send(*arg)
+                    except ConnectionError as exc:
+                        outcome = exc
+                else:
+                    time.sleep(arg)
+        except BaseException as exc:
+            self._abort(ctx, steps, exc)
+            raise
@@ -1 +1,169 @@
+# src/rail/failover.py
 
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from src.aiva.graph_kernel import GraphKernel, hop_graph_kernel
+
+
+DEFAULT_MAX_FAILOVERS: int = 2
+
+
+@dataclass
+class FailoverPlan:
+    """
+    Precomputed alternates for one route.
+
+    `alternates[(failed, last_settled, failed_node)]` is the suffix to
+    continue with (not including `last_settled`) when the hop at
+    `failed_node` exhausts its retries right after `last_settled` settled,
+    and the nodes in `failed` already failed over earlier in the same
+    transaction. Keying on that history keeps each failover branch's
+    alternates apart: a suffix planned for the original route may revisit
+    nodes that have since settled or died on another branch.
+    """
+    route: List[str]
+    alternates: Dict[Tuple[FrozenSet[str], str, str], List[str]] = field(default_factory=dict)
+
+    def alternate_for(
+        self,
+        last_settled: str,
+        failed_node: str,
+        failed: Iterable[str] = (),
+    ) -> Optional[List[str]]:
+        return self.alternates.get((frozenset(failed), last_settled, failed_node))
+
+
+class FailoverPlanner:
+    """
+    Plans failover suffixes for Rail from AIVA's hop graph.
+
+    For every hop of a route we precompute the cheapest way to finish the
+    transaction from the last settled node without the failing node, e.g.
+    SG_CORR_1 → EU_BANK_X fails, continue SG_CORR_1 → SG_CORR_2 → EU_BANK_Y.
+
+    - Alternates may end at any acceptable destination: by default, any
+      node in the same jurisdiction (`country`) as the route's destination.
+    - Alternates never revisit nodes that already settled or failed.
+    - Alternates of alternates are planned too, up to `max_failovers` deep,
+      each keyed by the failures that led to it.
+    - Plans are cached per route, so a failover costs a dict lookup.
+
+    Suffixes are searched on a `GraphKernel` (default: the shared
+    `hop_graph_kernel()`) with `GraphKernel.dijkstra` over its vectorised
+    hop costs; pass an engine's `kernel` to plan against its live weights.
+    """
+
+    def __init__(
+        self,
+        graph: Optional[Any] = None,
+        max_failovers: int = DEFAULT_MAX_FAILOVERS,
+        kernel: Optional[GraphKernel] = None,
+    ) -> None:
+        self.max_failovers = max_failovers
+        self._plans: Dict[Tuple[Tuple[str, ...], FrozenSet[str]], FailoverPlan] = {}
+        if kernel is None:
+            kernel = GraphKernel.from_networkx(graph) if graph is not None else hop_graph_kernel()
+        self._set_kernel(kernel)
+
+    def _set_kernel(self, kernel: GraphKernel) -> None:
+        self.kernel = kernel
+        self._costs = kernel.hop_costs()
+
+    def invalidate(self, kernel: Optional[GraphKernel] = None) -> None:
+        """
+        Drop cached plans (call after the hop graph changes).
+
+        kernel : the updated hop graph, e.g. `engine.kernel` after
+            `engine.update_edge`; plans are then made against it.
+        """
+        if kernel is not None:
+            self._set_kernel(kernel)
+        self._plans.clear()
+
+    def acceptable_destinations(self, destination: str) -> Set[str]:
+        kernel = self.kernel
+        if destination not in kernel:
+            return {destination}
+        country = kernel.node_attr("country", kernel.node_index[destination])
+        if country is None:
+            return {destination}
+        countries = kernel.node_attrs.get("country", ())
+        return {node for node, c in zip(kernel.nodes, countries) if c == country}
+
+    def plan(
+        self,
+        route: List[str],
+        acceptable_destinations: Optional[Iterable[str]] = None,
+    ) -> FailoverPlan:
+        """Return the (cached) failover plan for `route`."""
+        if acceptable_destinations is None:
+            destinations = (
+                frozenset(self.acceptable_destinations(route[-1])) if route else frozenset()
+            )
+        else:
+            destinations = frozenset(acceptable_destinations)
+
+        key = (tuple(route), destinations)
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = FailoverPlan(route=list(route))
+            self._plan_alternates(plan, list(route), destinations, frozenset(), 0)
+            self._plans[key] = plan
+        return plan
+
+    # ---------- Internals ----------
+
+    def _plan_alternates(
+        self,
+        plan: FailoverPlan,
+        route: List[str],
+        destinations: FrozenSet[str],
+        failed: FrozenSet[str],
+        depth: int,
+        start: int = 1,
+    ) -> None:
+        if depth >= self.max_failovers:
+            return
+
+        # Hops before `start` settled before the failure that led here.
+        for i in range(start, len(route)):
+            settled, failed_node = route[i - 1], route[i]
+            key = (failed, settled, failed_node)
+            if key in plan.alternates:
+                continue
+
+            excluded = failed | {failed_node} | set(route[: i - 1])
+            suffix = self._best_suffix(settled, destinations, excluded)
+            if suffix is None:
+                continue
+
+            plan.alternates[key] = suffix
+            self._plan_alternates(
+                plan, route[:i] + suffix, destinations, failed | {failed_node}, depth + 1, i
+            )
+
+    def _best_suffix(
+        self, source: str, destinations: FrozenSet[str], excluded: Set[str]
+    ) -> Optional[List[str]]:
+        kernel = self.kernel
+        if source not in kernel:
+            return None
+
+        ids = kernel.node_index
+        start = ids[source]
+        dist, pred = kernel.dijkstra(
+            start, self._costs, excluded={ids[node] for node in excluded if node in ids}
+        )
+        reachable = [
+            d for d in destinations
+            if d in ids and d != source and d not in excluded and math.isfinite(dist[ids[d]])
+        ]
+        if not reachable:
+            return None
+
+        best = min(reachable, key=lambda d: (dist[ids[d]], d))
+        return kernel.path(pred, start, ids[best])[1:]
@@ -1 +1,230 @@
+# src/rail/hop_executor.py
 
+from __future__ import annotations
+
+import random
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Iterator, Mapping, Optional
+
+
+DEFAULT_FAILURE_RATE: float = 0.25  # Chaos Monkey default (Story 4.3)
+DEFAULT_MAX_IDLE_PER_NODE: int = 8
+
+
+class HopTransport(ABC):
+    """
+    The "network" a hop is sent over.
+
+    `send` performs one hop attempt against an institution node and raises
+    ConnectionError if the node could not be reached. The executors own the
+    retry logic; transports only ever make a single attempt.
+
+    A transport that learns how long the hop took to settle (e.g. from the
+    institution's acknowledgement) returns it in seconds, the unit of the
+    hop graph's `latency`; otherwise it returns None. This is what edge
+    telemetry learns from, not the in-process wall time of the call.
+    """
+
+    @abstractmethod
+    def send(self, node: str, attempt: int) -> Optional[float]:
+        """Perform one hop attempt at `node`. Raise ConnectionError on failure."""
+
+    async def send_async(self, node: str, attempt: int) -> Optional[float]:
+        """Async variant used by `AsyncRailExecutor` (defaults to `send`)."""
+        return self.send(node, attempt)
+
+    def close(self) -> None:
+        """Release any resources held by the transport."""
+
+
+# ---------- Connection pooling ----------
+
+
+class NodeConnection:
+    """
+    Simulated connection to one institution's settlement API.
+
+    Stands in for a real client session (TLS connection, auth token, ...),
+    i.e. the thing that is expensive to set up and worth reusing.
+    """
+
+    def __init__(self, node: str) -> None:
+        self.node = node
+        self.requests_sent = 0
+        self.closed = False
+
+    def send(self, attempt: int) -> None:
+        if self.closed:
+            raise ConnectionError(f"Connection to {self.node} is closed")
+        self.requests_sent += 1
+
+    def close(self) -> None:
+        self.closed = True
+
+
+ConnectionFactory = Callable[[str], NodeConnection]
+
+
+class NodeConnectionPool:
+    """
+    Thread-safe pool of reusable connections to a single node.
+
+    Connections are handed out LIFO (the most recently used one is the
+    most likely to still be warm). At most `max_idle` idle connections are
+    kept; extras, and any connection released as unhealthy, are closed.
+    """
+
+    def __init__(
+        self,
+        node: str,
+        factory: ConnectionFactory = NodeConnection,
+        max_idle: int = DEFAULT_MAX_IDLE_PER_NODE,
+    ) -> None:
+        self.node = node
+        self.max_idle = max_idle
+        self.created = 0
+        self._factory = factory
+        self._idle: Deque[NodeConnection] = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> NodeConnection:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+            self.created += 1
+        return self._factory(self.node)
+
+    def release(self, conn: NodeConnection, healthy: bool = True) -> None:
+        if healthy and not conn.closed:
+            with self._lock:
+                if len(self._idle) < self.max_idle:
+                    self._idle.append(conn)
+                    return
+        conn.close()
+
+    @contextmanager
+    def connection(self) -> Iterator[NodeConnection]:
+        conn = self.acquire()
+        try:
+            yield conn
+        except BaseException:
+            self.release(conn, healthy=False)
+            raise
+        else:
+            self.release(conn)
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, deque()
+        for conn in idle:
+            conn.close()
+
+
+class PooledHopTransport(HopTransport):
+    """
+    Transport that keeps one connection pool per institution node.
+
+    Every attempt borrows a connection from the node's pool instead of
+    setting a new one up; a connection that fails is discarded rather than
+    returned, so the next attempt gets a fresh one.
+    """
+
+    def __init__(
+        self,
+        factory: ConnectionFactory = NodeConnection,
+        max_idle_per_node: int = DEFAULT_MAX_IDLE_PER_NODE,
+    ) -> None:
+        self._factory = factory
+        self._max_idle = max_idle_per_node
+        self._pools: Dict[str, NodeConnectionPool] = {}
+        self._lock = threading.Lock()
+
+    def pool(self, node: str) -> NodeConnectionPool:
+        pool = self._pools.get(node)
+        if pool is None:
+            with self._lock:
+                pool = self._pools.get(node)
+                if pool is None:
+                    pool = NodeConnectionPool(node, self._factory, self._max_idle)
+                    self._pools[node] = pool
+        return pool
+
+    def send(self, node: str, attempt: int) -> Optional[float]:
+        with self.pool(node).connection() as conn:
+            conn.send(attempt)
+        return None
+
+    def connections_created(self) -> Dict[str, int]:
+        """Connections opened so far, per node."""
+        return {node: pool.created for node, pool in self._pools.items()}
+
+    def close(self) -> None:
+        with self._lock:
+            pools = list(self._pools.values())
+        for pool in pools:
+            pool.close()
+
+
+# ---------- Fault injection ----------
+
+
+class FaultInjectionTransport(HopTransport):
+    """
+    Deterministic, seeded fault injection in front of another transport.
+
+    Replaces the inline Chaos Monkey (`random.random() < 0.25`):
+    - Each node gets its own `random.Random`, seeded from (seed, node), so
+      the failure sequence at a node is reproducible regardless of how
+      transactions to other nodes interleave, and global `random` state is
+      never touched.
+    - `node_failure_rates` overrides the default rate per node (e.g. 1.0
+      for a bank that is down).
+    - With `seed=None` the sequence is random, as before.
+
+    Attempts that are not failed are forwarded to `inner` (if any).
+    """
+
+    def __init__(
+        self,
+        inner: Optional[HopTransport] = None,
+        failure_rate: float = DEFAULT_FAILURE_RATE,
+        seed: Optional[int] = None,
+        node_failure_rates: Optional[Mapping[str, float]] = None,
+    ) -> None:
+        self.inner = inner
+        self.failure_rate = failure_rate
+        self.seed = seed
+        self.node_failure_rates: Dict[str, float] = dict(node_failure_rates or {})
+        self._rngs: Dict[str, random.Random] = {}
+        self._lock = threading.Lock()
+
+    def _should_fail(self, node: str) -> bool:
+        rate = self.node_failure_rates.get(node, self.failure_rate)
+        with self._lock:
+            rng = self._rngs.get(node)
+            if rng is None:
+                rng = random.Random(None if self.seed is None else f"{self.seed}:{node}")
+                self._rngs[node] = rng
+            return rng.random() < rate
+
+    def send(self, node: str, attempt: int) -> Optional[float]:
+        if self._should_fail(node):
+            raise ConnectionError("Bank API Offline")
+        return self.inner.send(node, attempt) if self.inner is not None else None
+
+    async def send_async(self, node: str, attempt: int) -> Optional[float]:
+        if self._should_fail(node):
+            raise ConnectionError("Bank API Offline")
+        return await self.inner.send_async(node, attempt) if self.inner is not None else None
+
+    def close(self) -> None:
+        if self.inner is not None:
+            self.inner.close()
+
+
+def default_transport() -> HopTransport:
+    """Pooled connections behind the 25% Chaos Monkey (the Phase 1 "network")."""
+    return FaultInjectionTransport(inner=PooledHopTransport(), failure_rate=DEFAULT_FAILURE_RATE)
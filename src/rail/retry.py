@@ -0,0 +1,185 @@
+# src/rail/retry.py
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, Dict, Optional
+
+
+DEFAULT_MAX_ATTEMPTS: int = 3  # Story 4.3 – Failover & Retry Logic
+
+
+# ---------- Retry policy ----------
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    How a single hop is retried.
+
+    Attributes
+    ----------
+    max_attempts : int
+        Total attempts per hop (first try included).
+    base_delay : float
+        Backoff before the second attempt, in seconds.
+    multiplier : float
+        Exponential growth factor between attempts.
+    max_delay : float
+        Upper bound for any single backoff.
+    jitter : bool
+        Full jitter: sleep a uniform random time in [0, backoff] so that
+        transactions retrying the same node spread out instead of hitting
+        it in lock-step.
+    deadline : Optional[float]
+        Time budget for the whole hop (attempts + backoff), in seconds.
+        A retry whose backoff would overrun the budget is not attempted.
+    """
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS
+    base_delay: float = 1.0
+    multiplier: float = 2.0
+    max_delay: float = 30.0
+    jitter: bool = True
+    deadline: Optional[float] = None
+
+    def __post_init__(self) -> None:
+        if self.max_attempts < 1:
+            raise ValueError("max_attempts must be >= 1")
+        if self.base_delay < 0 or self.max_delay < 0:
+            raise ValueError("delays must be >= 0")
+
+    def backoff(self, attempt: int, rng: Optional[random.Random] = None) -> float:
+        """Delay to wait after failed attempt number `attempt` (1-based)."""
+        ceiling = min(self.max_delay, self.base_delay * self.multiplier ** (attempt - 1))
+        if not self.jitter:
+            return ceiling
+        return (rng or random).uniform(0.0, ceiling)
+
+    def should_retry(self, attempt: int, elapsed: float, delay: float) -> bool:
+        """Whether another attempt fits after `attempt` failed `elapsed` seconds in."""
+        if attempt >= self.max_attempts:
+            return False
+        if self.deadline is not None and elapsed + delay > self.deadline:
+            return False
+        return True
+
+
+# ---------- Circuit breakers ----------
+
+
+class CircuitState(Enum):
+    CLOSED = "CLOSED"        # healthy, requests flow
+    OPEN = "OPEN"            # failing hard, requests short-circuited
+    HALF_OPEN = "HALF_OPEN"  # probing whether the node recovered
+
+
+class CircuitBreaker:
+    """
+    Per-node circuit breaker.
+
+    - CLOSED: counts consecutive failures; at `failure_threshold` → OPEN.
+    - OPEN: every request is refused until `recovery_timeout` has passed,
+      then the breaker moves to HALF_OPEN.
+    - HALF_OPEN: up to `half_open_max_calls` trial requests are let
+      through; a success closes the breaker, a failure re-opens it.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._clock = clock
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _maybe_half_open(self) -> None:
+        if (
+            self._state is CircuitState.OPEN
+            and self._clock() - self._opened_at >= self.recovery_timeout
+        ):
+            self._state = CircuitState.HALF_OPEN
+            self._half_open_calls = 0
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            self._maybe_half_open()
+            if self._state is CircuitState.CLOSED:
+                return True
+            if self._state is CircuitState.HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+                self._half_open_calls += 1
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = CircuitState.CLOSED
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state is CircuitState.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = CircuitState.OPEN
+                self._opened_at = self._clock()
+                self._failures = 0
+
+
+class CircuitBreakerRegistry:
+    """Lazily creates one `CircuitBreaker` per node, shared by all users of the registry."""
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._settings = dict(
+            failure_threshold=failure_threshold,
+            recovery_timeout=recovery_timeout,
+            half_open_max_calls=half_open_max_calls,
+            clock=clock,
+        )
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, node: str) -> CircuitBreaker:
+        breaker = self._breakers.get(node)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(node)
+                if breaker is None:
+                    breaker = CircuitBreaker(**self._settings)
+                    self._breakers[node] = breaker
+        return breaker
+
+    def states(self) -> Dict[str, CircuitState]:
+        return {node: breaker.state for node, breaker in list(self._breakers.items())}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._breakers.clear()
+
+
+# Shared by every executor that is not given its own registry, so a node
+# that is failing hard is short-circuited process-wide.
+DEFAULT_BREAKERS = CircuitBreakerRegistry()
@@ -3,6 +3,9 @@
 from __future__ import annotations
 
 from enum import Enum
+from typing import Any, Dict, FrozenSet, List, Optional
+
+from src.rail.events import RailEventLog
 
 
 class TransactionState(Enum):
@@ -36,3 +39,83 @@ class TransactionState(Enum):
     MOVING = 500
     COMPLETED = 600
     FAILED = 400
+
+
+# ---------- Transition table ----------
+
+# Every legal lifecycle move. FAILED is an alias of AIVA_REJECTED, so a
+# hop failure while IN_FLIGHT lands in the same terminal state as an Aiva
+# rejection. SETTLED and AIVA_REJECTED are terminal.
+ALLOWED_TRANSITIONS: Dict[TransactionState, FrozenSet[TransactionState]] = {
+    TransactionState.CREATED: frozenset(
+        {
+            TransactionState.AIVA_CHECKING,
+            TransactionState.AIVA_REJECTED,
+            TransactionState.LIQUIDITY_LOCKED,
+        }
+    ),
+    TransactionState.AIVA_CHECKING: frozenset(
+        {TransactionState.AIVA_REJECTED, TransactionState.LIQUIDITY_LOCKED}
+    ),
+    TransactionState.LIQUIDITY_LOCKED: frozenset(
+        {TransactionState.IN_FLIGHT, TransactionState.AIVA_REJECTED}
+    ),
+    TransactionState.IN_FLIGHT: frozenset({TransactionState.SETTLED, TransactionState.FAILED}),
+    TransactionState.SETTLED: frozenset(),
+    TransactionState.AIVA_REJECTED: frozenset(),
+}
+
+TERMINAL_STATES: FrozenSet[TransactionState] = frozenset(
+    state for state, targets in ALLOWED_TRANSITIONS.items() if not targets
+)
+
+
+class InvalidTransitionError(ValueError):
+    """Raised when a transaction attempts a move not in `ALLOWED_TRANSITIONS`."""
+
+
+def can_transition(current: TransactionState, new: TransactionState) -> bool:
+    """O(1): one dict lookup plus one frozenset membership test."""
+    return new in ALLOWED_TRANSITIONS.get(current, frozenset())
+
+
+def validate_transition(current: TransactionState, new: TransactionState) -> None:
+    if not can_transition(current, new):
+        raise InvalidTransitionError(f"illegal transition {current.name} -> {new.name}")
+
+
+# ---------- Per-transaction context ----------
+
+
+class TransactionContext:
+    """
+    Everything that belongs to one transaction run.
+
+    Executors keep no per-transaction state of their own; each call to
+    `execute_transaction` creates one of these, so a single executor can
+    be shared across threads and async tasks.
+    """
+
+    __slots__ = ("route", "active_route", "state", "events", "amount", "reservations")
+
+    def __init__(
+        self,
+        route: List[str],
+        events: Optional[RailEventLog] = None,
+        amount: float = 0.0,
+    ) -> None:
+        self.route = route
+        self.active_route = list(route)
+        self.state = TransactionState.CREATED
+        self.events = events if events is not None else RailEventLog()
+        self.amount = amount
+        # node_id -> liquidity Reservation held for this transaction
+        self.reservations: Dict[str, Any] = {}
+
+    def transition(self, new_state: TransactionState) -> None:
+        validate_transition(self.state, new_state)
+        self.state = new_state
+
+    @property
+    def is_terminal(self) -> bool:
+        return self.state in TERMINAL_STATES
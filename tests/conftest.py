@@ -0,0 +1,13 @@
+# tests/conftest.py
+
+from __future__ import annotations
+
+import pytest
+
+from src.cloked.auditor import ClokedLogger
+
+
+@pytest.fixture
+def logger() -> ClokedLogger:
+    """Cloked evidence logger shared by the risk scenarios."""
+    return ClokedLogger()
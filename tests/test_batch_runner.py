@@ -0,0 +1,79 @@
+# tests/test_batch_runner.py
+
+"""
+Walking skeleton batch mode tests.
+"""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from main_skeleton import _percentile, load_transaction_requests, run_batch
+from src.cloked.evidence_capsule import CapsuleStore
+from src.aiva.merge_engine import MergeEngine, RouteRequest
+from src.rail.retry import CircuitBreakerRegistry, RetryPolicy
+
+
+def test_batch_runs_every_request_and_reports_stages(tmp_path) -> None:
+    path = tmp_path / "transactions.jsonl"
+    with open(path, "w") as f:
+        for i in range(40):
+            f.write(json.dumps({"transaction_id": f"TX-{i}", "origin": "AU_BANK_A", "destination": "EU_BANK_X", "amount": 1_000}) + "\n")
+        f.write("\n")
+
+    requests = list(load_transaction_requests(str(path)))
+    assert len(requests) == 40
+    assert requests[0][1].destination == "EU_BANK_X"
+
+    store = CapsuleStore()
+    report = run_batch(
+        iter(requests),
+        workers=4,
+        retry_policy=RetryPolicy(base_delay=0.0),
+        breakers=CircuitBreakerRegistry(),
+        store=store,
+    )
+
+    assert report["transactions"] == 40
+    assert sum(report["states"].values()) == 40
+    assert report["tx_per_second"] > 0
+    assert set(report["stages"]) == {"aiva", "rail", "cloked"}
+    assert all(s["p50_ms"] <= s["p95_ms"] <= s["p99_ms"] for s in report["stages"].values())
+    assert len(store) == 40 and store.get("TX-0")["transaction_id"] == "TX-0"
+    assert report["score_cache"]["hit_rate"] > 0.5  # one corridor, scored once
+
+
+def _requests(n: int):
+    return ((f"TX-{i}", RouteRequest(origin="AU_BANK_A", destination="EU_BANK_X", amount=100)) for i in range(n))
+
+
+def test_batch_chaos_is_opt_in_and_breakers_are_per_batch() -> None:
+    policy = RetryPolicy(base_delay=0.0)
+    assert run_batch(_requests(20), workers=4, retry_policy=policy)["states"] == {"SETTLED": 20}
+
+    chaos = run_batch(_requests(20), workers=4, retry_policy=policy, chaos_failure_rate=1.0, chaos_seed=7)
+    assert "SETTLED" not in chaos["states"]
+
+    # The chaos batch opened circuits, but only in its own registry.
+    assert run_batch(_requests(20), workers=4, retry_policy=policy)["states"] == {"SETTLED": 20}
+
+
+def test_batch_stage_error_stops_the_pipeline() -> None:
+    class BrokenEngine(MergeEngine):
+        def get_best_route(self, origin, destination, request=None):
+            raise RuntimeError("scoring failed")
+
+    with pytest.raises(RuntimeError, match="scoring failed"):
+        run_batch(_requests(200), workers=4, engine=BrokenEngine(), retry_policy=RetryPolicy(base_delay=0.0))
+
+
+def test_percentile_is_nearest_rank() -> None:
+    assert _percentile([1, 2, 3, 4, 5], 50) == 3
+    assert _percentile(list(range(1, 10)), 50) == 5
+    assert _percentile(list(range(1, 11)), 50) == 5
+    assert _percentile(list(range(1, 101)), 95) == 95
+    assert _percentile(list(range(1, 101)), 99) == 99
+    assert _percentile([7], 0) == 7 and _percentile([7], 100) == 7
+    assert _percentile([], 50) == 0.0
@@ -0,0 +1,72 @@
+# tests/test_batch_scoring.py
+
+"""
+Batch scoring must match the scalar AIVA scorers bit for bit.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from src.aiva.compliance_graph import ComplianceContext, ComplianceGraph
+from src.aiva.liquidity_graph import LiquidityContext, LiquidityGraph
+from src.aiva.medical_graph import MedicalGraph
+from src.aiva.volatility_graph import CorridorVolatilityContext, VolatilityGraph
+
+
+def _assert_identical(batch: np.ndarray, scalar: list) -> None:
+    expected = np.array(scalar, dtype=np.float64)
+    assert batch.dtype == np.float64
+    assert batch.tobytes() == expected.tobytes()
+
+
+def test_medical_batch_matches_scalar() -> None:
+    rng = np.random.default_rng(7)
+    n = 5_000
+    payloads = rng.choice(["Heart", "Blood", "Vaccine"], size=n)
+    durations = np.concatenate([rng.uniform(-1.0, 26.0, n - 6), [0.0, 4.0, 6.0, 24.0, np.nan, 3.9995]])
+    temps = np.concatenate([rng.uniform(-15.0, 25.0, n - 6), [2.0, 8.0, 1.99, 18.0, 4.0, np.nan]])
+
+    mg = MedicalGraph()
+    batch = mg.calculate_viability_batch(payloads, durations, temps)
+    scalar = [mg.calculate_viability(p, d, t) for p, d, t in zip(payloads, durations, temps)]
+    _assert_identical(batch, scalar)
+
+
+def test_medical_batch_rejects_unknown_payload() -> None:
+    with pytest.raises(ValueError):
+        MedicalGraph().calculate_viability_batch(["Kidney"], [1.0], [4.0])
+
+
+def test_volatility_batch_matches_scalar() -> None:
+    rng = np.random.default_rng(11)
+    indices = np.concatenate([rng.uniform(-2.0, 12.0, 5_000), [0.0, 5.0, 5.0000001, -0.0, 2.5]])
+
+    vg = VolatilityGraph()
+    batch = vg.get_volatility_score_batch(indices)
+    scalar = [
+        vg.get_volatility_score(CorridorVolatilityContext("AUD-SGD", float(v))) for v in indices
+    ]
+    _assert_identical(batch, scalar)
+
+
+def test_compliance_batch_matches_scalar() -> None:
+    countries = np.array(["Singapore", "North Korea", "High Risk", "Iran", "Australia"] * 100)
+
+    cg = ComplianceGraph()
+    batch = cg.get_compliance_score_batch(countries)
+    scalar = [cg.get_compliance_score(ComplianceContext(str(c), "BEN")) for c in countries]
+    _assert_identical(batch, scalar)
+
+
+def test_liquidity_batch_matches_scalar() -> None:
+    rng = np.random.default_rng(3)
+    n = 5_000
+    nodes = rng.choice(["Bank_Sydney", "Bank_Singapore", "Bank_Unknown"], size=n)
+    amounts = np.concatenate([rng.uniform(-10_000.0, 1_200_000.0, n - 4), [0.0, 40_000.0, 50_000.0, 800_000.0]])
+
+    lg = LiquidityGraph()
+    batch = lg.get_liquidity_score_batch(nodes, amounts)
+    scalar = [lg.get_liquidity_score(LiquidityContext(str(n_), float(a))) for n_, a in zip(nodes, amounts)]
+    _assert_identical(batch, scalar)
@@ -0,0 +1,112 @@
+# tests/test_capsule_stream.py
+
+"""
+Streamed (length-prefixed, optionally compressed) evidence capsule tests.
+"""
+
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from src.cloked.auditor import AuditChain
+from src.cloked.capsule import EvidenceCapsule
+from src.cloked.capsule_stream import (
+    CapsuleFormatError,
+    CapsuleStreamReader,
+    CapsuleStreamWriter,
+    write_capsule,
+)
+from src.cloked.merkle import verify_capsule
+
+
+def _event(i: int) -> dict:
+    return {
+        "event_id": f"EV-{i}",
+        "timestamp": "2025-01-01T00:00:00+00:00",
+        "event_type": "HOP_FAILURE",
+        "details": {"node_id": "SG_CORR_1", "attempt": i % 3 + 1, "reason": "Bank API Offline"},
+    }
+
+
+def _capsule(n: int) -> EvidenceCapsule:
+    events = [_event(i) for i in range(n)]
+    chain = AuditChain()
+    chain.log_events(events)
+    return EvidenceCapsule(
+        capsule_id="CAP-1",
+        transaction_id="TX-1",
+        generated_at="2025-01-01T00:00:00+00:00",
+        schema_version="1.1",
+        events=events,
+        audit_hash=chain.get_final_hash(),
+        merkle_root=chain.merkle_root(),
+        inclusion_proofs=[chain.inclusion_proof(i) for i in range(1, n + 1)],
+    )
+
+
+@pytest.mark.parametrize("compress", [False, True])
+@pytest.mark.parametrize("use_mmap", [False, True])
+def test_round_trip_preserves_capsule(tmp_path, compress, use_mmap) -> None:
+    capsule = _capsule(50)
+    path = str(tmp_path / "capsule.clk")
+    write_capsule(capsule, path, compress=compress)
+
+    with CapsuleStreamReader(path, use_mmap=use_mmap) as reader:
+        assert reader.compressed is compress
+        assert reader.header["transaction_id"] == "TX-1"
+        restored = reader.to_capsule()
+
+    assert restored.to_dict() == capsule.to_dict()
+    assert verify_capsule(restored.to_dict(), capsule.merkle_root)
+
+
+def test_binary_formats_are_smaller_than_pretty_json(tmp_path) -> None:
+    capsule = _capsule(500)
+    json_path = tmp_path / "capsule.json"
+    capsule.save_to_disk(str(json_path))
+    raw, packed = str(tmp_path / "raw.clk"), str(tmp_path / "packed.clk")
+    write_capsule(capsule, raw)
+    write_capsule(capsule, packed, compress=True)
+
+    assert os.path.getsize(raw) < os.path.getsize(json_path)
+    assert os.path.getsize(packed) * 5 < os.path.getsize(raw)
+
+
+def test_unfinished_capsule_still_yields_events(tmp_path) -> None:
+    path = str(tmp_path / "capsule.clk")
+    with CapsuleStreamWriter(path, "CAP-2", "TX-2", compress=True) as writer:
+        for i in range(10):
+            writer.append(_event(i))
+            writer.flush()
+
+    with CapsuleStreamReader(path) as reader:
+        assert [ev["event_id"] for ev in reader] == [f"EV-{i}" for i in range(10)]
+        assert reader.footer() is None
+
+
+@pytest.mark.parametrize("compress", [False, True])
+@pytest.mark.parametrize("use_mmap", [False, True])
+def test_reader_stops_cleanly_at_a_torn_final_frame(tmp_path, compress, use_mmap) -> None:
+    path = str(tmp_path / "capsule.clk")
+    writer = CapsuleStreamWriter(path, "CAP-3", "TX-3", compress=compress)
+    for i in range(5):
+        writer.append(_event(i))
+    complete = os.path.getsize(path)  # every frame is on disk without flush()/close()
+    writer.append(_event(5))
+    writer.close()
+    with open(path, "r+b") as f:
+        f.truncate(complete + 3)  # the process died mid-write
+
+    with CapsuleStreamReader(path, use_mmap=use_mmap) as reader:
+        assert [ev["event_id"] for ev in reader] == [f"EV-{i}" for i in range(5)]
+        assert reader.truncated
+        assert reader.to_capsule().audit_hash is None
+
+
+def test_rejects_non_capsule_files(tmp_path) -> None:
+    path = tmp_path / "capsule.json"
+    path.write_text("{}")
+    with pytest.raises(CapsuleFormatError):
+        CapsuleStreamReader(str(path))
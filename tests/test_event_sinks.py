@@ -0,0 +1,130 @@
+# tests/test_event_sinks.py
+
+"""
+Rail event sink tests.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+
+import pytest
+
+from src.cloked.auditor import AuditChain
+from src.rail.event_sinks import (
+    AuditChainSink,
+    BackpressurePolicy,
+    FanoutSink,
+    JsonlFileSink,
+    RingBufferSink,
+)
+from src.rail.events import RailEventLog, RailEventType
+from src.rail.executor import RailExecutor
+from src.rail.hop_executor import FaultInjectionTransport
+from src.rail.retry import CircuitBreakerRegistry
+
+
+def _events(n: int) -> RailEventLog:
+    log = RailEventLog()
+    for i in range(n):
+        log.record(RailEventType.HOP_ATTEMPT, {"node_id": "A", "attempt": i})
+    return log
+
+
+def test_executor_hands_events_to_sink_without_printing(capsys) -> None:
+    ring = RingBufferSink()
+    executor = RailExecutor(
+        transport=FaultInjectionTransport(failure_rate=0.0),
+        breakers=CircuitBreakerRegistry(),
+        sink=ring,
+    )
+    state, events = executor.execute_transaction(["A", "B"])
+
+    assert state == "SETTLED"
+    assert ring.events() == list(events)
+    assert capsys.readouterr().out == ""
+
+
+def test_ring_buffer_keeps_only_latest_events() -> None:
+    ring = RingBufferSink(capacity=3)
+    for ev in _events(5):
+        ring.emit(ev)
+    assert [ev.details["attempt"] for ev in ring.events()] == [2, 3, 4]
+
+
+def test_jsonl_sink_writes_every_event_in_batches(tmp_path) -> None:
+    path = tmp_path / "events.jsonl"
+    events = _events(1_000)
+    with JsonlFileSink(str(path), batch_size=64) as sink:
+        for ev in events:
+            sink.emit(ev)
+
+    lines = path.read_text().splitlines()
+    assert [json.loads(line) for line in lines] == [ev.to_dict() for ev in events]
+    assert sink.written == 1_000 and sink.dropped == 0
+
+
+def test_jsonl_sink_drops_when_queue_is_full(tmp_path) -> None:
+    sink = JsonlFileSink(str(tmp_path / "events.jsonl"), max_queue=1, backpressure=BackpressurePolicy.DROP_NEWEST)
+    for ev in _events(500):
+        sink.emit(ev)
+    sink.close()
+    assert sink.written + sink.dropped == 500
+    assert sink.dropped > 0
+
+
+def test_jsonl_sink_close_races_drop_oldest_emits(tmp_path) -> None:
+    events = list(_events(200))
+    for round_ in range(20):
+        sink = JsonlFileSink(
+            str(tmp_path / f"events-{round_}.jsonl"), max_queue=2, backpressure=BackpressurePolicy.DROP_OLDEST
+        )
+
+        def produce() -> None:
+            for ev in events:
+                try:
+                    sink.emit(ev)
+                except ValueError:
+                    return
+
+        producers = [threading.Thread(target=produce) for _ in range(4)]
+        for t in producers:
+            t.start()
+        closer = threading.Thread(target=sink.close)
+        closer.start()
+        closer.join(timeout=5)
+        for t in producers:
+            t.join(timeout=5)
+
+        assert not closer.is_alive()  # the stop signal was never dropped
+        assert sink._queue.unfinished_tasks == 0
+        with pytest.raises(ValueError):
+            sink.emit(events[0])
+
+
+def test_audit_chain_sink_links_events_into_chain() -> None:
+    chain, ring = AuditChain(), RingBufferSink()
+    sink = FanoutSink(AuditChainSink(chain), ring)
+    for ev in _events(10):
+        sink.emit(ev)
+
+    assert len(chain.chain) == 11  # genesis + 10
+    assert chain.chain[-1]["event"] == ring.events()[-1].to_dict()
+    assert chain.verify_integrity()
+
+
+def test_jsonl_sink_surfaces_write_errors_without_hanging(tmp_path) -> None:
+    path = tmp_path / "events.jsonl"
+    sink = JsonlFileSink(str(path), batch_size=1)
+    bad = RailEventLog().record(RailEventType.HOP_ATTEMPT, {"node_id": "A", "payload": object()})
+    sink.emit(bad)
+    for ev in _events(3):
+        sink.emit(ev)
+
+    with pytest.raises(TypeError):
+        sink.flush()  # returns instead of blocking on the failed batch
+    assert sink.dropped == 1 and sink.written == 3
+    with pytest.raises(TypeError):
+        sink.close()
+    assert len(path.read_text().splitlines()) == 3
@@ -0,0 +1,70 @@
+# tests/test_evidence_capsule.py
+
+"""
+CLOKED indexed capsule store tests.
+"""
+
+from __future__ import annotations
+
+from src.cloked.evidence_capsule import CapsuleStore
+
+
+NODES = ["AU_BANK_A", "SG_CORR_1", "EU_BANK_X"]
+
+
+def _capsule(i: int) -> dict:
+    day = f"2025-01-{i % 28 + 1:02d}T12:00:00+00:00"
+    events = []
+    for node in NODES:
+        event_type = "HOP_FAILURE" if node == "SG_CORR_1" and i % 2 else "HOP_SUCCESS"
+        events.append(
+            {"event_id": f"EV-{i}-{node}", "timestamp": day, "event_type": event_type, "details": {"node_id": node}}
+        )
+    return {
+        "capsule_id": f"CAP-{i}",
+        "transaction_id": f"TX-{i:03d}",
+        "schema_version": "1.1",
+        "generated_at": day,
+        "audit_hash": "0" * 64,
+        "events": events,
+    }
+
+
+def test_store_indexes_events_by_node_type_and_time(tmp_path) -> None:
+    with CapsuleStore(str(tmp_path / "capsules.db")) as store:
+        assert store.put_many(_capsule(i) for i in range(100)) == 100
+        assert len(store) == 100
+        assert store.get("TX-042") == _capsule(42)
+
+        failures = store.query_events(
+            node_id="SG_CORR_1",
+            event_type="HOP_FAILURE",
+            start="2025-01-01T00:00:00Z",
+            end="2025-01-07T23:59:59Z",
+        )
+        expected = sorted(f"TX-{i:03d}" for i in range(100) if i % 2 and i % 28 < 7)
+        assert sorted(txid for txid, _ in failures) == expected
+        assert all(ev["details"]["node_id"] == "SG_CORR_1" for _, ev in failures)
+
+        assert store.count_events(transaction_id="TX-007") == 3
+        assert store.transactions(event_type="HOP_FAILURE") == [f"TX-{i:03d}" for i in range(1, 100, 2)]
+
+
+def test_put_replaces_earlier_capsule() -> None:
+    store = CapsuleStore()
+    store.put(_capsule(1))
+    updated = _capsule(1)
+    updated["events"] = updated["events"][:1]
+    store.put(updated)
+
+    assert store.count_events(transaction_id="TX-001") == 1
+    assert store.get("TX-001") == updated
+
+
+def test_query_uses_node_type_time_index() -> None:
+    store = CapsuleStore()
+    plan = store._conn.execute(
+        "EXPLAIN QUERY PLAN SELECT body FROM events WHERE node_id = ? AND event_type = ? AND ts >= ?",
+        ("SG_CORR_1", "HOP_FAILURE", 0.0),
+    ).fetchall()
+    assert "events_node_type_ts" in " ".join(str(row) for row in plan)
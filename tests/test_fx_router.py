@@ -0,0 +1,78 @@
+# tests/test_fx_router.py
+
+"""
+FX corridor routing — best-rate multi-leg conversion search.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+
+import networkx as nx
+import pytest
+
+from src.aiva.fx_router import FXRouter, fx_edge_cost
+
+
+def test_edge_cost_is_log_spread_plus_penalties() -> None:
+    assert fx_edge_cost({"spread": 0.0, "stability": 1.0, "liquidity": 1.0}) == 0.0
+    assert fx_edge_cost({"spread": 0.01}) == pytest.approx(-math.log(0.99))
+    assert fx_edge_cost({"spread": 0.01, "stability": 0.5}) > fx_edge_cost({"spread": 0.01})
+    assert fx_edge_cost({"spread": 1.0}) == math.inf
+    assert fx_edge_cost({"spread": 0.01, "liquidity": 0.0}) == math.inf
+
+
+def test_quote_picks_cheapest_multi_leg_path() -> None:
+    router = FXRouter()
+    router.update_corridor("AUD", "SGD", spread=0.001)
+    router.update_corridor("SGD", "EUR", spread=0.001)
+
+    quote = router.quote("AUD", "EUR")
+    assert quote.path == ["AUD", "SGD", "EUR"]
+    assert quote.legs == 2
+    assert quote.rate_factor == pytest.approx(0.999 * 0.999)
+    assert quote.effective_spread == pytest.approx(1 - 0.999 * 0.999)
+
+    assert router.quote("EUR", "AUD") is None
+    assert router.quote("AUD", "XXX") is None
+
+
+def test_update_corridor_reroutes_incrementally() -> None:
+    router = FXRouter()
+    router.update_corridor("AUD", "USD", spread=0.001)
+    router.update_corridor("USD", "EUR", spread=0.001)
+    router.index.precompute()
+    assert router.best_path("AUD", "EUR") == ["AUD", "USD", "EUR"]
+
+    # Widening USD→EUR only affects currencies routing through it.
+    dropped = router.update_corridor("USD", "EUR", spread=0.05)
+    assert dropped == 2  # AUD and USD
+    assert "SGD" in router.index.cached_origins()
+    assert router.best_path("AUD", "EUR") == ["AUD", "SGD", "EUR"]
+
+    router.remove_corridor("SGD", "EUR")
+    assert router.best_path("AUD", "EUR") == ["AUD", "USD", "EUR"]
+
+
+def test_matches_networkx_on_random_corridor_set() -> None:
+    rng = random.Random(3)
+    graph = nx.DiGraph()
+    currencies = [f"C{i:03d}" for i in range(150)]
+    for u in currencies:
+        for v in rng.sample(currencies, 6):
+            if u != v:
+                graph.add_edge(
+                    u, v,
+                    spread=rng.uniform(0.0005, 0.02),
+                    stability=rng.uniform(0.8, 1.0),
+                    liquidity=rng.uniform(0.3, 1.0),
+                )
+    router = FXRouter(graph)
+    for u, v, attrs in graph.edges(data=True):
+        attrs["cost"] = fx_edge_cost(attrs)
+
+    for _ in range(50):
+        source, target = rng.sample(currencies, 2)
+        expected = nx.shortest_path_length(graph, source, target, weight="cost")
+        assert router.quote(source, target).cost == pytest.approx(expected)
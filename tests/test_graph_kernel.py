@@ -0,0 +1,197 @@
+# tests/test_graph_kernel.py
+
+"""
+Array-backed (CSR) graph kernel for AIVA routing.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from src.aiva.fx_router import FXRouter, make_fx_edge_cost
+from src.aiva.graph_kernel import GraphKernel, corridor_graph_kernel, hop_graph_kernel
+from src.aiva.hop_graph import build_hop_graph
+from src.aiva.medical_router import MedicalRouter
+from src.aiva.merge_engine import MergeEngine, RouteEngine, RouteRequest
+from src.aiva.route_index import RouteIndex, hop_edge_cost
+from src.rail.failover import FailoverPlanner
+
+
+def _random_graph(n: int, seed: int) -> nx.DiGraph:
+    rng = random.Random(seed)
+    graph = nx.DiGraph()
+    graph.add_nodes_from((f"N{i}", {"country": rng.choice(["AU", "SG"])}) for i in range(n))
+    for i in range(n):
+        for j in rng.sample(range(n), 4):
+            if i != j:
+                graph.add_edge(
+                    f"N{i}", f"N{j}",
+                    latency=rng.uniform(10, 300),
+                    reliability=rng.choice([0.0, rng.uniform(0.5, 1.0)]),
+                )
+    return graph
+
+
+def test_round_trip_preserves_nodes_edges_and_attributes() -> None:
+    graph = build_hop_graph()
+    kernel = GraphKernel.from_networkx(graph)
+
+    assert kernel.num_nodes == graph.number_of_nodes()
+    assert kernel.num_edges == graph.number_of_edges()
+    assert nx.utils.graphs_equal(kernel.to_networkx(), graph)
+
+    u, v = kernel.node_index["SG_CORR_1"], kernel.node_index["EU_BANK_X"]
+    e = kernel.edge_id(u, v)
+    assert kernel.edge_attr("latency")[e] == 120
+    assert kernel.edge_id(v, u) == -1
+    assert kernel.node_attr("currency", v) == "EUR"
+
+
+def test_arrays_are_read_only_and_kernels_shared() -> None:
+    kernel = hop_graph_kernel()
+    assert hop_graph_kernel() is kernel
+    with pytest.raises(ValueError):
+        kernel.edge_attr("reliability")[0] = 0.0
+    with pytest.raises(ValueError):
+        kernel.indices[0] = 0
+
+
+def test_vectorised_costs_match_scalar_cost_functions() -> None:
+    kernel = GraphKernel.from_networkx(_random_graph(50, 1))
+    graph = kernel.to_networkx()
+    expected = [hop_edge_cost(graph[kernel.nodes[u]][kernel.nodes[v]]) for u, v, _ in kernel.edges()]
+    assert kernel.hop_costs().tolist() == expected
+
+    fx = corridor_graph_kernel()
+    fx_graph = fx.to_networkx()
+    cost_fn = make_fx_edge_cost(0.1, 0.2)
+    assert np.allclose(
+        fx.fx_costs(0.1, 0.2),
+        [cost_fn(fx_graph[fx.nodes[u]][fx.nodes[v]]) for u, v, _ in fx.edges()],
+    )
+
+
+def test_dijkstra_and_route_index_match_networkx() -> None:
+    graph = _random_graph(300, 2)
+    kernel = GraphKernel.from_networkx(graph)
+    index = RouteIndex.from_kernel(kernel, precompute=False)
+    costs = kernel.hop_costs()
+
+    def weight(u, v, attrs):
+        cost = hop_edge_cost(attrs)
+        return cost if math.isfinite(cost) else None
+
+    for source in ("N0", "N7", "N42"):
+        expected = nx.single_source_dijkstra_path_length(graph, source, weight=weight)
+        dist, pred = kernel.dijkstra(kernel.node_index[source], costs)
+        for node, d in expected.items():
+            i = kernel.node_index[node]
+            assert dist[i] == pytest.approx(d)
+            assert index.distance(source, node) == pytest.approx(d)
+            path = kernel.path(pred, kernel.node_index[source], i)
+            assert path[0] == source and path[-1] == node
+        assert np.isinf(dist).sum() == kernel.num_nodes - len(expected)
+
+
+def test_route_engine_uses_shared_kernel_until_mutated() -> None:
+    engine = RouteEngine()
+    assert engine.kernel is hop_graph_kernel()
+    assert engine._graph is None
+    assert engine.get_best_route("AU_BANK_A", "EU_BANK_X") == ["AU_BANK_A", "SG_CORR_1", "EU_BANK_X"]
+
+    engine.update_edge("SG_CORR_1", "EU_BANK_X", reliability=0.0)
+    assert engine.get_best_route("AU_BANK_A", "EU_BANK_X") == []
+    # The shared kernel is untouched; a new engine still routes directly.
+    assert RouteEngine().get_best_route("AU_BANK_A", "EU_BANK_X") == ["AU_BANK_A", "SG_CORR_1", "EU_BANK_X"]
+
+
+def test_reweights_update_one_private_copy_in_place() -> None:
+    shared = hop_graph_kernel()
+    base = shared.edge_values("reliability")[:]
+    engine = RouteEngine()
+    engine.update_edge("SG_CORR_1", "EU_BANK_X", reliability=0.9)
+    private = engine.kernel
+    assert private is not shared
+
+    for reliability in (0.8, 0.7, 0.0):
+        engine.update_edge("SG_CORR_1", "EU_BANK_X", reliability=reliability)
+        assert engine.kernel is private  # no per-update column copies
+    assert engine.edge_attrs("SG_CORR_1", "EU_BANK_X")["reliability"] == 0.0
+    assert engine.get_best_route("AU_BANK_A", "EU_BANK_X") == []
+    assert shared.edge_values("reliability") == base
+    assert not shared.edge_attr("reliability").flags.writeable
+
+    router = FXRouter()
+    router.update_corridor("SGD", "EUR", spread=0.02)
+    corridors = router.kernel
+    router.update_corridor("SGD", "EUR", spread=0.03)
+    assert router.kernel is corridors and corridors is not corridor_graph_kernel()
+    assert router.edge_attrs("SGD", "EUR")["spread"] == 0.03
+    assert FXRouter().edge_attrs("SGD", "EUR")["spread"] != 0.03
+
+
+def test_trees_are_built_lazily_per_origin() -> None:
+    kernel = GraphKernel.from_networkx(_random_graph(1_000, 3))
+    engine = RouteEngine(kernel=kernel)
+    assert engine.index.cached_origins() == []
+
+    engine.get_best_route("N0", "N1")
+    engine.get_best_route("N0", "N2")
+    assert engine.index.cached_origins() == ["N0"]
+
+
+def test_concurrent_updates_never_leave_stale_trees() -> None:
+    kernel = GraphKernel.from_networkx(_random_graph(200, 5))
+    index = RouteIndex.from_kernel(kernel)
+    names = list(kernel.nodes)
+    edges = [(names[u], names[v]) for u, v, _ in kernel.edges()]
+    stop = threading.Event()
+
+    def query(seed: int) -> None:
+        rng = random.Random(seed)
+        while not stop.is_set():
+            index.path(rng.choice(names), rng.choice(names))
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        readers = [pool.submit(query, seed) for seed in range(3)]
+        rng = random.Random(0)
+        for _ in range(300):
+            u, v = rng.choice(edges)
+            index.update_edge(u, v, {"latency": rng.uniform(10, 300), "reliability": 1.0})
+        stop.set()
+        for reader in readers:
+            reader.result()  # re-raises "dictionary changed size" and friends
+
+    fresh = RouteIndex.from_kernel(kernel, index._costs.copy())
+    for origin in index.cached_origins():
+        for target in names[:20]:
+            assert index.distance(origin, target) == fresh.distance(origin, target)
+
+
+def test_routers_share_the_process_wide_kernels() -> None:
+    assert FXRouter().kernel is corridor_graph_kernel()
+    assert MedicalRouter().kernel is hop_graph_kernel()
+    assert FailoverPlanner().kernel is hop_graph_kernel()
+
+
+def test_scoring_reads_the_engines_updated_kernel() -> None:
+    engine = MergeEngine()
+    request = RouteRequest(origin="AU_BANK_A", destination="EU_BANK_X")
+    assert engine.rank_routes(request)[0].scores["hop"] == pytest.approx(0.98 ** 2)
+
+    engine.update_edge("SG_CORR_1", "EU_BANK_X", reliability=0.5)
+    assert engine.rank_routes(request)[0].scores["hop"] == pytest.approx(0.98 * 0.5)
+    assert engine.kernel is not hop_graph_kernel()
+    assert MergeEngine().rank_routes(request)[0].scores["hop"] == pytest.approx(0.98 ** 2)
+
+    # Adding a hop recompiles the engine's kernel; routing and scoring see it.
+    engine.update_edge("AU_BANK_A", "EU_BANK_X", latency=60, reliability=0.99)
+    assert engine.get_best_route("AU_BANK_A", "EU_BANK_X") == ["AU_BANK_A", "EU_BANK_X"]
+    assert engine.rank_routes(request)[0].path == ["AU_BANK_A", "EU_BANK_X"]
@@ -0,0 +1,180 @@
+# tests/test_hash_chain.py
+
+"""
+CLOKED persistent hash chain tests.
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+import os
+
+from src.cloked.auditor import AuditChain
+from src.cloked.hash_chain import SegmentedHashChain, compute_event_hash
+
+
+def _event(i: int) -> dict:
+    return {"event_id": f"EV-{i}", "event_type": "HOP_SUCCESS", "details": {"attempt": i}}
+
+
+def test_chain_hashes_match_audit_chain_scheme(tmp_path) -> None:
+    chain = SegmentedHashChain(str(tmp_path))
+    prev = chain.get_final_hash()
+    new_hash = chain.append(_event(1))
+
+    assert new_hash == compute_event_hash(prev, _event(1))
+    assert AuditChain()._compute_hash(prev, _event(1)) == new_hash
+    chain.close()
+
+
+def test_reopen_recovers_tip_and_drops_torn_record(tmp_path) -> None:
+    with SegmentedHashChain(str(tmp_path), max_segment_bytes=2_000) as chain:
+        for i in range(50):
+            chain.append(_event(i))
+        tip, length = chain.get_final_hash(), len(chain)
+        assert len(chain.segments()) > 1
+
+    # Simulate a crash mid-write.
+    last = max(os.listdir(tmp_path))
+    with open(tmp_path / last, "ab") as f:
+        f.write(b"51\tdeadbeef\tpartial")
+
+    with SegmentedHashChain(str(tmp_path), max_segment_bytes=2_000) as chain:
+        assert chain.get_final_hash() == tip
+        assert len(chain) == length
+        chain.append(_event(51))
+        assert chain.verify(full=True).ok
+
+
+def test_deleted_trailing_segments_fail_verification(tmp_path) -> None:
+    with SegmentedHashChain(str(tmp_path), max_segment_bytes=2_000, checkpoint_interval=5) as chain:
+        for i in range(100):
+            chain.append(_event(i))
+        assert chain.verify().ok
+        segments = chain.segments()
+        assert len(segments) > 2
+
+    for segment in segments[-2:]:
+        os.remove(chain.segment_path(segment))
+    checkpoints_before = open(tmp_path / "checkpoints.log").read()
+
+    with SegmentedHashChain(str(tmp_path), max_segment_bytes=2_000, checkpoint_interval=5) as chain:
+        tip_seq = len(chain) - 1
+        assert tip_seq < 100
+        for result in (chain.verify(full=True), chain.verify(), chain.verify_parallel(max_workers=1)):
+            assert not result.ok
+            assert result.error == f"chain truncated at seq {tip_seq + 1}"
+
+    assert open(tmp_path / "checkpoints.log").read() == checkpoints_before
+
+
+def test_incremental_verification_resumes_from_checkpoint(tmp_path) -> None:
+    with SegmentedHashChain(str(tmp_path), checkpoint_interval=10) as chain:
+        for i in range(95):
+            chain.append(_event(i))
+
+        first = chain.verify()
+        assert first.ok and first.records == 96  # genesis + 95
+
+        for i in range(95, 100):
+            chain.append(_event(i))
+        second = chain.verify()
+        assert second.ok
+        assert second.records == 11  # seq 90..100, after the checkpoint at seq 89
+
+
+def test_tampering_is_detected(tmp_path) -> None:
+    with SegmentedHashChain(str(tmp_path), checkpoint_interval=10) as chain:
+        for i in range(30):
+            chain.append(_event(i))
+        chain.flush()
+
+        path = chain.segment_path(0)
+        data = open(path, "rb").read().replace(b'"attempt":7', b'"attempt":8')
+        open(path, "wb").write(data)
+
+        result = chain.verify(full=True)
+        assert not result.ok
+        assert result.error == "hash mismatch at seq 8"
+
+
+def test_garbage_line_is_reported_not_raised(tmp_path) -> None:
+    with SegmentedHashChain(str(tmp_path), checkpoint_interval=10) as chain:
+        for i in range(30):
+            chain.append(_event(i))
+        tip, length = chain.get_final_hash(), len(chain)
+        path = chain.segment_path(0)
+
+    with open(path, "ab") as f:
+        f.write(b"not a record\n")
+    offset = os.path.getsize(path) - len(b"not a record\n")
+
+    # Recovery keeps the tip at the last well-formed record.
+    with SegmentedHashChain(str(tmp_path), checkpoint_interval=10) as chain:
+        assert chain.get_final_hash() == tip and len(chain) == length
+        for result in (chain.verify(full=True), chain.verify_parallel(max_workers=1)):
+            assert not result.ok
+            assert result.error == f"malformed record at offset {offset}"
+
+
+# ---------- Bulk ingestion & parallel verification ----------
+
+
+def test_log_events_matches_log_event() -> None:
+    events = [_event(i) for i in range(25)]
+    genesis = AuditChain()
+    one_by_one, bulk = copy.deepcopy(genesis), copy.deepcopy(genesis)
+
+    for ev in events:
+        one_by_one.log_event(ev)
+    bulk.log_events(events)
+
+    assert [e["hash"] for e in bulk.chain] == [e["hash"] for e in one_by_one.chain]
+    assert bulk.merkle_root() == one_by_one.merkle_root()
+    assert bulk.verify_integrity()
+
+
+def test_parallel_verification_splits_at_checkpoints(tmp_path) -> None:
+    with SegmentedHashChain(str(tmp_path), max_segment_bytes=20_000, checkpoint_interval=50) as chain:
+        chain.append_many(_event(i) for i in range(1_000))
+        assert len(chain.segments()) > 2
+
+        result = chain.verify_parallel(max_workers=2)
+        assert result.ok
+        assert result.records == 1_001
+        assert result.last_hash == chain.get_final_hash()
+
+        # Break a record in a middle segment.
+        path = chain.segment_path(1)
+        lines = open(path, "rb").read().split(b"\n")
+        lines[3] = lines[3].replace(b"HOP_SUCCESS", b"HOP_FAILURE")
+        open(path, "wb").write(b"\n".join(lines))
+
+        assert not chain.verify_parallel(max_workers=2).ok
+
+
+def test_parallel_verification_checks_checkpoint_hashes(tmp_path) -> None:
+    with SegmentedHashChain(str(tmp_path), checkpoint_interval=10) as chain:
+        chain.append_many(_event(i) for i in range(60))
+        assert chain.verify_parallel(max_workers=1).ok
+
+        # Rewrite every record from seq 5 on with a consistent, relinked chain:
+        # only the stored checkpoints still remember the original hashes.
+        path = chain.segment_path(0)
+        lines = open(path, "rb").read().splitlines()
+        prev = None
+        rewritten = []
+        for line in lines:
+            seq, stored_prev, stored_hash, event_json = line.split(b"\t", 3)
+            if int(seq) >= 5:
+                event_json = event_json.replace(b"HOP_SUCCESS", b"HOP_FAILURE")
+                stored_prev = prev
+                stored_hash = compute_event_hash(prev.decode(), json.loads(event_json)).encode()
+            rewritten.append(b"\t".join((seq, stored_prev, stored_hash, event_json)))
+            prev = stored_hash
+        open(path, "wb").write(b"\n".join(rewritten) + b"\n")
+
+        for result in (chain.verify(full=True), chain.verify_parallel(max_workers=1)):
+            assert not result.ok
+            assert result.error == "checkpoint mismatch at seq 9"
@@ -1 +1,138 @@
+# tests/test_hop_graph.py
 
+"""
+Live hop / corridor edge weights — EWMA telemetry and incremental re-routing.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+import pytest
+
+from src.aiva.edge_telemetry import EdgeTelemetry
+from src.aiva.fx_router import FXRouter
+from src.aiva.merge_engine import RouteEngine
+from src.rail.event_sinks import FanoutSink, RingBufferSink, TelemetrySink
+from src.rail.executor import RailExecutor
+from src.rail.retry import CircuitBreakerRegistry, RetryPolicy
+
+
+class _FlakyTransport:
+    def __init__(self, failing: set, settlement_latency: Optional[float] = None) -> None:
+        self.failing = failing
+        self.settlement_latency = settlement_latency
+
+    def send(self, node: str, attempt: int) -> Optional[float]:
+        if node in self.failing:
+            raise ConnectionError("Bank API Offline")
+        return self.settlement_latency
+
+
+def _engine() -> RouteEngine:
+    engine = RouteEngine()
+    engine.update_edge("AU_BANK_A", "SG_CORR_2", latency=130, reliability=0.98)
+    engine.index.precompute()
+    return engine
+
+
+def test_ewma_tracks_latency_and_reliability() -> None:
+    engine = _engine()
+    telemetry = EdgeTelemetry(engine, alpha=0.5, min_relative_change=0.0)
+
+    telemetry.observe_latency("AU_BANK_A", "SG_CORR_1", 60.0)
+    assert telemetry.estimate("AU_BANK_A", "SG_CORR_1")["latency"] == pytest.approx(90.0)
+    telemetry.observe_outcome("AU_BANK_A", "SG_CORR_1", False)
+    assert telemetry.estimate("AU_BANK_A", "SG_CORR_1")["reliability"] == pytest.approx(0.49)
+    assert engine.graph["AU_BANK_A"]["SG_CORR_1"]["reliability"] == pytest.approx(0.49)
+
+    assert telemetry.observe_latency("AU_BANK_A", "NOWHERE", 1.0) == 0
+    assert telemetry.estimate("AU_BANK_A", "NOWHERE") is None
+
+
+def test_degrading_edge_reroutes_and_only_invalidates_affected_origins() -> None:
+    engine = _engine()
+    telemetry = EdgeTelemetry(engine)
+    assert engine.get_best_route("AU_BANK_A", "EU_BANK_X") == ["AU_BANK_A", "SG_CORR_1", "EU_BANK_X"]
+
+    dropped = telemetry.observe_outcome("AU_BANK_A", "SG_CORR_1", False)
+    assert dropped == 1  # only AU_BANK_A routes through that hop
+    assert set(engine.index.cached_origins()) >= {"SG_CORR_1", "SG_CORR_2", "AU_BANK_B"}
+    assert engine.get_best_route("AU_BANK_A", "EU_BANK_Y") == ["AU_BANK_A", "SG_CORR_2", "EU_BANK_Y"]
+
+
+def test_small_changes_are_batched_until_flush() -> None:
+    engine = _engine()
+    telemetry = EdgeTelemetry(engine, min_relative_change=0.5)
+
+    assert telemetry.observe_latency("SG_CORR_1", "EU_BANK_X", 110.0) == 0
+    assert engine.graph["SG_CORR_1"]["EU_BANK_X"]["latency"] == 120
+    telemetry.flush()
+    assert engine.graph["SG_CORR_1"]["EU_BANK_X"]["latency"] == pytest.approx(118.0)
+
+
+def test_rail_events_feed_telemetry() -> None:
+    engine = _engine()
+    telemetry = EdgeTelemetry(engine, min_relative_change=0.0)
+    invalidated = []
+    telemetry.add_listener(lambda u, v, attrs: invalidated.append((u, v)))
+
+    ring = RingBufferSink()
+    rail = RailExecutor(
+        transport=_FlakyTransport({"EU_BANK_X"}, settlement_latency=60.0),
+        retry_policy=RetryPolicy(base_delay=0.0),
+        breakers=CircuitBreakerRegistry(),
+        sink=FanoutSink(ring, TelemetrySink(telemetry)),
+    )
+    rail.execute_transaction(["AU_BANK_A", "SG_CORR_1", "EU_BANK_X"])
+
+    success = telemetry.estimate("AU_BANK_A", "SG_CORR_1")
+    # EWMA of the graph's 120 s and the reported 60 s settlement latency.
+    assert success["reliability"] > 0.98 and success["latency"] == pytest.approx(108.0)
+    assert telemetry.estimate("SG_CORR_1", "EU_BANK_X")["reliability"] < 0.6
+    assert ("SG_CORR_1", "EU_BANK_X") in invalidated
+    first_hop = [e for e in ring.events() if e.details.get("node_id") == "AU_BANK_A"]
+    assert first_hop and all(e.details.get("from_node") is None for e in first_hop)
+
+
+def test_corridor_telemetry_on_fx_router() -> None:
+    router = FXRouter()
+    router.update_corridor("AUD", "USD", spread=0.001)
+    router.update_corridor("USD", "EUR", spread=0.001)
+    telemetry = EdgeTelemetry(router, alpha=1.0)
+
+    assert router.best_path("AUD", "EUR") == ["AUD", "USD", "EUR"]
+    telemetry.observe("USD", "EUR", "spread", 0.05)
+    assert router.best_path("AUD", "EUR") == ["AUD", "SGD", "EUR"]
+
+
+def test_wall_clock_latency_never_feeds_telemetry() -> None:
+    engine = _engine()
+    telemetry = EdgeTelemetry(engine, min_relative_change=0.0)
+    rail = RailExecutor(
+        transport=_FlakyTransport(set()),  # reports no settlement latency
+        retry_policy=RetryPolicy(base_delay=0.0),
+        breakers=CircuitBreakerRegistry(),
+        sink=TelemetrySink(telemetry),
+    )
+    rail.execute_transaction(["AU_BANK_A", "SG_CORR_1", "EU_BANK_X"])
+    assert telemetry.estimate("AU_BANK_A", "SG_CORR_1")["latency"] == 120
+
+
+def test_circuit_open_failures_name_their_edge() -> None:
+    breakers = CircuitBreakerRegistry()
+    ring = RingBufferSink()
+    rail = RailExecutor(
+        transport=_FlakyTransport({"EU_BANK_X"}),
+        retry_policy=RetryPolicy(base_delay=0.0),
+        breakers=breakers,
+        sink=ring,
+    )
+    for _ in range(5):
+        rail.execute_transaction(["AU_BANK_A", "SG_CORR_1", "EU_BANK_X"])
+
+    (*_, short_circuited) = [
+        e for e in ring.events()
+        if e.event_type.value == "HOP_FAILURE" and e.details["reason"] == "Circuit open"
+    ]
+    assert short_circuited.details["from_node"] == "SG_CORR_1"
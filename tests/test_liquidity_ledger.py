@@ -0,0 +1,108 @@
+# tests/test_liquidity_ledger.py
+
+"""
+Live liquidity ledger tests: reservations, contention, snapshots, Rail wiring.
+"""
+
+from __future__ import annotations
+
+import threading
+
+import numpy as np
+import pytest
+
+from src.aiva.liquidity_graph import LiquidityGraph
+from src.aiva.liquidity_ledger import InsufficientLiquidityError, LiquidityLedger
+from src.rail.event_sinks import NullSink
+from src.rail.executor import RailExecutor
+from src.rail.hop_executor import FaultInjectionTransport
+from src.rail.retry import CircuitBreakerRegistry, RetryPolicy
+
+
+def test_reserve_commit_release() -> None:
+    ledger = LiquidityLedger({"A": 100.0})
+    held = ledger.reserve("A", 60.0)
+    assert ledger.available("A") == 40.0
+
+    with pytest.raises(InsufficientLiquidityError):
+        ledger.reserve("A", 50.0)
+
+    ledger.release(held)
+    assert ledger.available("A") == 100.0
+    ledger.commit(ledger.reserve("A", 30.0))
+    assert (ledger.balance("A"), ledger.reserved("A")) == (70.0, 0.0)
+
+    with pytest.raises(ValueError):
+        ledger.release(held)  # already released
+
+
+def test_reserve_many_is_all_or_nothing() -> None:
+    ledger = LiquidityLedger({"A": 100.0, "B": 10.0})
+    with pytest.raises(InsufficientLiquidityError) as err:
+        ledger.reserve_many([("A", 50.0), ("B", 50.0)])
+    assert err.value.node_id == "B"
+    assert ledger.snapshot() == {"A": 100.0, "B": 10.0}
+
+
+def test_reservations_stay_correct_under_contention() -> None:
+    ledger = LiquidityLedger({"HUB": 1_000.0, "A": 1_000.0, "B": 1_000.0})
+    granted = []
+
+    def worker(spoke: str) -> None:
+        for _ in range(200):
+            try:
+                granted.append(ledger.reserve_many([("HUB", 1.0), (spoke, 1.0)]))
+            except InsufficientLiquidityError:
+                pass
+
+    threads = [threading.Thread(target=worker, args=("AB"[i % 2],)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(granted) == 1_000  # HUB runs out exactly
+    assert ledger.available("HUB") == 0.0
+    snapshot = ledger.snapshot()
+    assert snapshot["A"] + snapshot["B"] == 1_000.0
+
+
+def test_liquidity_graph_scores_against_ledger() -> None:
+    ledger = LiquidityLedger({"A": 1_000.0})
+    graph = LiquidityGraph(ledger=ledger)
+    assert graph.calculate_score("A", 500.0) == 1.0
+
+    ledger.reserve("A", 400.0)
+    assert graph.calculate_score("A", 500.0) == 0.5
+    assert graph.get_liquidity_score_batch(np.array(["A", "A", "Z"]), np.array([100.0, 700.0, 1.0])).tolist() == [
+        1.0,
+        0.0,
+        0.0,
+    ]
+    assert LiquidityGraph(balances={"A": 10.0}).calculate_score("A", 20.0) == 0.0
+
+
+def test_executor_reserves_then_commits_or_releases() -> None:
+    ledger = LiquidityLedger({"A": 1_000.0, "B": 1_000.0, "C": 100.0})
+
+    def executor(failure_rate: float) -> RailExecutor:
+        return RailExecutor(
+            transport=FaultInjectionTransport(failure_rate=failure_rate),
+            retry_policy=RetryPolicy(base_delay=0.0),
+            breakers=CircuitBreakerRegistry(),
+            sink=NullSink(),
+            ledger=ledger,
+        )
+
+    state, _ = executor(0.0).execute_transaction(["A", "B"], amount=300.0)
+    assert state == "SETTLED"
+    assert (ledger.balance("A"), ledger.balance("B")) == (700.0, 700.0)
+
+    state, _ = executor(1.0).execute_transaction(["A", "B"], amount=300.0)
+    assert state == "AIVA_REJECTED"  # FAILED alias
+    assert ledger.available("A") == 700.0 and ledger.reserved("A") == 0.0
+
+    state, events = executor(0.0).execute_transaction(["A", "C"], amount=300.0)
+    assert state == "AIVA_REJECTED"
+    assert "insufficient liquidity at C" in events[-1].details["reason"]
+    assert ledger.available("A") == 700.0
@@ -0,0 +1,97 @@
+# tests/test_medical_graph.py
+
+"""
+MedicalGraph viability tables and runtime payload registration.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from src.aiva.medical_graph import MedicalGraph
+from src.aiva.mock_graphs import MedicalGraph as MockMedicalGraph
+
+
+@pytest.mark.parametrize("payload", ["Heart", "Blood", "Vaccine"])
+@pytest.mark.parametrize("temp", [4.0, -3.5, 12.25])
+def test_table_matches_formula_at_every_second(payload: str, temp: float) -> None:
+    mg = MedicalGraph()
+    table = mg.viability_table(payload, temp)
+    expected = [mg.calculate_viability(payload, s / 3600.0, temp) for s in range(len(table))]
+    assert table.tolist() == expected
+    assert table[-1] == 0.0
+    with pytest.raises(ValueError):
+        table[0] = 0.5
+
+
+def test_lookup_matches_calculate_viability() -> None:
+    mg = MedicalGraph()
+    rng = np.random.default_rng(11)
+    for seconds in np.concatenate([rng.integers(0, 30 * 3600, 500), rng.uniform(0, 30 * 3600, 50)]):
+        seconds = float(seconds)
+        expected = mg.calculate_viability("Heart", seconds / 3600.0, 9.0)
+        assert mg.lookup_viability("Heart", seconds, 9.0) == expected
+
+    nan = float("nan")
+    assert mg.lookup_viability("Heart", 240.0, nan) == mg.calculate_viability("Heart", 240 / 3600.0, nan)
+
+
+def test_tables_share_temperature_factors_within_a_byte_budget() -> None:
+    heart_bytes = (4 * 3600 + 1) * 8
+    mg = MedicalGraph(max_table_bytes=2 * heart_bytes)
+    for temp in (2.0, 4.0, 7.5, 8.0):  # inside the band: one table
+        mg.lookup_viability("Heart", 60.0, temp)
+    for temp in (-20.0, -8.0, 30.0):  # 10+ degrees outside: one table
+        mg.lookup_viability("Heart", 60.0, temp)
+    assert mg.table_bytes == 2 * heart_bytes
+    assert mg.viability_table("Heart", 4.0) is mg.viability_table("Heart", 5.0)
+    assert mg.viability_table("Heart", 4.0).dtype == np.float64
+
+    assert mg.lookup_viability("Heart", 60.0, 9.0) == mg.calculate_viability("Heart", 60 / 3600.0, 9.0)
+    assert mg.table_bytes == 2 * heart_bytes  # least recently used table evicted
+
+    # Vaccine's 24h table alone is over budget: formula only, nothing cached.
+    assert mg.lookup_viability("Vaccine", 7200.0, 4.0) == mg.calculate_viability("Vaccine", 2.0, 4.0)
+    assert mg.viability_table("Vaccine", 4.0).tolist()[7200] == mg.calculate_viability("Vaccine", 2.0, 4.0)
+    assert mg.table_bytes == 2 * heart_bytes
+
+
+def test_concurrent_lookups_keep_the_byte_budget() -> None:
+    heart_bytes = (4 * 3600 + 1) * 8
+    mg = MedicalGraph(max_table_bytes=2 * heart_bytes)
+    temps = [4.0, 9.0, 10.0, 11.0, 12.0, 30.0]  # six factors, room for two
+
+    def worker(offset: int) -> None:
+        for i in range(200):
+            temp = temps[(i + offset) % len(temps)]
+            assert mg.lookup_viability("Heart", 60.0, temp) == mg.calculate_viability("Heart", 60 / 3600.0, temp)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(worker, range(8)))
+    assert mg.table_bytes == 2 * heart_bytes
+    assert mg.table_bytes == sum(table.nbytes for table in mg._tables.values())
+
+
+def test_register_payload_at_runtime() -> None:
+    mg = MedicalGraph()
+    with pytest.raises(ValueError):
+        mg.lookup_viability("Kidney", 3600.0, 4.0)
+
+    mg.register_payload("Kidney", time_limit_hours=36.0, safe_temp_range_c=(4.0, 8.0))
+    assert "Kidney" in mg.payload_types
+    assert mg.lookup_viability("Kidney", 18 * 3600.0, 4.0) == 0.55
+    assert mg.lookup_viability("Kidney", 36 * 3600.0, 4.0) == 0.0
+
+    mg.register_payload("Kidney", time_limit_hours=12.0, safe_temp_range_c=(4.0, 8.0))
+    assert mg.lookup_viability("Kidney", 18 * 3600.0, 4.0) == 0.0
+    assert "Kidney" not in MedicalGraph().payload_types  # per engine, not global
+
+    with pytest.raises(ValueError):
+        mg.register_payload("Bad", time_limit_hours=0.0, safe_temp_range_c=(2.0, 8.0))
+
+
+def test_mock_module_exposes_real_engine() -> None:
+    assert MockMedicalGraph is MedicalGraph
@@ -0,0 +1,84 @@
+# tests/test_medical_router.py
+
+"""
+Time-dependent medical route search with time-limit pruning.
+"""
+
+from __future__ import annotations
+
+import random
+
+import networkx as nx
+import pytest
+
+from src.aiva.medical_graph import MedicalGraph
+from src.aiva.medical_router import MedicalRouter
+
+
+def _cold_chain_graph() -> nx.DiGraph:
+    graph = nx.DiGraph()
+    graph.add_edge("A", "B", latency=1800)                      # fast but warm transfer
+    graph.add_edge("B", "D", latency=1800, temp_celsius=14.0)
+    graph.add_edge("A", "C", latency=2700)                      # slower, refrigerated
+    graph.add_edge("C", "D", latency=2700)
+    graph.add_edge("A", "E", latency=3 * 3600)                  # far too slow for a heart
+    graph.add_edge("E", "D", latency=2 * 3600)
+    return graph
+
+
+def test_prefers_refrigerated_route_over_faster_warm_one() -> None:
+    router = MedicalRouter(_cold_chain_graph())
+    mg = router.medical
+
+    route = router.best_route("A", "D", "Heart", temp_celsius=4.0)
+    assert route.path == ["A", "C", "D"]
+    assert route.duration_hours == pytest.approx(1.5)
+    assert route.worst_temp_celsius == 4.0
+    assert route.viability == mg.calculate_viability("Heart", 1.5, 4.0)
+    assert route.viability > mg.calculate_viability("Heart", 1.0, 14.0)
+
+
+def test_time_limit_prunes_and_unreachable_returns_none() -> None:
+    graph = _cold_chain_graph()
+    graph.remove_edges_from([("A", "C"), ("A", "B")])
+    router = MedicalRouter(graph)
+
+    assert router.best_route("A", "D", "Heart") is None          # 5h > 4h limit
+    route = router.best_route("A", "D", "Blood")                 # 6h limit, still > 5h
+    assert route.path == ["A", "E", "D"]
+    assert router.best_route("D", "A", "Heart") is None
+    with pytest.raises(ValueError):
+        router.best_route("A", "D", "Kidney")
+
+
+def test_matches_brute_force_and_prunes_search() -> None:
+    rng = random.Random(5)
+    graph = nx.DiGraph()
+    for u in range(60):
+        for v in rng.sample(range(60), 5):
+            if u != v:
+                attrs = {"latency": rng.randrange(600, 3 * 3600)}
+                if rng.random() < 0.2:
+                    attrs["temp_celsius"] = rng.uniform(-2.0, 16.0)
+                graph.add_edge(u, v, **attrs)
+    mg = MedicalGraph()
+    router = MedicalRouter(graph, mg)
+    spec = mg.payload_spec("Blood")
+
+    def exposure(path):
+        temps = [graph[u][v].get("temp_celsius", 4.0) for u, v in zip(path, path[1:])] or [4.0]
+        t_min, t_max = spec.safe_temp_range_c
+        return max([4.0] + temps, key=lambda t: max(t_min - t, t - t_max, 0.0))
+
+    for target in (7, 23, 41):
+        best = 0.0
+        for path in nx.all_simple_paths(graph, 0, target, cutoff=5):
+            seconds = sum(graph[u][v]["latency"] for u, v in zip(path, path[1:]))
+            best = max(best, mg.lookup_viability("Blood", seconds, exposure(path)))
+
+        route = router.best_route(0, target, "Blood")
+        if best == 0.0:
+            assert route is None
+        else:
+            assert route.viability == best
+            assert route.labels_expanded < 500
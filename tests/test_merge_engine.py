@@ -1 +1,100 @@
+# tests/test_merge_engine.py
 
+"""
+AIVA routing tests — RouteEngine shortest paths and MergeEngine scoring.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from src.aiva.merge_engine import MergeEngine, RouteEngine, RouteRequest
+
+
+def test_best_route_follows_hop_graph() -> None:
+    engine = RouteEngine()
+
+    assert engine.get_best_route("AU_BANK_A", "EU_BANK_X") == [
+        "AU_BANK_A",
+        "SG_CORR_1",
+        "EU_BANK_X",
+    ]
+    assert engine.get_best_route("AU_BANK_A", "EU_BANK_Y") == [
+        "AU_BANK_A",
+        "SG_CORR_1",
+        "SG_CORR_2",
+        "EU_BANK_Y",
+    ]
+
+
+def test_unknown_or_unreachable_returns_empty_route() -> None:
+    engine = RouteEngine()
+
+    assert engine.get_best_route("NodeA", "NodeB") == []
+    assert engine.get_best_route("EU_BANK_X", "AU_BANK_A") == []
+
+
+def test_update_edge_reroutes_and_only_invalidates_affected_origins() -> None:
+    engine = RouteEngine()
+    engine.graph.add_edge("AU_BANK_B", "SG_CORR_1", latency=120, reliability=0.98)
+    engine.index.update_edge("AU_BANK_B", "SG_CORR_1", engine.graph["AU_BANK_B"]["SG_CORR_1"])
+    engine.index.precompute()
+
+    # Degrade the direct SG_CORR_1 → EU_BANK_X hop: only origins whose
+    # tree uses it (AU_BANK_A, AU_BANK_B, SG_CORR_1) should be dropped.
+    dropped = engine.update_edge("SG_CORR_1", "EU_BANK_X", reliability=0.0)
+    assert dropped == 3
+    assert "SG_CORR_2" in engine.index.cached_origins()
+
+    assert engine.get_best_route("AU_BANK_A", "EU_BANK_X") == []
+
+    # Restore it and the route comes back.
+    engine.update_edge("SG_CORR_1", "EU_BANK_X", reliability=0.98)
+    assert engine.get_best_route("AU_BANK_A", "EU_BANK_X") == [
+        "AU_BANK_A",
+        "SG_CORR_1",
+        "EU_BANK_X",
+    ]
+
+
+# ---------- MergeEngine ----------
+
+
+def test_merge_engine_ranks_routes_by_composite_score() -> None:
+    engine = MergeEngine()
+    request = RouteRequest(origin="AU_BANK_A", destination="EU_BANK_Y", amount=100_000.0)
+
+    ranked = engine.rank_routes(request, k=3)
+
+    assert [r.path for r in ranked] == [["AU_BANK_A", "SG_CORR_1", "SG_CORR_2", "EU_BANK_Y"]]
+    assert ranked[0].scores["hop"] == pytest.approx(0.98 ** 3)
+    assert ranked[0].composite_score == pytest.approx(0.98 ** 3)
+
+
+def test_merge_engine_prunes_hard_rejects() -> None:
+    engine = MergeEngine()
+
+    # SG_CORR_1 only holds 750k: a 1M transfer cannot route through it.
+    big = RouteRequest(origin="AU_BANK_A", destination="EU_BANK_X", amount=1_000_000.0)
+    assert engine.rank_routes(big) == []
+
+    # FX crash on AUD-SGD rejects the only corridor out of Australia.
+    crash = RouteRequest(
+        origin="AU_BANK_B",
+        destination="EU_BANK_Y",
+        volatility_indices={"AUD-SGD": 8.5},
+    )
+    assert engine.get_best_route("AU_BANK_B", "EU_BANK_Y", request=crash) == []
+
+
+def test_merge_engine_medical_viability_uses_cumulative_transit_time() -> None:
+    engine = MergeEngine()
+    request = RouteRequest(origin="AU_BANK_A", destination="EU_BANK_X", payload_type="Heart")
+
+    (route,) = engine.rank_routes(request, k=1)
+    assert route.total_latency == 240
+    assert route.scores["medical"] == engine.medical.calculate_viability("Heart", 240 / 3600.0, 4.0)
+
+    # Make one hop slower than a heart can survive.
+    engine.update_edge("SG_CORR_1", "EU_BANK_X", latency=5 * 3600)
+    assert engine.rank_routes(request) == []
@@ -0,0 +1,73 @@
+# tests/test_merkle.py
+
+"""
+CLOKED Merkle tree tests — roots, inclusion proofs and capsule verification.
+"""
+
+from __future__ import annotations
+
+import copy
+
+from src.cloked.auditor import AuditChain
+from src.cloked.capsule import EvidenceCapsule
+from src.cloked.merkle import (
+    MerkleTree,
+    leaf_hash,
+    node_hash,
+    verify_capsule,
+    verify_inclusion,
+)
+
+
+def _reference_root(leaves):
+    """Straight RFC 6962 MTH, for comparison."""
+    if len(leaves) == 1:
+        return leaves[0]
+    k = 1 << ((len(leaves) - 1).bit_length() - 1)
+    return node_hash(_reference_root(leaves[:k]), _reference_root(leaves[k:]))
+
+
+def test_roots_and_proofs_for_every_size() -> None:
+    leaves = [leaf_hash(str(i).encode()) for i in range(40)]
+    tree = MerkleTree()
+    for leaf in leaves:
+        tree.append(leaf.hex())
+
+    for size in range(1, 41):
+        root = tree.root(size)
+        assert root == _reference_root(leaves[:size]).hex()
+        for index in range(size):
+            proof = tree.inclusion_proof(index, size)
+            assert len(proof.path) <= size.bit_length()
+            assert verify_inclusion(leaves[index].hex(), proof, root)
+
+    proof = tree.inclusion_proof(5)
+    assert not verify_inclusion(leaves[6].hex(), proof, tree.root())
+
+
+def test_capsule_verifies_against_published_root_only() -> None:
+    chain = AuditChain()
+    events = [
+        {"event_id": f"EV-{i}", "event_type": "HOP_SUCCESS", "details": {"node_id": "SG_CORR_1"}}
+        for i in range(7)
+    ]
+    for ev in events:
+        chain.log_event(ev)
+
+    capsule = EvidenceCapsule(
+        capsule_id="CAP-1",
+        transaction_id="TX-1",
+        generated_at="2026-01-01T00:00:00Z",
+        schema_version="1.1",
+        events=events,
+        audit_hash=chain.get_final_hash(),
+        merkle_root=chain.merkle_root(),
+        inclusion_proofs=[chain.inclusion_proof(i) for i in range(1, len(events) + 1)],
+    ).to_dict()
+
+    published_root = chain.merkle_root()
+    assert verify_capsule(capsule, published_root)
+
+    tampered = copy.deepcopy(capsule)
+    tampered["events"][3]["event_type"] = "TAMPERED_DATA"
+    assert not verify_capsule(tampered, published_root)
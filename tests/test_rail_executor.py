@@ -0,0 +1,367 @@
+# tests/test_rail_executor.py
+
+"""
+Lupine Rail executor tests (sync + asyncio executors).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from uuid import UUID
+
+import networkx as nx
+import pytest
+
+from src.aiva.liquidity_ledger import LiquidityLedger
+from src.rail.async_executor import AsyncRailExecutor
+from src.rail.event_sinks import NullSink, RingBufferSink
+from src.rail.events import RailEventLog, RailEventType
+from src.rail.executor import RailExecutor
+from src.rail.failover import FailoverPlanner
+from src.rail.hop_executor import (
+    FaultInjectionTransport,
+    HopTransport,
+    NodeConnection,
+    PooledHopTransport,
+)
+from src.rail.retry import CircuitBreakerRegistry, CircuitState, RetryPolicy
+from src.rail.state_machine import (
+    InvalidTransitionError,
+    TransactionContext,
+    TransactionState,
+    can_transition,
+)
+
+
+class _FlakyTransport(HopTransport):
+    """Fails every attempt at BAD_NODE, tracks peak concurrency."""
+
+    BAD_NODE = "SG_CORR_2"
+
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.peak = 0
+
+    def send(self, node: str, attempt: int) -> None:
+        raise NotImplementedError
+
+    async def send_async(self, node: str, attempt: int) -> None:
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(0.001)
+            if node == self.BAD_NODE:
+                raise ConnectionError("Bank API Offline")
+        finally:
+            self.in_flight -= 1
+
+
+def test_async_executor_runs_transactions_concurrently(capsys) -> None:
+    transport = _FlakyTransport()
+    executor = AsyncRailExecutor(
+        max_concurrency=500,
+        transport=transport,
+        retry_policy=RetryPolicy(base_delay=0.05, jitter=False),
+        breakers=CircuitBreakerRegistry(failure_threshold=10**9),
+    )
+    good = ["AU_BANK_A", "SG_CORR_1", "EU_BANK_X"]
+    bad = ["AU_BANK_B", "SG_CORR_2", "EU_BANK_Y"]
+    routes = [good, bad] * 1000
+
+    started = time.perf_counter()
+    results = asyncio.run(executor.execute_many(routes))
+    elapsed = time.perf_counter() - started
+    capsys.readouterr()
+
+    assert [status for status, _ in results] == ["SETTLED", "AIVA_REJECTED"] * 1000
+    # Two backoffs per failing transaction, overlapped instead of serialised.
+    assert elapsed < 5.0
+    assert transport.peak <= 500
+
+    _, bad_events = results[1]
+    failures = [e for e in bad_events if e.event_type is RailEventType.HOP_FAILURE]
+    assert [e.details["will_retry"] for e in failures] == [True, True, False]
+
+
+def test_async_executor_respects_concurrency_limit(capsys) -> None:
+    transport = _FlakyTransport()
+    executor = AsyncRailExecutor(
+        max_concurrency=3, transport=transport, retry_policy=RetryPolicy(base_delay=0.0)
+    )
+    asyncio.run(executor.execute_many([["AU_BANK_A", "SG_CORR_1"]] * 20))
+    capsys.readouterr()
+
+    assert transport.peak <= 3
+
+
+def test_sync_and_async_executors_share_one_lifecycle(capsys) -> None:
+    def run(executor_cls):
+        executor = executor_cls(
+            transport=FaultInjectionTransport(failure_rate=0.4, seed=7),
+            failover=FailoverPlanner(),
+            retry_policy=RetryPolicy(base_delay=0.0),
+            breakers=CircuitBreakerRegistry(),
+            sink=NullSink(),
+        )
+        results = []
+        for route in (["AU_BANK_A", "SG_CORR_1", "EU_BANK_X"], ["AU_BANK_B", "SG_CORR_2", "EU_BANK_Y"]) * 5:
+            outcome = executor.execute_transaction(route)
+            status, events = asyncio.run(outcome) if asyncio.iscoroutine(outcome) else outcome
+            results.append((status, [
+                (e.event_type, {k: v for k, v in e.details.items() if k != "latency_ms"})
+                for e in events
+            ]))
+        return results
+
+    assert run(RailExecutor) == run(AsyncRailExecutor)
+    capsys.readouterr()
+
+
+class _BrokenTransport(HopTransport):
+    """Raises something other than ConnectionError on the second hop."""
+
+    def send(self, node: str, attempt: int) -> None:
+        if node == "B":
+            raise RuntimeError("transport bug")
+
+    async def send_async(self, node: str, attempt: int) -> None:
+        self.send(node, attempt)
+
+
+def test_unexpected_transport_error_fails_and_releases_liquidity() -> None:
+    for executor_cls in (RailExecutor, AsyncRailExecutor):
+        ledger = LiquidityLedger({"A": 100.0, "B": 100.0, "C": 100.0})
+        ring = RingBufferSink()
+        executor = executor_cls(
+            transport=_BrokenTransport(), breakers=CircuitBreakerRegistry(), sink=ring, ledger=ledger
+        )
+        with pytest.raises(RuntimeError, match="transport bug"):
+            outcome = executor.execute_transaction(["A", "B", "C"], amount=40.0)
+            if asyncio.iscoroutine(outcome):
+                asyncio.run(outcome)
+
+        last = ring.events()[-1]
+        assert last.event_type is RailEventType.TRANSACTION_COMPLETE
+        assert last.details["status"] == "FAILED"
+        assert "RuntimeError: transport bug" in last.details["reason"]
+        assert ledger.snapshot() == {"A": 100.0, "B": 100.0, "C": 100.0}
+
+
+# ---------- Events ----------
+
+
+def test_event_log_mints_sequential_ids_lazily() -> None:
+    log = RailEventLog()
+    first = log.record(RailEventType.HOP_ATTEMPT, {"node_id": "A"})
+    second = log.record(RailEventType.HOP_SUCCESS, {"node_id": "A"})
+    other = RailEventLog().record(RailEventType.HOP_ATTEMPT, {})
+
+    assert not hasattr(first, "__dict__")
+    assert (first.seq, second.seq) == (0, 1)
+    assert UUID(second.event_id).int - UUID(first.event_id).int == 1
+    assert UUID(first.event_id).version == 4
+    assert first.event_id != other.event_id
+
+    data = second.to_dict()
+    assert set(data) == {"event_id", "timestamp", "event_type", "details"}
+    assert data["event_type"] == "HOP_SUCCESS"
+    assert datetime.fromisoformat(data["timestamp"]) >= datetime.fromisoformat(first.timestamp)
+
+
+# ---------- State machine & shared executor ----------
+
+
+def test_transition_table_allows_only_lifecycle_moves() -> None:
+    assert can_transition(TransactionState.CREATED, TransactionState.LIQUIDITY_LOCKED)
+    assert can_transition(TransactionState.IN_FLIGHT, TransactionState.FAILED)
+    assert not can_transition(TransactionState.SETTLED, TransactionState.IN_FLIGHT)
+    assert not can_transition(TransactionState.CREATED, TransactionState.SETTLED)
+
+    ctx = TransactionContext(["A"])
+    ctx.transition(TransactionState.LIQUIDITY_LOCKED)
+    with pytest.raises(InvalidTransitionError):
+        ctx.transition(TransactionState.SETTLED)
+    assert ctx.state is TransactionState.LIQUIDITY_LOCKED
+
+
+def test_one_executor_is_shared_across_threads() -> None:
+    executor = RailExecutor(
+        transport=FaultInjectionTransport(failure_rate=0.0),
+        breakers=CircuitBreakerRegistry(),
+        sink=NullSink(),
+    )
+    routes = [[f"N{i}", f"N{i + 1}"] for i in range(50)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(executor.execute_transaction, routes))
+
+    for route, (state, events) in zip(routes, results):
+        assert state == "SETTLED"
+        assert len(events) == 7
+        assert events[-1].details["route"] == route
+    assert not hasattr(executor, "event_log")
+
+
+# ---------- Hop transports ----------
+
+
+def test_fault_injection_is_deterministic_per_seed() -> None:
+    def outcomes(seed: int):
+        transport = FaultInjectionTransport(seed=seed, failure_rate=0.5)
+        result = []
+        for node in ["AU_BANK_A", "SG_CORR_1"] * 50:
+            try:
+                transport.send(node, 1)
+                result.append(True)
+            except ConnectionError:
+                result.append(False)
+        return result
+
+    assert outcomes(42) == outcomes(42)
+    assert outcomes(42) != outcomes(43)
+
+
+def test_pooled_transport_reuses_connections_per_node() -> None:
+    transport = PooledHopTransport()
+    for _ in range(100):
+        transport.send("AU_BANK_A", 1)
+        transport.send("SG_CORR_1", 1)
+
+    assert transport.connections_created() == {"AU_BANK_A": 1, "SG_CORR_1": 1}
+
+
+def test_rail_executor_sends_hops_through_transport(capsys) -> None:
+    pooled = PooledHopTransport(factory=NodeConnection)
+    executor = RailExecutor(transport=FaultInjectionTransport(inner=pooled, failure_rate=0.0))
+
+    status, events = executor.execute_transaction(["AU_BANK_A", "SG_CORR_1", "EU_BANK_X"])
+    capsys.readouterr()
+
+    assert status == "SETTLED"
+    assert not any(e.event_type is RailEventType.HOP_FAILURE for e in events)
+    assert pooled.connections_created() == {"AU_BANK_A": 1, "SG_CORR_1": 1, "EU_BANK_X": 1}
+
+
+# ---------- Failover ----------
+
+
+def test_failover_plan_precomputes_alternate_suffixes() -> None:
+    plan = FailoverPlanner().plan(["AU_BANK_A", "SG_CORR_1", "EU_BANK_X"])
+
+    # EU_BANK_X down: finish via the other EU bank from the last settled node.
+    assert plan.alternate_for("SG_CORR_1", "EU_BANK_X") == ["SG_CORR_2", "EU_BANK_Y"]
+    # SG_CORR_1 down: AU_BANK_A has no other way out.
+    assert plan.alternate_for("AU_BANK_A", "SG_CORR_1") is None
+
+
+def _diamond_graph():
+    """A → B → C → D, with a detour A → E → C and two ways from C to F."""
+    graph = nx.DiGraph()
+    for node in "ABCEG":
+        graph.add_node(node, country="Transit")
+    graph.add_node("D", country="Destination")
+    graph.add_node("F", country="Destination")
+    for u, v, latency in [
+        ("A", "B", 1), ("B", "C", 1), ("C", "D", 1), ("A", "E", 2), ("E", "C", 2),
+        ("C", "E", 1), ("E", "F", 10), ("C", "G", 8), ("G", "F", 8),
+    ]:
+        graph.add_edge(u, v, latency=latency, reliability=1.0)
+    return graph
+
+
+def test_second_failover_never_reenters_failed_or_settled_nodes(capsys) -> None:
+    planner = FailoverPlanner(_diamond_graph())
+    plan = planner.plan(["A", "B", "C", "D"])
+
+    # B fails: detour through E, which then settles.
+    assert plan.alternate_for("A", "B") == ["E", "C", "D"]
+    # D fails on the original route: cheapest way on is back through E ...
+    assert plan.alternate_for("C", "D") == ["E", "F"]
+    # ... but after the detour E has settled, so the second failover avoids it.
+    assert plan.alternate_for("C", "D", failed={"B"}) == ["G", "F"]
+
+    transport = FaultInjectionTransport(failure_rate=0.0, node_failure_rates={"B": 1.0, "D": 1.0})
+    executor = RailExecutor(
+        transport=transport,
+        failover=planner,
+        retry_policy=RetryPolicy(base_delay=0.0),
+        breakers=CircuitBreakerRegistry(),
+        sink=NullSink(),
+    )
+    status, events = executor.execute_transaction(["A", "B", "C", "D"])
+    capsys.readouterr()
+
+    assert status == "SETTLED"
+    assert [e.details["alternate"] for e in events if e.event_type is RailEventType.FAILOVER_REROUTE] == [
+        ["E", "C", "D"], ["G", "F"],
+    ]
+    settled = [e.details["node_id"] for e in events if e.event_type is RailEventType.HOP_SUCCESS]
+    assert settled == ["A", "E", "C", "G", "F"]
+
+
+def test_async_executor_fails_over_instead_of_failing(capsys) -> None:
+    transport = FaultInjectionTransport(failure_rate=0.0, node_failure_rates={"EU_BANK_X": 1.0})
+    executor = AsyncRailExecutor(
+        transport=transport,
+        failover=FailoverPlanner(),
+        retry_policy=RetryPolicy(base_delay=0.0),
+        breakers=CircuitBreakerRegistry(),
+    )
+
+    status, events = asyncio.run(
+        executor.execute_transaction(["AU_BANK_A", "SG_CORR_1", "EU_BANK_X"])
+    )
+    capsys.readouterr()
+
+    assert status == "SETTLED"
+    (reroute,) = [e for e in events if e.event_type is RailEventType.FAILOVER_REROUTE]
+    assert reroute.details["route"] == ["AU_BANK_A", "SG_CORR_1", "SG_CORR_2", "EU_BANK_Y"]
+    assert events[-1].details["route"] == reroute.details["route"]
+
+
+# ---------- Retry policy & circuit breakers ----------
+
+
+def test_retry_policy_backoff_is_exponential_jittered_and_bounded() -> None:
+    policy = RetryPolicy(max_attempts=5, base_delay=1.0, multiplier=2.0, max_delay=5.0, jitter=False)
+    assert [policy.backoff(a) for a in range(1, 5)] == [1.0, 2.0, 4.0, 5.0]
+
+    jittered = RetryPolicy(base_delay=1.0)
+    assert all(0.0 <= jittered.backoff(3) <= 4.0 for _ in range(100))
+
+    budget = RetryPolicy(max_attempts=5, deadline=2.0)
+    assert budget.should_retry(1, elapsed=0.5, delay=1.0)
+    assert not budget.should_retry(1, elapsed=1.5, delay=1.0)
+    assert not budget.should_retry(5, elapsed=0.0, delay=0.0)
+
+
+def test_circuit_breaker_is_shared_across_executors(capsys) -> None:
+    now = [0.0]
+    breakers = CircuitBreakerRegistry(failure_threshold=3, recovery_timeout=10.0, clock=lambda: now[0])
+    transport = FaultInjectionTransport(failure_rate=0.0, node_failure_rates={"SG_CORR_1": 1.0})
+    policy = RetryPolicy(base_delay=0.0)
+
+    def run():
+        executor = RailExecutor(transport=transport, retry_policy=policy, breakers=breakers)
+        return executor.execute_transaction(["AU_BANK_A", "SG_CORR_1", "EU_BANK_X"])
+
+    run()
+    assert breakers.get("SG_CORR_1").state is CircuitState.OPEN
+
+    # A second executor short-circuits without touching the node.
+    _, events = run()
+    capsys.readouterr()
+    attempts = [e for e in events if e.event_type is RailEventType.HOP_ATTEMPT]
+    assert [e.details["node_id"] for e in attempts] == ["AU_BANK_A"]
+    assert events[-2].details["reason"] == "Circuit open"
+
+    # After the recovery timeout a single probe is let through.
+    now[0] = 11.0
+    assert breakers.get("SG_CORR_1").state is CircuitState.HALF_OPEN
+    transport.node_failure_rates["SG_CORR_1"] = 0.0
+    status, _ = run()
+    capsys.readouterr()
+    assert status == "SETTLED"
+    assert breakers.get("SG_CORR_1").state is CircuitState.CLOSED
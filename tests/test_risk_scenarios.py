@@ -292,7 +292,7 @@ def test_scenario_f_resilience(logger: ClokedLogger) -> None:
     rail_executor: RailExecutor = RailExecutor()
 
     # Ask Aiva for a simple route
-    route: List[str] = route_engine.get_best_route("NodeA", "NodeB")
+    route: List[str] = route_engine.get_best_route("AU_BANK_A", "EU_BANK_X")
     print(f"AIVA (for Scenario F) selected route: {route}")
 
     print(">>> RAIL: Liquidity locked for route:", route)
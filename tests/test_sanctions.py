@@ -0,0 +1,172 @@
+# tests/test_sanctions.py
+
+"""
+Sanctions screening index tests.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+
+import numpy as np
+import pytest
+
+from src.aiva.compliance_graph import ComplianceContext, ComplianceGraph
+from src.aiva.merge_engine import MergeEngine, RouteRequest
+from src.aiva.sanctions import SanctionsIndex, SanctionsScreener, normalise_name
+
+
+def _write_lists(tmp_path, entities: str) -> SanctionsScreener:
+    (tmp_path / "entities.csv").write_text("entity_id,name,aliases\n" + entities)
+    (tmp_path / "countries.csv").write_text(
+        "country,status\nNorth Korea,sanctioned\nIran,sanctioned\nHigh Risk,high_risk\n"
+    )
+    return SanctionsScreener(str(tmp_path / "entities.csv"), str(tmp_path / "countries.csv"))
+
+
+def test_name_normalisation_and_fuzzy_matching() -> None:
+    assert normalise_name("Kim, Jong-Un") == normalise_name("jong un KIM")
+
+    index = SanctionsIndex(["SDN-1"], [("SDN-1", "Ivan Petrovich Sidorov"), ("SDN-2", "Acme Trading LLC")])
+    assert [m.entity_id for m in index.match_name("SIDOROV, Ivan Petrovich")] == ["SDN-1"]
+
+    (fuzzy,) = index.match_name("Ivan Petrovich Sidorof")
+    assert (fuzzy.entity_id, fuzzy.distance) == ("SDN-1", 1)
+    assert index.match_name("Jane Citizen") == []
+
+
+def test_typos_that_reorder_sorted_tokens_still_match() -> None:
+    index = SanctionsIndex(["SDN-1", "SDN-2"], [("SDN-1", "Kim Jong Un"), ("SDN-2", "Viktor Bout")])
+    for name, listed in (("Kim Zong Un", "SDN-1"), ("Viktor Zout", "SDN-2")):
+        (match,) = index.match_name(name)
+        assert (match.entity_id, match.distance) == (listed, 1)
+        assert index.screen(beneficiary_name=name).score == 0.5
+    assert index.match_name("Kim Zong Zan") == []  # three edits: over the budget of two
+
+
+def test_compliance_graph_screens_ids_names_and_countries(tmp_path) -> None:
+    screener = _write_lists(tmp_path, "SDN-1,Ivan Petrovich Sidorov,Ivan Sidorov\n")
+    graph = ComplianceGraph(screener)
+
+    assert graph.calculate_score("Singapore", "BEN-1") == 1.0
+    assert graph.calculate_score("Singapore", "SDN-1") == 0.0
+    assert graph.calculate_score("north korea", "BEN-1") == 0.0
+    assert graph.calculate_score("High Risk", "BEN-1") == 0.5
+    assert graph.calculate_score("Singapore", "BEN-1", "Sidorov Ivan") == 0.0
+    assert graph.calculate_score("Singapore", "BEN-1", "Ivan Petrovich Sidorof") == 0.5
+
+    countries = np.array(["Singapore", "Iran", "Australia", "Singapore"] * 50)
+    ids = np.array(["BEN-1", "BEN-2", "SDN-1", "BEN-3"] * 50)
+    names = np.array(["Jane Citizen", "", "", "Ivan Sidorof"] * 50)
+    batch = graph.get_compliance_score_batch(countries, ids, names)
+    scalar = [
+        graph.get_compliance_score(ComplianceContext(str(c), str(i), str(n)))
+        for c, i, n in zip(countries, ids, names)
+    ]
+    assert batch.tolist() == scalar
+
+    # Blank ids are rejected at load; an index that still holds one must
+    # not flag rows without a beneficiary id in either path.
+    blank = ComplianceGraph(SanctionsScreener(index=SanctionsIndex(["", "SDN-1"], [])))
+    ids = np.array(["", "SDN-1", "BEN-1"])
+    scalar = [blank.get_compliance_score(ComplianceContext("Singapore", str(i))) for i in ids]
+    assert scalar == [1.0, 0.0, 1.0]
+    assert blank.get_compliance_score_batch(np.array(["Singapore"] * 3), ids).tolist() == scalar
+
+    (tmp_path / "entities.csv").write_text("entity_id,name,aliases\n,Nobody,\n")
+    with pytest.raises(ValueError, match="entity_id"):
+        SanctionsIndex.from_files(str(tmp_path / "entities.csv"))
+
+
+def test_hot_reload_swaps_index_without_blocking(tmp_path) -> None:
+    screener = _write_lists(tmp_path, "SDN-1,Ivan Sidorov,\n")
+    before = screener.index
+    assert not screener.reload_if_changed()
+
+    (tmp_path / "entities.csv").write_text("entity_id,name,aliases\nSDN-9,Acme Trading LLC,\n")
+    stamp = time.time() + 5
+    os.utime(tmp_path / "entities.csv", (stamp, stamp))
+
+    assert screener.reload_if_changed()
+    assert screener.index is not before
+    assert screener.screen(beneficiary_id="SDN-9").score == 0.0
+    assert before.screen(beneficiary_id="SDN-9").score == 1.0  # old index untouched
+
+
+def test_merge_engine_rejects_sanctioned_beneficiary_name(tmp_path) -> None:
+    engine = MergeEngine(compliance=ComplianceGraph(_write_lists(tmp_path, "SDN-1,Ivan Sidorov,\n")))
+    clean = RouteRequest(origin="AU_BANK_A", destination="EU_BANK_X", beneficiary_name="Jane Citizen")
+    listed = RouteRequest(origin="AU_BANK_A", destination="EU_BANK_X", beneficiary_name="SIDOROV, Ivan")
+
+    assert engine.rank_routes(clean)
+    assert engine.rank_routes(listed) == []
+
+
+def test_builtin_countries_survive_entity_only_lists_and_reloads(tmp_path) -> None:
+    (tmp_path / "entities.csv").write_text("entity_id,name,aliases\nSDN-1,Ivan Sidorov,\n")
+    graph = ComplianceGraph(SanctionsScreener(str(tmp_path / "entities.csv")))
+    assert graph.calculate_score("North Korea", "BEN-1") == 0.0
+    assert graph.calculate_score("Iran", "BEN-1") == 0.0
+    assert graph.calculate_score("High Risk", "BEN-1") == 0.5
+
+    # A country file can escalate a built-in entry but never drop one.
+    (tmp_path / "countries.csv").write_text("country,status\nIran,high_risk\nHigh Risk,sanctioned\n")
+    screener = SanctionsScreener(str(tmp_path / "entities.csv"), str(tmp_path / "countries.csv"))
+    screener.reload()
+    assert screener.screen(destination_country="Iran").score == 0.0
+    assert screener.screen(destination_country="High Risk").score == 0.0
+    assert screener.screen(destination_country="North Korea").score == 0.0
+
+
+def test_failed_reload_keeps_last_index_and_records_error(tmp_path) -> None:
+    screener = _write_lists(tmp_path, "SDN-1,Ivan Sidorov,\n")
+    good, loaded_at = screener.index, screener.last_reload_at
+    assert loaded_at is not None and screener.last_reload_error is None
+
+    (tmp_path / "countries.csv").write_text("country,status\nIran,embargoed\n")
+    stamp = time.time() + 5
+    os.utime(tmp_path / "countries.csv", (stamp, stamp))
+
+    screener.start_watching(interval=0.01)
+    try:
+        deadline = time.time() + 2.0
+        while screener.last_reload_error is None and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        screener.stop_watching()
+
+    assert isinstance(screener.last_reload_error, ValueError)
+    assert screener.index is good and screener.last_reload_at == loaded_at
+    assert screener.screen(beneficiary_id="SDN-1").score == 0.0
+
+
+def test_watcher_survives_malformed_file_and_loads_the_next_good_one(tmp_path) -> None:
+    screener = _write_lists(tmp_path, "SDN-1,Ivan Sidorov,\n")
+    good = screener.index
+
+    def touch(name: str, offset: float) -> None:
+        stamp = time.time() + offset
+        os.utime(tmp_path / name, (stamp, stamp))
+
+    def wait_for(condition) -> bool:
+        deadline = time.time() + 2.0
+        while not condition() and time.time() < deadline:
+            time.sleep(0.01)
+        return condition()
+
+    screener.start_watching(interval=0.01)
+    try:
+        (tmp_path / "countries.csv").write_text("country,status\nKP\n")  # short row
+        touch("countries.csv", 5)
+        assert wait_for(lambda: screener.last_reload_error is not None)
+        assert isinstance(screener.last_reload_error, ValueError)
+        assert screener.index is good
+
+        (tmp_path / "countries.csv").write_text("country,status\nKP,sanctioned\n")
+        touch("countries.csv", 10)
+        assert wait_for(lambda: screener.index is not good)
+        assert screener.last_reload_error is None
+        assert screener.screen(destination_country="KP").score == 0.0
+    finally:
+        screener.stop_watching()
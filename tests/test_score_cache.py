@@ -0,0 +1,136 @@
+# tests/test_score_cache.py
+
+"""
+Shared TTL / LRU score cache for the AIVA graphs.
+"""
+
+from __future__ import annotations
+
+from src.aiva.compliance_graph import ComplianceContext, ComplianceGraph
+from src.aiva.liquidity_graph import LiquidityContext, LiquidityGraph
+from src.aiva.liquidity_ledger import LiquidityLedger
+from src.aiva.merge_engine import MergeEngine, RouteRequest
+from src.aiva.sanctions import SanctionsScreener
+from src.aiva.score_cache import COMPLIANCE, LIQUIDITY, VOLATILITY, ScoreCache
+from src.aiva.volatility_graph import CorridorVolatilityContext, VolatilityGraph
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_hits_misses_and_per_namespace_ttl() -> None:
+    clock = _Clock()
+    cache = ScoreCache(ttls={VOLATILITY: 1.0, COMPLIANCE: 100.0}, clock=clock)
+    calls = []
+
+    def compute(ctx):
+        calls.append(ctx)
+        return 0.5
+
+    for _ in range(3):
+        cache.get_or_compute(VOLATILITY, "AUD-SGD", compute)
+        cache.get_or_compute(COMPLIANCE, "AUD-SGD", compute)
+    assert len(calls) == 2
+    assert cache.stats(VOLATILITY).hits == 2 and cache.stats(VOLATILITY).misses == 1
+
+    clock.now = 5.0  # volatility expired, compliance still fresh
+    cache.get_or_compute(VOLATILITY, "AUD-SGD", compute)
+    cache.get_or_compute(COMPLIANCE, "AUD-SGD", compute)
+    assert len(calls) == 3
+    assert cache.stats(VOLATILITY).expirations == 1
+    assert cache.stats().hits == 5 and cache.stats().size == 2
+
+
+def test_lru_cap_evicts_least_recently_used() -> None:
+    cache = ScoreCache(max_entries=2)
+    cache.put(LIQUIDITY, "a", 1.0)
+    cache.put(LIQUIDITY, "b", 1.0)
+    cache.get_or_compute(LIQUIDITY, "a", lambda ctx: 0.0)  # touch "a"
+    cache.put(LIQUIDITY, "c", 1.0)
+
+    assert len(cache) == 2
+    assert cache.get_or_compute(LIQUIDITY, "a", lambda ctx: 0.0) == 1.0
+    assert cache.get_or_compute(LIQUIDITY, "b", lambda ctx: 0.0) == 0.0
+    assert cache.stats(LIQUIDITY).evictions == 2
+
+
+def test_invalidate_by_namespace_and_predicate() -> None:
+    graph = VolatilityGraph(cache=ScoreCache())
+    for corridor in ("AUD-SGD", "AUD-EUR"):
+        graph.get_volatility_score(CorridorVolatilityContext(corridor, 1.0))
+
+    dropped = graph.cache.invalidate(VOLATILITY, lambda ctx: ctx.corridor_id == "AUD-SGD")
+    assert dropped == 1 and len(graph.cache) == 1
+    assert graph.cache.invalidate() == 1 and len(graph.cache) == 0
+
+
+def test_compliance_cache_cleared_on_sanctions_reload(tmp_path) -> None:
+    entities = tmp_path / "entities.csv"
+    entities.write_text("entity_id,name,aliases\n")
+    screener = SanctionsScreener(str(entities))
+    graph = ComplianceGraph(screener=screener, cache=ScoreCache())
+    ctx = ComplianceContext("Singapore", "BEN-1", "Ivan Petrov")
+    assert graph.get_compliance_score(ctx) == 1.0
+
+    entities.write_text("entity_id,name,aliases\nSDN-1,Ivan Petrov,\n")
+    screener.reload()
+    assert graph.get_compliance_score(ctx) == 0.0
+
+
+def test_liquidity_with_ledger_is_never_cached() -> None:
+    ledger = LiquidityLedger({"N": 100.0})
+    graph = LiquidityGraph(ledger=ledger, cache=ScoreCache())
+    ctx = LiquidityContext("N", 50.0)
+    assert graph.get_liquidity_score(ctx) == 1.0
+    ledger.reserve("N", 60.0)
+    assert graph.get_liquidity_score(ctx) == 0.0
+    assert len(graph.cache) == 0
+
+
+def test_cached_engine_ranks_like_uncached_engine() -> None:
+    request = RouteRequest(
+        origin="AU_BANK_A", destination="EU_BANK_X", amount=10_000.0,
+        volatility_indices={"AUD-SGD": 2.0},
+    )
+    cached = MergeEngine(cache=ScoreCache())
+    expected = MergeEngine().rank_routes(request, k=3)
+
+    assert cached.rank_routes(request, k=3) == expected
+    assert cached.rank_routes(request, k=3) == expected
+    assert cached.cache.stats().hit_rate > 0.5
+
+
+def test_score_computed_across_an_invalidation_is_not_cached() -> None:
+    cache = ScoreCache()
+    feed = {"AUD-SGD": 0.9}
+
+    def compute(ctx):
+        stale = feed[ctx]
+        feed[ctx] = 0.1
+        cache.invalidate(VOLATILITY)  # market moved while we were scoring
+        return stale
+
+    assert cache.get_or_compute(VOLATILITY, "AUD-SGD", compute) == 0.9
+    assert len(cache) == 0
+    assert cache.get_or_compute(VOLATILITY, "AUD-SGD", lambda ctx: feed[ctx]) == 0.1
+
+
+def test_graphs_sharing_a_cache_keep_their_scores_apart(tmp_path) -> None:
+    entities = tmp_path / "entities.csv"
+    entities.write_text("entity_id,name,aliases\nSDN-1,Ivan Petrov,\n")
+    cache = ScoreCache()
+    listed = ComplianceGraph(screener=SanctionsScreener(str(entities)), cache=cache)
+    unlisted = ComplianceGraph(cache=cache)
+    ctx = ComplianceContext("Singapore", "BEN-1", "Ivan Petrov")
+
+    assert listed.get_compliance_score(ctx) == 0.0
+    assert unlisted.get_compliance_score(ctx) == 1.0
+    assert len(cache) == 2
+
+    listed.screener.reload()  # only the reloaded graph's scores are dropped
+    assert len(cache) == 1